@@ -1,28 +1,54 @@
 """Main entry point for the application."""
 
+import argparse
 import sys
 from pathlib import Path
 
-from src.config import SettingsManager, Theme
-from src.core.downloader import DownloadHandler
-from src.core.models import Gag
-from src.ui.app import App
-from src.utils.logging import Logger
+from src import cli
 
 
-def test_download(logger):
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser for the options of the app.
+
+    Returns:
+        Parser for starting the app. The download command has its own, see cli.
+    """
+    parser = argparse.ArgumentParser(
+        prog="9gag-downloader",
+        description="Start 9GAG Downloader. "
+        'Run "9gag-downloader download --help" to download without the UI.',
+    )
+    cli.add_rate_limit_arguments(parser)
+    parser.add_argument(
+        "--test", action="store_true", help="download a test gag instead of starting the app"
+    )
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true", help="use asyncio with --test"
+    )
+    return parser
+
+
+def test_download(logger, use_async=False, rate_limiter=None):
     """Test download function to verify the download handler works correctly."""
+    from src.core.downloader import AsyncDownloadEngine, DownloadHandler
+    from src.core.models import Gag
+
     test_gag_id = "aW4nMjA"  # New 9GAG post ID from user (a video)
     test_gag = Gag(id=test_gag_id, title="Test Gag Video")
 
     logger.info("Starting download test")
-    downloader = DownloadHandler(logger)
+    handler = DownloadHandler(logger, rate_limiter=rate_limiter)
+    downloader = handler
+    if use_async:
+        logger.info("Using the asyncio download backend")
+        downloader = AsyncDownloadEngine(handler)
 
     test_folder = Path("./test_downloads")
     test_folder.mkdir(exist_ok=True)
 
     logger.info(f"Testing download for gag ID: {test_gag_id}")
     result = downloader.download_gag(test_gag, str(test_folder))
+    handler.close()
 
     if result:
         logger.info(f"Download successful! Saved as {test_gag.url}")
@@ -34,26 +60,53 @@ def test_download(logger):
 
 
 def main():
-    """Start the application."""
+    """Start the application, or the command line interface for its commands."""
+    if len(sys.argv) > 1 and sys.argv[1] == "download":
+        sys.exit(cli.main(sys.argv[1:]))
+    args = build_parser().parse_args(sys.argv[1:])
+
+    # Imported here so the command line only loads what it uses
+    from src.config import SettingsManager, Theme
+    from src.core.downloader import DownloadHandler, RetryPolicy
+    from src.core.parser import ParseCache
+    from src.utils.logging import Logger
+
     logger = Logger("9GAG Downloader")
     logger.info("Starting application")
 
     theme = Theme()
     settings_manager = SettingsManager()
-    downloader = DownloadHandler(logger)
+    settings = settings_manager.settings
+
+    # Command line limits override the saved ones for this run
+    rate_limiter = cli.create_rate_limiter(args, settings)
+    logger.info(f"Rate limits: {rate_limiter.describe()}")
 
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
-        test_download(logger)
+    if args.test:
+        test_download(logger, use_async=args.use_async, rate_limiter=rate_limiter)
         return
 
+    downloader = DownloadHandler(
+        logger,
+        stats_file=settings_manager.settings_file.with_name("suffix_stats.json"),
+        retry_policy=RetryPolicy(max_attempts=settings.retry_attempts),
+        rate_limiter=rate_limiter,
+    )
+
+    from src.ui.app import App
+
     app = App(
         downloader=downloader,
         theme=theme,
         logger=logger,
         settings_manager=settings_manager,
+        parse_cache=ParseCache(
+            settings_manager.settings_file.with_name("parse_cache"), logger=logger
+        ),
     )
     app.mainloop()
 
+    downloader.close()
     logger.info("Application closed")
 
 
@@ -0,0 +1,658 @@
+"""Command line interface for running downloads without a display.
+
+    9gag-downloader download EXPORT [EXPORT ...] --dest DIR [--upvoted] [--saved]
+
+The CLI drives the parser and the download engine directly and never
+imports the UI, so it runs on servers without Tk. Progress is shown as a
+single line on stderr, the summary is printed on stdout, and the exit code
+tells cron how the run went. Options that are not given fall back to the
+settings saved by the app.
+
+The downloader and the parser are imported once a download starts, after
+the first progress line is out, so --help and the first output are quick.
+
+Every run is recorded in a job journal in the destination folder. With
+--resume an interrupted run goes on with the gags it had not finished.
+
+Rate limits can be changed while a download runs in the file given with
+--limits-file, see LimitsWatcher.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.config import AppSettings, SettingsManager
+from src.core.models import Gag
+from src.utils.helpers import create_dirs_if_not_exist
+from src.utils.logging import Logger
+
+if TYPE_CHECKING:
+    from src.core.downloader import (
+        AsyncDownloadEngine,
+        DownloadEngine,
+        DownloadHandler,
+        RateLimiter,
+    )
+    from src.core.storage import JobJournal, JournalState
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1  # Some gags could not be downloaded, or the download stopped on an error
+EXIT_USAGE = 2  # Invalid arguments, reported by argparse
+EXIT_INPUT_ERROR = 3  # The exports could not be read or the destination not be written
+EXIT_INTERRUPTED = 130  # Stopped with Ctrl+C, like shells report SIGINT
+
+
+class ProgressLine:
+    """Compact progress output that is rewritten in place on a terminal.
+
+    Without a terminal, for example under cron, a full line is written
+    every interval instead, so logs stay short.
+    """
+
+    # Seconds between two updates on a terminal and elsewhere
+    TERMINAL_INTERVAL = 0.1
+    LOG_INTERVAL = 30.0
+
+    def __init__(
+        self,
+        stream: IO[str],
+        interactive: Optional[bool] = None,
+        interval: Optional[float] = None,
+        enabled: bool = True,
+    ):
+        """Initialize the progress line.
+
+        Args:
+            stream: Stream the progress is written to.
+            interactive: Whether to rewrite the line in place. Defaults to
+                whether the stream is a terminal.
+            interval: Minimum seconds between two updates.
+            enabled: Whether to write anything. The counters are kept either way.
+        """
+        self.stream = stream
+        self.enabled = enabled
+        self.interactive = stream.isatty() if interactive is None else interactive
+        if interval is None:
+            interval = self.TERMINAL_INTERVAL if self.interactive else self.LOG_INTERVAL
+        self.interval = interval
+
+        self.downloaded = 0
+        self.cached = 0
+        self.failed = 0
+        self.total: Optional[int] = None
+        self.concurrency = 0
+
+        self._start_time = time.monotonic()
+        self._last_update = self._start_time
+        self._width = 0
+
+    @property
+    def processed(self) -> int:
+        """Number of gags that were downloaded, found on disk or failed."""
+        return self.downloaded + self.cached + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the progress line was created."""
+        return time.monotonic() - self._start_time
+
+    def render(self) -> str:
+        """Get the text of the progress line."""
+        total = "?" if self.total is None else str(self.total)
+        elapsed = self.elapsed
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        text = (
+            f"{self.processed}/{total} | {self.downloaded} downloaded, "
+            f"{self.cached} already downloaded, {self.failed} failed | "
+        )
+        if self.concurrency:
+            text += f"{self.concurrency} workers | "
+        return text + f"{rate:.1f} gags/s"
+
+    def update(self, force: bool = False) -> None:
+        """Write the progress if the interval has passed.
+
+        Args:
+            force: Whether to write regardless of the interval.
+        """
+        now = time.monotonic()
+        if not self.enabled or (not force and now - self._last_update < self.interval):
+            return
+        self._last_update = now
+
+        text = self.render()
+        if self.interactive:
+            self.stream.write("\r" + text.ljust(self._width))
+            self._width = len(text)
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def finish(self) -> None:
+        """Write the final state and end the line."""
+        self.update(force=True)
+        if self.enabled and self.interactive:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+class LimitsWatcher:
+    """Applies changed rate limits to a running download.
+
+    The limits are read from a JSON file with the keys of the settings,
+    max_requests_per_second and max_kilobytes_per_second, 0 for unlimited,
+    given with --limits-file. The file is checked every interval on a
+    background thread. On POSIX systems SIGHUP makes
+    it read the file right away.
+    """
+
+    # Seconds between two checks of the file
+    CHECK_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: Path,
+        rate_limiter: "RateLimiter",
+        logger: Logger,
+        interval: float = CHECK_INTERVAL,
+    ):
+        """Initialize the watcher. The limits in the file now count as applied.
+
+        Args:
+            path: JSON file holding the limits.
+            rate_limiter: Limiter the changed limits are applied to.
+            logger: Logger instance.
+            interval: Seconds between two checks of the file.
+        """
+        self.path = path
+        self.rate_limiter = rate_limiter
+        self.logger = logger
+        self.interval = interval
+
+        # Limits given on the command line hold until the file changes them
+        self._stat = self._get_stat()
+        self._limits = self._read()
+        self._force = False
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_stat(self) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of the file, None if it is missing."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Optional[Tuple[float, float]]:
+        """Read the limits from the file.
+
+        Returns:
+            Requests per second and kilobytes per second, or None if the file
+            is missing or invalid, for example while it is being written.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return (
+                max(0.0, float(data.get("max_requests_per_second", 0.0))),
+                max(0.0, float(data.get("max_kilobytes_per_second", 0.0))),
+            )
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    def check(self, force: bool = False) -> bool:
+        """Apply the limits of the file if they changed.
+
+        Args:
+            force: Whether to apply the limits even if they did not change.
+
+        Returns:
+            True if new limits were applied.
+        """
+        stat = self._get_stat()
+        if stat == self._stat and not force:
+            return False
+        self._stat = stat
+
+        limits = self._read()
+        if limits is None or (limits == self._limits and not force):
+            return False
+        self._limits = limits
+
+        requests_per_second, kilobytes_per_second = limits
+        self.rate_limiter.set_limits(
+            requests_per_second or None, kilobytes_per_second * 1024 or None
+        )
+        self.logger.info(f"Rate limits changed: {self.rate_limiter.describe()}")
+        return True
+
+    def reload(self, *args: object) -> None:
+        """Read the file on the next check. Usable as a signal handler."""
+        self._force = True
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start checking the file on a background thread."""
+        self._thread = threading.Thread(target=self._run, name="limits-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop checking the file."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Check the file every interval until stopped."""
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            force, self._force = self._force, False
+            self.check(force)
+
+
+def add_rate_limit_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that override the saved rate limits for one run.
+
+    Used by the download command and by the start of the app.
+
+    Args:
+        parser: Parser to add the options to.
+    """
+    parser.add_argument(
+        "--max-rps", type=float, metavar="N", help="maximum requests per second, 0 for no limit"
+    )
+    parser.add_argument(
+        "--max-kbps", type=float, metavar="N", help="maximum kilobytes per second, 0 for no limit"
+    )
+
+
+def create_rate_limiter(args: argparse.Namespace, settings: AppSettings) -> "RateLimiter":
+    """Create the rate limiter from the options and the saved settings.
+
+    Args:
+        args: Parsed options, see add_rate_limit_arguments.
+        settings: Saved settings, used for the limits not given as options.
+
+    Returns:
+        Rate limiter with the limits of this run.
+    """
+    from src.core.downloader import RateLimiter
+
+    requests_per_second = (
+        args.max_rps if args.max_rps is not None else settings.max_requests_per_second
+    )
+    kilobytes_per_second = (
+        args.max_kbps if args.max_kbps is not None else settings.max_kilobytes_per_second
+    )
+    return RateLimiter(requests_per_second, kilobytes_per_second * 1024)
+
+
+def positive_int(value: str) -> int:
+    """Parse an argument that must be a whole number of at least 1.
+
+    Args:
+        value: Argument as given on the command line.
+
+    Returns:
+        The number.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a number of at least 1.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: '{value}'") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser.
+
+    Returns:
+        Parser with a "download" subcommand.
+    """
+    parser = argparse.ArgumentParser(
+        prog="9gag-downloader", description="Download the gags of 9GAG data exports."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    download = subparsers.add_parser(
+        "download",
+        help="download the gags of one or more data exports",
+        description="Download the gags of one or more data exports without the UI. "
+        f"Exits with {EXIT_OK} on success, {EXIT_FAILED} if some gags failed or the download "
+        f"stopped on an error, {EXIT_USAGE} on invalid arguments, {EXIT_INPUT_ERROR} if an "
+        f"export could not be read and {EXIT_INTERRUPTED} when interrupted.",
+    )
+    download.add_argument("exports", nargs="+", metavar="EXPORT", help="9GAG data export file")
+    download.add_argument("--dest", required=True, metavar="DIR", help="folder to save the gags in")
+    download.add_argument("--upvoted", action="store_true", help="download upvoted gags")
+    download.add_argument("--saved", action="store_true", help="download saved gags")
+    download.add_argument(
+        "--workers", type=positive_int, metavar="N", help="downloads running at the same time"
+    )
+    download.add_argument(
+        "--max-workers",
+        type=positive_int,
+        metavar="N",
+        help="upper bound when the number of downloads adapts to the CDN",
+    )
+    download.add_argument(
+        "--fixed-workers",
+        action="store_true",
+        help="keep the number of downloads at --workers instead of adapting it",
+    )
+    download.add_argument(
+        "--backend", choices=["threads", "asyncio"], help="download engine to use"
+    )
+    add_rate_limit_arguments(download)
+    download.add_argument(
+        "--retries", type=positive_int, metavar="N", help="attempts per download before giving up"
+    )
+    download.add_argument(
+        "--no-cache", action="store_true", help="parse the exports without the parse cache"
+    )
+    download.add_argument(
+        "--limits-file",
+        metavar="PATH",
+        help="JSON file whose rate limits are applied while the download runs",
+    )
+    download.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the interrupted run in the destination folder from its journal",
+    )
+    download.add_argument("--log-file", metavar="PATH", help="file the log is written to")
+    output = download.add_mutually_exclusive_group()
+    output.add_argument("--quiet", action="store_true", help="only print errors")
+    output.add_argument("--verbose", action="store_true", help="also print the log")
+    return parser
+
+
+def create_engine(
+    handler: "DownloadHandler",
+    args: argparse.Namespace,
+    settings: AppSettings,
+    logger: Logger,
+    journal: Optional["JobJournal"] = None,
+) -> Union["DownloadEngine", "AsyncDownloadEngine"]:
+    """Create the download engine from the options and the saved settings.
+
+    Args:
+        handler: Download handler used by the engine.
+        args: Parsed command line options.
+        settings: Saved settings, used for options that were not given.
+        logger: Logger instance.
+        journal: Optional journal the engine records the run in.
+
+    Returns:
+        Thread pool or asyncio based download engine.
+    """
+    from src.core.downloader import ConcurrencyController, DownloadEngine
+
+    workers = args.workers if args.workers is not None else settings.download_workers
+    workers = max(workers, 1)
+    max_workers = (
+        args.max_workers if args.max_workers is not None else settings.max_download_workers
+    )
+
+    controller = None
+    if settings.adaptive_concurrency and not args.fixed_workers:
+        controller = ConcurrencyController(
+            min_concurrency=1,
+            max_concurrency=max(max_workers, workers),
+            initial_concurrency=workers,
+            logger=logger,
+        )
+
+    if (args.backend or settings.download_backend) == "asyncio":
+        # Only this backend needs aiohttp
+        from src.core.downloader import AsyncDownloadEngine
+
+        try:
+            return AsyncDownloadEngine(
+                handler,
+                max_concurrency=workers,
+                logger=logger,
+                controller=controller,
+                journal=journal,
+            )
+        except ImportError as e:
+            logger.warning(f"{str(e)}, falling back to threads")
+
+    return DownloadEngine(
+        handler, max_workers=workers, logger=logger, controller=controller, journal=journal
+    )
+
+
+def iter_pending(
+    gags: Iterable[Gag],
+    handler: "DownloadHandler",
+    destination_folder: str,
+    progress: ProgressLine,
+) -> Iterator[Gag]:
+    """Yield the gags that still need downloading, counting the others.
+
+    Args:
+        gags: Gags of the exports.
+        handler: Download handler that knows the downloaded gags.
+        destination_folder: Folder the gags are saved in.
+        progress: Progress line that counts the gags and learns the total.
+
+    Yields:
+        Gags that were not downloaded before.
+    """
+    total = 0
+    for gag in gags:
+        total += 1
+        if handler.find_downloaded(gag, destination_folder) is not None:
+            progress.cached += 1
+            progress.update()
+            continue
+        yield gag
+    progress.total = total
+
+
+def resumed_gags(state: "JournalState", gags: Iterable[Gag], logger: Logger) -> Iterator[Gag]:
+    """Yield the work left over from an interrupted run.
+
+    The gags the journal has as queued but not finished come first. If the
+    interrupted run had not queued every gag yet, the gags of the exports
+    follow, without the ones the journal already knows.
+
+    Args:
+        state: Replayed state of the job journal.
+        gags: Gags of the exports, not read if the journal is complete.
+        logger: Logger instance.
+
+    Yields:
+        Gags to download.
+    """
+    logger.info(
+        f"Resuming from the job journal: {len(state.remaining)} gags left, "
+        f"{state.done} done and {state.failed} failed before"
+        + ("" if state.complete else ", reading the exports for the rest")
+    )
+    yield from state.remaining
+    if not state.complete:
+        known = state.known
+        yield from (gag for gag in gags if gag.id not in known)
+
+
+def run_download(args: argparse.Namespace, stdout: IO[str], stderr: IO[str]) -> int:
+    """Run the download subcommand.
+
+    Args:
+        args: Parsed command line options.
+        stdout: Stream the summary is printed on.
+        stderr: Stream progress and errors are printed on.
+
+    Returns:
+        Exit code.
+    """
+    logger = Logger("9GAG Downloader", log_file=args.log_file, console=args.verbose)
+    logger.info(f"Starting command line download of {', '.join(args.exports)}")
+
+    for export in args.exports:
+        if not Path(export).is_file():
+            logger.error(f"File not found: {export}")
+            print(f"error: file not found: {export}", file=stderr)
+            return EXIT_INPUT_ERROR
+
+    try:
+        Path(args.dest).mkdir(parents=True, exist_ok=True)
+        create_dirs_if_not_exist(args.dest)
+    except OSError as e:
+        logger.error(f"Cannot create destination folder: {str(e)}")
+        print(f"error: cannot create destination folder: {str(e)}", file=stderr)
+        return EXIT_INPUT_ERROR
+
+    progress = ProgressLine(stderr, enabled=not args.quiet)
+    progress.update(force=True)
+
+    from bs4.builder import ParserRejectedMarkup
+
+    from src.core.downloader import DownloadHandler, DownloadResult, RetryPolicy
+    from src.core.parser import GagDeduplicator, HtmlParser, ParseCache
+    from src.core.storage import JobJournal
+
+    # What reading an export fails with: the file, its encoding or its markup
+    export_errors = (OSError, UnicodeDecodeError, ParserRejectedMarkup)
+
+    settings_manager = SettingsManager(logger)
+    settings = settings_manager.settings
+    config_dir = settings_manager.settings_file.parent
+
+    rate_limiter = create_rate_limiter(args, settings)
+    logger.info(f"Rate limits: {rate_limiter.describe()}")
+
+    try:
+        journal = JobJournal(args.dest, resume=args.resume)
+    except OSError as e:
+        logger.error(f"Cannot open the job journal: {str(e)}")
+        print(f"error: cannot open the job journal: {str(e)}", file=stderr)
+        return EXIT_INPUT_ERROR
+
+    deduplicator = GagDeduplicator()
+    gags: Iterable[Gag] = []
+    if not (args.resume and journal.state.complete):
+        gags = HtmlParser.iter_exports(
+            args.exports,
+            upvoted_gags=args.upvoted,
+            saved_gags=args.saved,
+            cache=None if args.no_cache else ParseCache(config_dir / "parse_cache", logger=logger),
+            fast=True,
+            deduplicator=deduplicator,
+        )
+    if args.resume:
+        gags = resumed_gags(journal.state, gags, logger)
+
+    handler = DownloadHandler(
+        logger,
+        stats_file=config_dir / "suffix_stats.json",
+        retry_policy=RetryPolicy(
+            max_attempts=args.retries if args.retries is not None else settings.retry_attempts
+        ),
+        rate_limiter=rate_limiter,
+    )
+    engine = create_engine(handler, args, settings, logger, journal)
+    progress.concurrency = engine.concurrency
+
+    def on_result(result: DownloadResult) -> None:
+        if result.success:
+            progress.downloaded += 1
+        else:
+            progress.failed += 1
+            logger.error(f"Failed to download {result.gag.id}: {result.error}")
+        progress.concurrency = engine.concurrency
+        progress.update()
+
+    watcher = None
+    reload_signal = None
+    if args.limits_file:
+        watcher = LimitsWatcher(Path(args.limits_file), rate_limiter, logger)
+        watcher.start()
+        # SIGHUP only exists on POSIX and handlers can only be set on the main thread
+        if threading.current_thread() is threading.main_thread():
+            reload_signal = getattr(signal, "SIGHUP", None)
+    previous_handler = signal.signal(reload_signal, watcher.reload) if reload_signal else None
+
+    try:
+        engine.run(iter_pending(gags, handler, args.dest, progress), args.dest, on_result)
+    except KeyboardInterrupt:
+        engine.cancel()
+        logger.warning("Download interrupted")
+        progress.finish()
+        print("Interrupted", file=stderr)
+        return EXIT_INTERRUPTED
+    except export_errors as e:
+        # Errors of single downloads are results, this is the parser failing
+        logger.error(f"Error reading the exports: {str(e)}")
+        progress.finish()
+        print(f"error: cannot read the exports: {str(e)}", file=stderr)
+        return EXIT_INPUT_ERROR
+    except Exception as e:
+        logger.error(f"Download failed: {str(e)}")
+        progress.finish()
+        print(f"error: download failed: {str(e)}", file=stderr)
+        return EXIT_FAILED
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if reload_signal:
+            signal.signal(
+                reload_signal, signal.SIG_DFL if previous_handler is None else previous_handler
+            )
+        handler.close()
+        journal.close()
+
+    progress.finish()
+    summary = (
+        f"{progress.downloaded} downloaded, {progress.cached} already downloaded, "
+        f"{progress.failed} failed, {deduplicator.duplicates} duplicates skipped"
+    )
+    logger.info(f"Command line download finished: {summary}")
+    if not args.quiet:
+        print(f"Finished in {progress.elapsed:.1f}s: {summary}", file=stdout)
+    return EXIT_FAILED if progress.failed else EXIT_OK
+
+
+def main(
+    argv: Optional[List[str]] = None,
+    stdout: Optional[IO[str]] = None,
+    stderr: Optional[IO[str]] = None,
+) -> int:
+    """Run the command line interface.
+
+    Args:
+        argv: Arguments without the program name. Defaults to sys.argv[1:].
+        stdout: Stream for the summary. Defaults to sys.stdout.
+        stderr: Stream for progress and errors. Defaults to sys.stderr.
+
+    Returns:
+        Exit code.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.upvoted and not args.saved:
+        parser.error("select at least one of --upvoted and --saved")
+
+    return run_download(args, stdout or sys.stdout, stderr or sys.stderr)
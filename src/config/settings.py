@@ -24,6 +24,17 @@ class AppSettings:
     saved_gags_selected: bool = False
     upvoted_gags_selected: bool = True
 
+    # Download settings
+    download_workers: int = 4
+    adaptive_concurrency: bool = True
+    max_download_workers: int = 16
+    download_backend: str = "threads"  # "threads" or "asyncio"
+    retry_attempts: int = 3
+
+    # Rate limits for the CDN, 0 means unlimited
+    max_requests_per_second: float = 0.0
+    max_kilobytes_per_second: float = 0.0
+
     # UI settings
     window_width: int = 1024
     window_height: int = 768
@@ -99,6 +110,13 @@ class SettingsManager:
                 last_destination_folder=data.get("last_destination_folder", ""),
                 saved_gags_selected=data.get("saved_gags_selected", False),
                 upvoted_gags_selected=data.get("upvoted_gags_selected", True),
+                download_workers=data.get("download_workers", 4),
+                adaptive_concurrency=data.get("adaptive_concurrency", True),
+                max_download_workers=data.get("max_download_workers", 16),
+                download_backend=data.get("download_backend", "threads"),
+                retry_attempts=data.get("retry_attempts", 3),
+                max_requests_per_second=data.get("max_requests_per_second", 0.0),
+                max_kilobytes_per_second=data.get("max_kilobytes_per_second", 0.0),
                 window_width=data.get("window_width", 1024),
                 window_height=data.get("window_height", 768),
                 recent_files=data.get("recent_files", []),
@@ -162,6 +180,19 @@ class SettingsManager:
         self.settings.upvoted_gags_selected = upvoted_selected
         self.save_settings()
 
+    def update_rate_limits(
+        self, max_requests_per_second: float, max_kilobytes_per_second: float
+    ) -> None:
+        """Update the download rate limits.
+
+        Args:
+            max_requests_per_second: Maximum requests per second, 0 for unlimited.
+            max_kilobytes_per_second: Maximum bandwidth in KB/s, 0 for unlimited.
+        """
+        self.settings.max_requests_per_second = max(0.0, max_requests_per_second)
+        self.settings.max_kilobytes_per_second = max(0.0, max_kilobytes_per_second)
+        self.save_settings()
+
     def update_window_size(self, width: int, height: int) -> None:
         """Update window size.
 
@@ -1,5 +1,44 @@
-"""Downloader functionality for downloading 9GAG content."""
+"""Downloader functionality for downloading 9GAG content.
 
-from .download_handler import DownloadHandler
+The classes are imported on first access, so importing the package does
+not load requests or aiohttp.
+"""
 
-__all__ = ["DownloadHandler"]
+from typing import TYPE_CHECKING
+
+from src.utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .async_engine import AsyncDownloadEngine
+    from .concurrency_controller import ConcurrencyController
+    from .download_engine import DownloadEngine, DownloadResult
+    from .download_handler import DownloadHandler
+    from .rate_limiter import RateLimiter
+    from .retry_policy import IncompleteDownload, RetryPolicy, TransientHTTPError
+
+__all__ = [
+    "AsyncDownloadEngine",
+    "ConcurrencyController",
+    "DownloadEngine",
+    "DownloadHandler",
+    "DownloadResult",
+    "IncompleteDownload",
+    "RateLimiter",
+    "RetryPolicy",
+    "TransientHTTPError",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AsyncDownloadEngine": ".async_engine",
+        "ConcurrencyController": ".concurrency_controller",
+        "DownloadEngine": ".download_engine",
+        "DownloadHandler": ".download_handler",
+        "DownloadResult": ".download_engine",
+        "IncompleteDownload": ".retry_policy",
+        "RateLimiter": ".rate_limiter",
+        "RetryPolicy": ".retry_policy",
+        "TransientHTTPError": ".retry_policy",
+    },
+)
@@ -0,0 +1,614 @@
+"""AsyncDownloadEngine downloads gags with asyncio and aiohttp.
+
+It is an alternative backend to DownloadEngine. Instead of one thread per
+download, all requests share one event loop, so thousands of CDN requests
+can be in flight with very little overhead. The suffix order, file
+locations and content checks are taken from the wrapped DownloadHandler.
+
+aiohttp is an optional dependency, install it with ``pip install .[async]``.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from src.core.models import Gag
+from src.core.storage import JobJournal
+from src.utils.logging import Logger
+
+from .concurrency_controller import ConcurrencyController
+from .download_engine import DownloadResult, ResultCallback, StartCallback
+from .download_handler import ContentType, DownloadHandler, VariantDownload
+from .retry_policy import IncompleteDownload, TransientHTTPError
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on the environment
+    aiohttp = None
+
+T = TypeVar("T")
+ResultQueue = Union["queue.Queue[DownloadResult]", "asyncio.Queue[DownloadResult]"]
+
+
+class AsyncDownloadEngine:
+    """Asyncio based download engine built on top of DownloadHandler."""
+
+    DEFAULT_CONCURRENCY = 32
+
+    # Errors that are retried according to the handler's retry policy
+    TRANSIENT_ERRORS = (
+        (
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            asyncio.TimeoutError,
+            TransientHTTPError,
+            IncompleteDownload,
+        )
+        if aiohttp is not None
+        else ()
+    )
+
+    def __init__(
+        self,
+        handler: DownloadHandler,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        logger: Optional[Logger] = None,
+        controller: Optional[ConcurrencyController] = None,
+        journal: Optional[JobJournal] = None,
+    ):
+        """Initialize the async download engine.
+
+        Args:
+            handler: Download handler providing URLs, paths and content checks.
+            max_concurrency: Number of downloads in flight at the same time.
+                Ignored if a controller is given.
+            logger: Logger instance. Defaults to the handler's logger.
+            controller: Optional controller adapting the number of downloads
+                in flight. The connection pool is sized for its maximum.
+            journal: Optional journal every queued, started and finished gag
+                is recorded in, so an interrupted run can be resumed.
+
+        Raises:
+            ImportError: If aiohttp is not installed.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "The asyncio download backend requires aiohttp, install it with "
+                "'pip install aiohttp'"
+            )
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.handler = handler
+        self.controller = controller
+        self.max_concurrency = controller.max_concurrency if controller else max_concurrency
+        self.logger = logger or handler.logger
+        self.journal = journal
+
+        self._cancelled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def concurrency(self) -> int:
+        """Number of downloads currently allowed in flight."""
+        return self.controller.limit if self.controller else self.max_concurrency
+
+    def cancel(self) -> None:
+        """Cancel the running downloads.
+
+        Safe to call from any thread. In-flight requests are cancelled and
+        no new downloads are started.
+        """
+        with self._lock:
+            self._cancelled = True
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def is_cancelled(self) -> bool:
+        """Check whether the engine was cancelled.
+
+        Returns:
+            True if cancel() was called since the last run.
+        """
+        return self._cancelled
+
+    def _cancel_tasks(self) -> None:
+        """Cancel all download tasks. Must run on the event loop."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def _try_download_with_suffix(
+        self,
+        session: "aiohttp.ClientSession",
+        gag: Gag,
+        content_type: ContentType,
+        suffix: str,
+        file_path: Path,
+    ) -> bool:
+        """Try to download gag with a specific URL suffix.
+
+        Args:
+            session: HTTP session to use.
+            gag: Gag to download.
+            content_type: Type of content to try downloading.
+            suffix: URL suffix to try.
+            file_path: Path claimed for the gag.
+
+        Returns:
+            True if download was successful, False otherwise.
+        """
+        if self.handler.is_downloaded(file_path):
+            self.handler.use_existing(gag, content_type, file_path)
+            return True
+
+        description = f"{content_type.name.lower()} download of {gag.id}"
+        try:
+            return await self._with_retries(
+                lambda: self._download_variant(session, gag, content_type, suffix, file_path),
+                description,
+            )
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            TransientHTTPError,
+            IncompleteDownload,
+        ) as e:
+            self.handler.log_transfer_error(description, e)
+        return False
+
+    async def _download_variant(
+        self,
+        session: "aiohttp.ClientSession",
+        gag: Gag,
+        content_type: ContentType,
+        suffix: str,
+        file_path: Path,
+    ) -> bool:
+        """Download one variant of a gag, resuming a partial download if present.
+
+        The decisions are taken by the handler's VariantDownload, the file
+        system work runs on worker threads.
+
+        Args:
+            session: HTTP session to use.
+            gag: Gag to download.
+            content_type: Type of content to download.
+            suffix: URL suffix of the variant.
+            file_path: Final path of the file.
+
+        Returns:
+            True if download was successful, False if the variant does not
+            exist or is not valid.
+
+        Raises:
+            aiohttp.ClientError: If the transfer failed.
+            TransientHTTPError: If the CDN answered with a transient error.
+            IncompleteDownload: If the body ended before the announced size.
+        """
+        download = self.handler.begin_variant(gag, content_type, suffix, file_path)
+        headers = await self._run_blocking(download.prepare)
+
+        async with self._request(session, download.url, headers) as response:
+            action = await self._run_blocking(download.start, response.status, response.headers)
+            if action == VariantDownload.WRITE:
+                written = await self._write_chunks(response, download)
+                self.logger.info(f"Response content length: {written} bytes")
+
+        if action == VariantDownload.RESTART:
+            return await self._download_variant(session, gag, content_type, suffix, file_path)
+        if action == VariantDownload.REJECT:
+            return False
+        return await self._run_blocking(download.finish)
+
+    @asynccontextmanager
+    async def _request(
+        self, session: "aiohttp.ClientSession", url: str, headers: Dict[str, str]
+    ) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """Send a GET request through the rate limiter and report its outcome.
+
+        Args:
+            session: HTTP session to use.
+            url: URL to request.
+            headers: Extra request headers.
+
+        Yields:
+            The response, released when the context exits.
+
+        Raises:
+            TransientHTTPError: If the status code is worth retrying.
+        """
+        await self.handler.rate_limiter.acquire_request_async()
+        start_time = time.monotonic()
+        try:
+            response = await session.get(url, headers=headers)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self.handler.report_request(time.monotonic() - start_time, None)
+            raise
+        self.handler.report_request(time.monotonic() - start_time, response.status)
+
+        try:
+            self.handler.check_status(url, response.status, response.headers)
+            yield response
+        finally:
+            response.release()
+
+    async def _with_retries(self, operation: Callable[[], Awaitable[T]], description: str) -> T:
+        """Run an operation, retrying transient failures with backoff.
+
+        The backoff is an asyncio sleep, so other downloads keep running.
+
+        Args:
+            operation: Callable returning the awaitable performing the request.
+            description: Description of the operation for the logs.
+
+        Returns:
+            The result of the operation.
+        """
+        attempt = 1
+        while True:
+            try:
+                return await operation()
+            except self.TRANSIENT_ERRORS as e:
+                delay = self.handler.retry_delay(attempt, e, description)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _probe_variant(
+        self,
+        session: "aiohttp.ClientSession",
+        gag: Gag,
+        content_type: ContentType,
+        suffix: str,
+    ) -> bool:
+        """Check cheaply whether a variant exists before downloading it.
+
+        Args:
+            session: HTTP session to use.
+            gag: Gag to probe.
+            content_type: Type of content to probe.
+            suffix: URL suffix of the variant.
+
+        Returns:
+            True if the variant exists and has the expected format.
+        """
+        content_url, headers = self.handler.begin_probe(gag, suffix)
+        description = f"probe of {content_url}"
+        try:
+            return await self._with_retries(
+                lambda: self._probe_url(session, content_type, content_url, headers),
+                description,
+            )
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            TransientHTTPError,
+            IncompleteDownload,
+        ) as e:
+            self.handler.log_transfer_error(description, e)
+        return False
+
+    async def _probe_url(
+        self,
+        session: "aiohttp.ClientSession",
+        content_type: ContentType,
+        content_url: str,
+        headers: Dict[str, str],
+    ) -> bool:
+        """Request the first bytes of a variant and check them.
+
+        Args:
+            session: HTTP session to use.
+            content_type: Type of content to probe.
+            content_url: URL of the variant.
+            headers: Headers of the probe request.
+
+        Returns:
+            True if the variant exists and has the expected format.
+        """
+        async with self._request(session, content_url, headers) as response:
+            head = b""
+            if response.status in (200, 206):
+                head = await response.content.read(self.handler.PROBE_SIZE)
+            return self.handler.is_probe_match(
+                content_type, content_url, response.status, response.headers, head
+            )
+
+    async def _write_chunks(
+        self, response: "aiohttp.ClientResponse", download: VariantDownload
+    ) -> int:
+        """Stream a response body to a partial download file.
+
+        Opening the file and writing the chunks run on worker threads.
+
+        Args:
+            response: Response to read the body from.
+            download: Download the body belongs to.
+
+        Returns:
+            Number of bytes written.
+        """
+        written = 0
+        f = await self._run_blocking(download.open)
+        try:
+            async for chunk in response.content.iter_chunked(self.handler.chunk_size):
+                await self.handler.rate_limiter.acquire_bytes_async(len(chunk))
+                await self._run_blocking(f.write, chunk)
+                written += len(chunk)
+        finally:
+            await self._run_blocking(f.close)
+        return written
+
+    async def download_gag_async(self, session: "aiohttp.ClientSession", gag: Gag) -> bool:
+        """Download a gag, trying the likeliest content type first.
+
+        The destination folder is taken from the wrapped handler.
+
+        Args:
+            session: HTTP session to use.
+            gag: Gag to download.
+
+        Returns:
+            True if download was successful, False otherwise.
+        """
+        existing = await self._run_blocking(
+            self.handler.find_existing, gag, self.handler.destination_folder
+        )
+        if existing is not None:
+            self.handler.use_existing(gag, *existing)
+            return True
+
+        stats = self.handler.suffix_stats
+        for content_type in self.handler.content_type_order():
+            file_path = self.handler.claim_file_path(gag, content_type)
+            try:
+                for suffix in stats.order_suffixes(content_type.name):
+                    if self.handler.probe_variants and not await self._probe_variant(
+                        session, gag, content_type, suffix
+                    ):
+                        continue
+                    if await self._try_download_with_suffix(
+                        session, gag, content_type, suffix, file_path
+                    ):
+                        stats.record_hit(content_type.name, suffix)
+                        await self._run_blocking(
+                            self.handler.record_download,
+                            gag,
+                            content_type,
+                            suffix,
+                            Path(gag.url),
+                        )
+                        self.logger.info(
+                            f"Successfully downloaded as {content_type.name.lower()}: {gag.id}"
+                        )
+                        return True
+            finally:
+                self.handler.release_file_path(gag, file_path)
+
+        self.logger.error(f"Failed to download gag: {gag.full_url}")
+        await self._run_blocking(self.handler.record_failure, gag, "No downloadable variant found")
+        return False
+
+    def _open_destination(self, destination_folder: str) -> None:
+        """Create the destination folder and index the files in it.
+
+        Args:
+            destination_folder: Folder to save the downloaded content.
+        """
+        Path(destination_folder).mkdir(parents=True, exist_ok=True)
+        self.handler.open_destination(destination_folder)
+
+    @staticmethod
+    async def _run_blocking(function: Callable[..., T], *args: Any) -> T:
+        """Run a blocking call of the handler on a worker thread.
+
+        File system work, hashing a downloaded video and committing to the
+        catalog would hold up every other download if they ran on the event loop.
+
+        Args:
+            function: Function to call.
+            *args: Arguments of the call.
+
+        Returns:
+            The result of the call.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _create_session(self) -> "aiohttp.ClientSession":
+        """Create the HTTP session shared by all downloads of a run.
+
+        Returns:
+            A new aiohttp client session.
+        """
+        # Like the timeout of requests, the limit is on connecting and on every
+        # read, not on the whole transfer, so large videos are not cut off
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.handler.REQUEST_TIMEOUT,
+            sock_read=self.handler.REQUEST_TIMEOUT,
+        )
+        return aiohttp.ClientSession(
+            headers=self.handler.HEADERS,
+            timeout=timeout,
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+        )
+
+    async def run_async(
+        self,
+        gags: Iterable[Gag],
+        destination_folder: str,
+        on_result: Optional[ResultCallback] = None,
+        on_start: Optional[StartCallback] = None,
+        result_queue: Optional[ResultQueue] = None,
+    ) -> List[DownloadResult]:
+        """Download all gags on the running event loop.
+
+        The gags are taken from the iterable on a worker thread, so a
+        generator parsing an export does not block the downloads in flight.
+        Journal writes and other file system work also run on worker threads.
+
+        Args:
+            gags: Gags to download.
+            destination_folder: Folder to save the downloaded content.
+            on_result: Optional callback invoked with every finished result.
+            on_start: Optional callback invoked when a gag download starts.
+            result_queue: Optional queue.Queue or asyncio.Queue every finished
+                result is put on.
+
+        Returns:
+            List of results in completion order.
+        """
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._cancelled = False
+
+        self.handler.destination_folder = destination_folder
+        await self._run_blocking(self._open_destination, destination_folder)
+
+        results: List[DownloadResult] = []
+
+        if self.controller:
+            self.handler.request_listener = self.controller.record_request
+            self.logger.info(
+                f"Starting async download engine with {self.concurrency} concurrent "
+                f"downloads, adapting between {self.controller.min_concurrency} and "
+                f"{self.controller.max_concurrency}"
+            )
+        else:
+            self.logger.info(
+                f"Starting async download engine with {self.max_concurrency} concurrent downloads"
+            )
+
+        async def download_one(session: "aiohttp.ClientSession", gag: Gag, index: int) -> None:
+            if self.journal:
+                await self._run_blocking(self.journal.started, gag)
+            if on_start:
+                on_start(gag, index)
+
+            start_time = time.monotonic()
+            try:
+                success = await self.download_gag_async(session, gag)
+                error = None if success else "No downloadable variant found"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Unexpected error downloading gag {gag.id}: {str(e)}")
+                success = False
+                error = str(e)
+
+            result = DownloadResult(
+                gag=gag,
+                index=index,
+                success=success,
+                error=error,
+                elapsed=time.monotonic() - start_time,
+            )
+            results.append(result)
+            if self.journal:
+                await self._run_blocking(self.journal.finished, gag, success, error)
+            if result_queue is not None:
+                result_queue.put_nowait(result)
+            if on_result:
+                on_result(result)
+
+        try:
+            async with self._create_session() as session:
+                source = iter(gags)
+                index = 0
+                while True:
+                    # The allowed concurrency may change while we wait
+                    while self._tasks and len(self._tasks) >= self.concurrency:
+                        await asyncio.wait(set(self._tasks), return_when=asyncio.FIRST_COMPLETED)
+                    if self._cancelled:
+                        break
+
+                    gag = await self._run_blocking(next, source, None)
+                    if gag is None:
+                        if self.journal:
+                            await self._run_blocking(self.journal.complete)
+                        break
+
+                    if self.journal:
+                        await self._run_blocking(self.journal.queued, gag)
+                    task = asyncio.ensure_future(download_one(session, gag, index))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    index += 1
+
+                if self._tasks:
+                    await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            with self._lock:
+                self._loop = None
+            if self.controller:
+                self.handler.request_listener = None
+
+        if self._cancelled:
+            self.logger.warning("Async download engine cancelled")
+
+        await self._run_blocking(self.handler.save_stats)
+        if self.journal:
+            await self._run_blocking(self.journal.sync)
+
+        return results
+
+    def run(
+        self,
+        gags: Iterable[Gag],
+        destination_folder: str,
+        on_result: Optional[ResultCallback] = None,
+        on_start: Optional[StartCallback] = None,
+        result_queue: Optional[ResultQueue] = None,
+    ) -> List[DownloadResult]:
+        """Download all gags, blocking until the run is finished.
+
+        Synchronous wrapper around run_async() with the same signature as
+        DownloadEngine.run(), so both engines can be used interchangeably.
+
+        Args:
+            gags: Gags to download.
+            destination_folder: Folder to save the downloaded content.
+            on_result: Optional callback invoked with every finished result.
+            on_start: Optional callback invoked when a gag download starts.
+            result_queue: Optional queue.Queue or asyncio.Queue every finished
+                result is put on.
+
+        Returns:
+            List of results in completion order.
+        """
+        return asyncio.run(
+            self.run_async(gags, destination_folder, on_result, on_start, result_queue)
+        )
+
+    def download_gag(self, gag: Gag, destination_folder: str) -> bool:
+        """Download a single gag, blocking until it is finished.
+
+        Args:
+            gag: Gag to download.
+            destination_folder: Folder to save the downloaded content.
+
+        Returns:
+            True if download was successful, False otherwise.
+        """
+        results = self.run([gag], destination_folder)
+        return bool(results) and results[0].success
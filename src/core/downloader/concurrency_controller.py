@@ -0,0 +1,173 @@
+"""Adaptive concurrency for the download engines.
+
+ConcurrencyController implements additive increase, multiplicative
+decrease (AIMD). It watches every request sent to the CDN. After each
+window of requests it looks at the error rate, the latency and the
+throughput, then raises the number of downloads in flight by one or
+cuts it in half.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+from src.utils.logging import Logger
+
+
+class ConcurrencyController:
+    """AIMD controller for the number of downloads in flight."""
+
+    # Requests per adjustment window
+    DEFAULT_WINDOW = 20
+
+    # Share of throttled or failed requests that triggers a decrease
+    DEFAULT_ERROR_THRESHOLD = 0.05
+
+    # Latency increase over the best observed latency that triggers a decrease
+    DEFAULT_LATENCY_FACTOR = 2.0
+
+    DEFAULT_DECREASE_FACTOR = 0.5
+
+    def __init__(
+        self,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        initial_concurrency: Optional[int] = None,
+        window: int = DEFAULT_WINDOW,
+        error_threshold: float = DEFAULT_ERROR_THRESHOLD,
+        latency_factor: float = DEFAULT_LATENCY_FACTOR,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        logger: Optional[Logger] = None,
+    ):
+        """Initialize the controller.
+
+        Args:
+            min_concurrency: Lowest number of downloads in flight.
+            max_concurrency: Highest number of downloads in flight.
+            initial_concurrency: Starting point. Defaults to the minimum.
+            window: Number of requests between two adjustments.
+            error_threshold: Share of throttled or failed requests above
+                which the concurrency is decreased.
+            latency_factor: Decrease when the average latency of a window
+                exceeds the best window average by this factor.
+            decrease_factor: Factor the concurrency is multiplied with on
+                a decrease.
+            logger: Logger the concurrency changes are written to.
+        """
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError("Expected 1 <= min_concurrency <= max_concurrency")
+
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.window = window
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.decrease_factor = decrease_factor
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._limit = self._clamp(initial_concurrency or min_concurrency)
+        self._listeners: List[Callable[[int], None]] = []
+
+        self.best_latency: Optional[float] = None
+        self._previous_throughput: Optional[float] = None
+        self._reset_window()
+
+    @property
+    def limit(self) -> int:
+        """Current number of downloads allowed in flight."""
+        return self._limit
+
+    def _clamp(self, value: int) -> int:
+        """Clamp a concurrency level to the configured range."""
+        return max(self.min_concurrency, min(self.max_concurrency, value))
+
+    def _reset_window(self) -> None:
+        """Start a new adjustment window. Requires the lock."""
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """Register a callback invoked with the new limit whenever it changes.
+
+        Args:
+            listener: Callback taking the new concurrency level. It is called
+                from the thread that finished the request.
+        """
+        self._listeners.append(listener)
+
+    @staticmethod
+    def is_error_status(status_code: Optional[int]) -> bool:
+        """Check whether a request outcome signals an overloaded CDN.
+
+        Args:
+            status_code: HTTP status code, None for timeouts and connection errors.
+
+        Returns:
+            True for throttling, server errors and failed connections.
+        """
+        return status_code is None or status_code in (408, 429) or status_code >= 500
+
+    def record_request(self, latency: float, status_code: Optional[int]) -> None:
+        """Record a finished request and adjust the concurrency after each window.
+
+        Args:
+            latency: Seconds until the response headers arrived.
+            status_code: HTTP status code, None for timeouts and connection errors.
+        """
+        with self._lock:
+            self._requests += 1
+            self._latency_total += latency
+            if self.is_error_status(status_code):
+                self._errors += 1
+
+            # Every request in flight should contribute to a window
+            if self._requests < max(self.window, self._limit):
+                return
+
+            old_limit = self._limit
+            reason = self._adjust()
+            new_limit = self._limit
+
+        if new_limit != old_limit:
+            if self.logger:
+                direction = "raised" if new_limit > old_limit else "lowered"
+                self.logger.info(
+                    f"Download concurrency {direction} from {old_limit} to {new_limit} ({reason})"
+                )
+            for listener in self._listeners:
+                listener(new_limit)
+
+    def _adjust(self) -> str:
+        """Apply the AIMD rule to the finished window. Requires the lock.
+
+        Returns:
+            Description of the window for the logs.
+        """
+        elapsed = max(time.monotonic() - self._window_start, 1e-6)
+        error_rate = self._errors / self._requests
+        average_latency = self._latency_total / self._requests
+        throughput = (self._requests - self._errors) / elapsed
+
+        if self.best_latency is None or average_latency < self.best_latency:
+            self.best_latency = average_latency
+
+        reason = (
+            f"latency {average_latency * 1000:.0f} ms, error rate {error_rate:.0%}, "
+            f"{throughput:.1f} requests/s"
+        )
+
+        if (
+            error_rate > self.error_threshold
+            or average_latency > self.best_latency * self.latency_factor
+        ):
+            self._limit = self._clamp(int(self._limit * self.decrease_factor))
+        elif self._previous_throughput is None or throughput >= self._previous_throughput * 0.9:
+            # Only keep growing while more concurrency still buys throughput
+            self._limit = self._clamp(self._limit + 1)
+
+        self._previous_throughput = throughput
+        self._reset_window()
+        return reason
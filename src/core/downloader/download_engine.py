@@ -0,0 +1,223 @@
+"""DownloadEngine runs many gag downloads at once.
+
+It wraps a DownloadHandler and feeds a list of gags to a bounded pool
+of worker threads. Every finished gag is reported as a DownloadResult,
+either through a callback, a result queue, or the returned list. With a
+ConcurrencyController the number of downloads in flight adapts to how
+the CDN responds.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Set
+
+from src.core.models import Gag
+from src.core.storage import JobJournal
+from src.utils.logging import Logger
+
+from .concurrency_controller import ConcurrencyController
+from .download_handler import DownloadHandler
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a single gag download."""
+
+    gag: Gag
+    index: int
+    success: bool
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+ResultCallback = Callable[[DownloadResult], None]
+StartCallback = Callable[[Gag, int], None]
+
+
+class DownloadEngine:
+    """Concurrent download engine built on top of DownloadHandler."""
+
+    DEFAULT_WORKERS = 4
+
+    def __init__(
+        self,
+        handler: DownloadHandler,
+        max_workers: int = DEFAULT_WORKERS,
+        logger: Optional[Logger] = None,
+        controller: Optional[ConcurrencyController] = None,
+        journal: Optional[JobJournal] = None,
+    ):
+        """Initialize the download engine.
+
+        Args:
+            handler: Download handler used for every single gag.
+            max_workers: Number of downloads running at the same time.
+                Ignored if a controller is given.
+            logger: Logger instance. Defaults to the handler's logger.
+            controller: Optional controller adapting the number of downloads
+                in flight. The pool is sized for its maximum.
+            journal: Optional journal every queued, started and finished gag
+                is recorded in, so an interrupted run can be resumed.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.handler = handler
+        self.controller = controller
+        self.max_workers = controller.max_concurrency if controller else max_workers
+        self.handler.configure_pool(self.max_workers)
+        self.logger = logger or handler.logger
+        self.journal = journal
+        self._cancel_event = threading.Event()
+
+    @property
+    def concurrency(self) -> int:
+        """Number of downloads currently allowed in flight."""
+        return self.controller.limit if self.controller else self.max_workers
+
+    def cancel(self) -> None:
+        """Stop scheduling new downloads. Running downloads are allowed to finish."""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """Check whether the engine was cancelled.
+
+        Returns:
+            True if cancel() was called since the last run.
+        """
+        return self._cancel_event.is_set()
+
+    def _download_one(
+        self,
+        gag: Gag,
+        index: int,
+        destination_folder: str,
+        on_start: Optional[StartCallback],
+    ) -> DownloadResult:
+        """Download one gag and wrap the outcome in a DownloadResult.
+
+        Args:
+            gag: Gag to download.
+            index: Position of the gag in the input.
+            destination_folder: Folder to save the downloaded content.
+            on_start: Optional callback invoked before the download starts.
+
+        Returns:
+            The download result.
+        """
+        if self.journal:
+            self.journal.started(gag)
+        if on_start:
+            on_start(gag, index)
+
+        start_time = time.monotonic()
+        try:
+            success = self.handler.download_gag(gag, destination_folder)
+            error = None if success else "No downloadable variant found"
+        except Exception as e:
+            self.logger.error(f"Unexpected error downloading gag {gag.id}: {str(e)}")
+            success = False
+            error = str(e)
+
+        return DownloadResult(
+            gag=gag,
+            index=index,
+            success=success,
+            error=error,
+            elapsed=time.monotonic() - start_time,
+        )
+
+    def run(
+        self,
+        gags: Iterable[Gag],
+        destination_folder: str,
+        on_result: Optional[ResultCallback] = None,
+        on_start: Optional[StartCallback] = None,
+        result_queue: Optional["queue.Queue[DownloadResult]"] = None,
+    ) -> List[DownloadResult]:
+        """Download all gags using the worker pool.
+
+        Blocks until every scheduled download has finished or the engine
+        was cancelled. on_start is invoked from the worker threads, on_result
+        from the thread that called run().
+
+        Args:
+            gags: Gags to download.
+            destination_folder: Folder to save the downloaded content.
+            on_result: Optional callback invoked with every finished result.
+            on_start: Optional callback invoked when a gag download starts.
+            result_queue: Optional queue every finished result is put on.
+
+        Returns:
+            List of results in completion order.
+        """
+        self._cancel_event.clear()
+        results: List[DownloadResult] = []
+
+        # One directory listing answers the cache checks of the whole run
+        self.handler.open_destination(destination_folder)
+
+        if self.controller:
+            self.handler.request_listener = self.controller.record_request
+            self.logger.info(
+                f"Starting download engine with {self.concurrency} workers, "
+                f"adapting between {self.controller.min_concurrency} and "
+                f"{self.controller.max_concurrency}"
+            )
+        else:
+            self.logger.info(f"Starting download engine with {self.max_workers} workers")
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="gag-download"
+        ) as executor:
+            pending: Set[Future] = set()
+
+            def collect(done: Iterable[Future]) -> None:
+                for future in done:
+                    result = future.result()
+                    results.append(result)
+                    if self.journal:
+                        self.journal.finished(result.gag, result.success, result.error)
+                    if result_queue is not None:
+                        result_queue.put(result)
+                    if on_result:
+                        on_result(result)
+
+            for index, gag in enumerate(gags):
+                # Keep at most the allowed number of downloads queued so
+                # cancellation is quick and large inputs are not materialized
+                # in the executor queue.
+                while len(pending) >= self.concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                if self._cancel_event.is_set():
+                    break
+
+                if self.journal:
+                    self.journal.queued(gag)
+                pending.add(
+                    executor.submit(self._download_one, gag, index, destination_folder, on_start)
+                )
+            else:
+                if self.journal:
+                    self.journal.complete()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        if self.controller:
+            self.handler.request_listener = None
+
+        if self._cancel_event.is_set():
+            self.logger.warning("Download engine cancelled")
+
+        self.handler.save_stats()
+        if self.journal:
+            self.journal.sync()
+
+        return results
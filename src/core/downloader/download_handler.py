@@ -1,18 +1,44 @@
 """DownloadHandler is responsible for downloading the gags.
 
 It first checks if the gags are already downloaded.
-It first tries as video and if it fails it will try as image.
+It then tries the video and image variants, starting with the content
+type and suffix that most gags were found in so far.
 """
 
+import os
 import re
+import sqlite3
+import threading
+import time
 from enum import Enum, auto
 from pathlib import Path
-from typing import Tuple
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import requests
+import requests.adapters
+
 from src.core.models import Gag
+from src.core.storage import DirectoryIndex, DownloadCatalog
+from src.utils.helpers import file_hash
 from src.utils.logging import Logger
 
+from .rate_limiter import RateLimiter
+from .retry_policy import IncompleteDownload, RetryPolicy, TransientHTTPError
+from .suffix_stats import SuffixStats
+
+T = TypeVar("T")
+
 
 class ContentType(Enum):
     """Type of content to download."""
@@ -21,8 +47,150 @@ class ContentType(Enum):
     IMAGE = auto()
 
 
+class VariantDownload:
+    """One download of a gag variant, independent of the HTTP client.
+
+    The handler decides what is requested and what happens with the
+    response, the engine only moves the bytes:
+
+        download = handler.begin_variant(gag, content_type, suffix, file_path)
+        headers = download.prepare()
+        # Send a GET request for download.url with the headers
+        if download.start(status_code, response_headers) == VariantDownload.WRITE:
+            with download.open() as f:
+                ...  # Write the body chunks
+            success = download.finish()
+
+    prepare, start, open and finish use the file system, so an engine
+    running on an event loop calls them on a worker thread.
+    """
+
+    # What to do with a response, the result of start()
+    WRITE = "write"
+    REJECT = "reject"  # The variant does not exist or is not valid
+    RESTART = "restart"  # The partial download cannot be resumed, request it again
+
+    def __init__(
+        self,
+        handler: "DownloadHandler",
+        gag: Gag,
+        content_type: ContentType,
+        suffix: str,
+        file_path: Path,
+    ):
+        """Initialize the download.
+
+        Args:
+            handler: Handler the download belongs to.
+            gag: Gag to download.
+            content_type: Type of content to download.
+            suffix: URL suffix of the variant.
+            file_path: Final path of the file.
+        """
+        self.handler = handler
+        self.logger = handler.logger
+        self.gag = gag
+        self.content_type = content_type
+        self.file_path = file_path
+        self.url = handler.get_content_url(gag, suffix)
+        self.part_path = handler._get_part_path(gag, file_path, suffix)
+
+        self.resume_from = 0
+        self.append = False
+        self.min_size = 0
+        self.expected_size: Optional[int] = None
+
+    @property
+    def _name(self) -> str:
+        """Name of the content type for the logs."""
+        return self.content_type.name.lower()
+
+    def prepare(self) -> Dict[str, str]:
+        """Get the headers of the request, resuming a partial download if present.
+
+        Returns:
+            Extra request headers.
+        """
+        self.resume_from, headers = self.handler._get_resume_headers(self.part_path)
+        if self.resume_from:
+            self.logger.info(f"Resuming {self.part_path.name} from byte {self.resume_from}")
+        self.logger.info(f"Requesting URL: {self.url}")
+        return headers
+
+    def start(self, status_code: int, headers: Mapping[str, str]) -> str:
+        """Decide what to do with a response.
+
+        Args:
+            status_code: HTTP status code of the response.
+            headers: Response headers.
+
+        Returns:
+            WRITE to save the body, REJECT if the variant is not there and
+            RESTART if the request must be sent again from the first byte.
+        """
+        handler = self.handler
+        self.logger.info(f"{self._name.capitalize()} download response code: {status_code}")
+        body_offset = handler._get_body_offset(status_code, headers)
+        if self.resume_from and (status_code == 416 or body_offset not in (0, self.resume_from)):
+            self.logger.warning(f"Cannot resume {self.part_path.name}, starting over")
+            self.part_path.unlink()
+            return self.RESTART
+
+        if status_code not in (200, 206):
+            self.logger.warning(f"Failed to download {self._name}, response code: {status_code}")
+            return self.REJECT
+
+        content_type_header = headers.get("Content-Type", "")
+        self.logger.info(f"Content-Type header: {content_type_header}")
+        min_size = handler._get_min_size(self.content_type, self.url, content_type_header)
+        if min_size is None:
+            return self.REJECT
+
+        self.min_size = min_size
+        self.append = bool(body_offset)
+        self.expected_size = handler._get_total_size(headers)
+        return self.WRITE
+
+    def open(self) -> BinaryIO:
+        """Open the partial download for the body.
+
+        The file is left in place if the transfer breaks off, so it can be
+        resumed later.
+
+        Returns:
+            The file, opened for appending if the response resumes it.
+        """
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(self.part_path, "ab" if self.append else "wb")
+
+    def finish(self) -> bool:
+        """Move the complete body to its final path and record it on the gag.
+
+        Returns:
+            True if the file is complete and was moved into place.
+
+        Raises:
+            IncompleteDownload: If the body is shorter than announced. It is
+                transient, retrying the variant resumes the partial download.
+        """
+        if not self.handler._finalize_part(
+            self.part_path, self.file_path, self.expected_size, self.min_size
+        ):
+            return False
+
+        self.logger.info(f"{self._name.capitalize()} downloaded as {self.file_path.name}")
+        self.handler.mark_downloaded(self.gag, self.content_type, self.file_path)
+        return True
+
+
 class DownloadHandler:
-    """Handler for downloading 9GAG content."""
+    """Handler for downloading 9GAG content.
+
+    Besides downloading gags itself with requests, it provides the steps
+    of a download that do not depend on the HTTP client, such as
+    find_existing, claim_file_path, begin_probe, begin_variant and
+    retry_delay. The asyncio engine uses them with its own client.
+    """
 
     BASE_URL = "https://img-9gag-fun.9cache.com/photo/"
 
@@ -39,20 +207,128 @@ class DownloadHandler:
     IMAGE_SAVE_LOCATION = "gags/images"
     VIDEO_SAVE_LOCATION = "gags/videos"
 
+    # Suffixes tried for each content type, in order
+    SUFFIXES = {
+        ContentType.VIDEO: (VIDEO_SUFFIX_720, VIDEO_SUFFIX_460),
+        ContentType.IMAGE: (IMAGE_SUFFIX_700, IMAGE_SUFFIX_460),
+    }
+
+    # Responses smaller than this are probably not a valid video
+    MIN_VIDEO_SIZE = 10000
+
+    # Bytes requested when probing whether a variant exists
+    PROBE_SIZE = 1024
+
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "*/*",
         "Referer": "https://9gag.com/",
     }
 
-    def __init__(self, logger: Logger):
+    # Seconds to wait for the CDN before giving up on a request
+    REQUEST_TIMEOUT = 10
+
+    DEFAULT_POOL_SIZE = 10
+
+    # Errors that are retried according to the retry policy
+    TRANSIENT_ERRORS = (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        TransientHTTPError,
+        IncompleteDownload,
+    )
+
+    # Bytes read from the network and written to disk at a time
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        logger: Logger,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        probe_variants: bool = True,
+        stats_file: Optional[Union[str, Path]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        use_catalog: bool = True,
+    ):
         """Initialize the download handler.
 
         Args:
             logger: Logger instance for logging messages.
+            pool_size: Number of keep-alive connections kept open to the CDN.
+            chunk_size: Size of the chunks response bodies are streamed in.
+            probe_variants: Whether to probe variants with a ranged request
+                before downloading them.
+            stats_file: Optional file the variant hit statistics are persisted in.
+            retry_policy: Policy for retrying transient failures.
+            rate_limiter: Limiter shared by all requests to the CDN. Unlimited
+                by default.
+            use_catalog: Whether to keep a download catalog in the destination
+                folder.
         """
         self.destination_folder = ""
         self.logger = logger
+        self.chunk_size = chunk_size
+        self.probe_variants = probe_variants
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # Called with the latency and status code (None on connection errors)
+        # of every request, e.g. by the adaptive concurrency controller
+        self.request_listener: Optional[Callable[[float, Optional[int]], None]] = None
+        self.suffix_stats = SuffixStats(
+            [
+                (content_type.name, suffix)
+                for content_type, suffixes in self.SUFFIXES.items()
+                for suffix in suffixes
+            ],
+            stats_file,
+        )
+        self.use_catalog = use_catalog
+        self.catalog: Optional[DownloadCatalog] = None
+        self.directory_index: Optional[DirectoryIndex] = None
+        self._index_lock = threading.Lock()
+
+        # Final paths of the downloads in flight, by the id of the gag saving to them
+        self._path_claims: Dict[str, str] = {}
+        self._claim_lock = threading.Lock()
+
+        self.pool_size = 0
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        self.configure_pool(pool_size)
+
+    def configure_pool(self, pool_size: int) -> None:
+        """Resize the connection pool of the HTTP session.
+
+        Every download goes to the same CDN host, so the pool should hold at
+        least one connection per concurrent download to avoid new TLS
+        handshakes.
+
+        Args:
+            pool_size: Number of keep-alive connections to keep per host.
+        """
+        pool_size = max(1, pool_size)
+        if pool_size == self.pool_size:
+            return
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool_size = pool_size
+        self.logger.debug(f"HTTP connection pool size set to {pool_size}")
+
+    def close(self) -> None:
+        """Close the HTTP session, its pooled connections and the catalog."""
+        self.session.close()
+        with self._index_lock:
+            if self.catalog is not None:
+                self.catalog.close()
+                self.catalog = None
 
     def _get_content_info(self, content_type: ContentType) -> Tuple[str, str, str]:
         """Get file extension, suffix, and save location based on content type.
@@ -68,8 +344,685 @@ class DownloadHandler:
         else:  # ContentType.IMAGE
             return ".jpg", self.IMAGE_SUFFIX_700, self.IMAGE_SAVE_LOCATION
 
+    def _get_file_path(
+        self, gag: Gag, content_type: ContentType, destination_folder: Optional[str] = None
+    ) -> Path:
+        """Get the path a gag of the given content type is saved to.
+
+        The file is named after the title. If the catalog shows that another
+        gag with the same title already uses that name, or another download
+        in flight claimed it, the gag id is added.
+
+        Args:
+            gag: Gag to download.
+            content_type: Type of content (VIDEO or IMAGE).
+            destination_folder: Folder the gags are saved in. Defaults to the
+                folder of the current download.
+
+        Returns:
+            Path of the downloaded file.
+        """
+        file_ext, _, save_location = self._get_content_info(content_type)
+        folder = Path(destination_folder or self.destination_folder) / save_location
+        sanitized_title = self._sanitize_title(gag.title)
+        file_path = folder / f"{sanitized_title}{file_ext}"
+
+        catalog = self.catalog
+        owner = catalog.get_path_owner(file_path) if catalog is not None else None
+        if owner is None:
+            owner = self._path_claims.get(self._path_key(file_path))
+        if owner not in (None, gag.id):
+            file_path = folder / f"{sanitized_title} [{gag.id}]{file_ext}"
+        return file_path
+
+    @staticmethod
+    def _path_key(path: Path) -> str:
+        """Normalize a path for the claims of the downloads in flight."""
+        return os.path.normcase(os.path.abspath(path))
+
+    def claim_file_path(self, gag: Gag, content_type: ContentType) -> Path:
+        """Get the path a gag is saved to and reserve it for its download.
+
+        The catalog only knows finished downloads, so two gags with the same
+        title downloaded at the same time would both get the title as file
+        name. The path is resolved and claimed under one lock, so the second
+        gag sees the claim and gets the name with its id.
+
+        Args:
+            gag: Gag to download.
+            content_type: Type of content to download.
+
+        Returns:
+            Path of the downloaded file. Release it with release_file_path().
+        """
+        with self._claim_lock:
+            file_path = self._get_file_path(gag, content_type)
+            self._path_claims.setdefault(self._path_key(file_path), gag.id)
+        return file_path
+
+    def release_file_path(self, gag: Gag, file_path: Path) -> None:
+        """Release the claim of a gag on its path once its download is over.
+
+        Args:
+            gag: Gag that was downloaded.
+            file_path: Path claimed with claim_file_path().
+        """
+        key = self._path_key(file_path)
+        with self._claim_lock:
+            if self._path_claims.get(key) == gag.id:
+                del self._path_claims[key]
+
+    def open_destination(self, destination_folder: str) -> DirectoryIndex:
+        """Prepare a destination folder for the cache checks of a run.
+
+        Lists the save folders once and opens the download catalog of the folder.
+
+        Args:
+            destination_folder: Folder the gags are saved in.
+
+        Returns:
+            The fresh directory index.
+        """
+        index = DirectoryIndex(
+            destination_folder, [self.VIDEO_SAVE_LOCATION, self.IMAGE_SAVE_LOCATION]
+        )
+        count = index.build()
+        self.logger.info(f"Indexed {count} downloaded files in {destination_folder}")
+
+        with self._index_lock:
+            self.directory_index = index
+            if self.use_catalog and (
+                self.catalog is None or self.catalog.root != Path(destination_folder)
+            ):
+                if self.catalog is not None:
+                    self.catalog.close()
+                self.catalog = DownloadCatalog(destination_folder)
+        return index
+
+    def _get_directory_index(self, destination_folder: str) -> DirectoryIndex:
+        """Get the index of a destination, building it on first use.
+
+        Args:
+            destination_folder: Folder the gags are saved in.
+
+        Returns:
+            The directory index.
+        """
+        with self._index_lock:
+            index = self.directory_index
+        if index is not None and index.root == Path(destination_folder):
+            return index
+        return self.open_destination(destination_folder)
+
+    def is_downloaded(self, file_path: Path) -> bool:
+        """Check whether a file was downloaded, using the directory index.
+
+        Args:
+            file_path: Final path of the file.
+
+        Returns:
+            True if the file exists.
+        """
+        return self._get_directory_index(self.destination_folder).contains(file_path)
+
+    def find_existing(
+        self, gag: Gag, destination_folder: str
+    ) -> Optional[Tuple[ContentType, Path]]:
+        """Find the file of a gag that was downloaded before.
+
+        The catalog is asked first, by gag id. Files saved before the catalog
+        existed are found by their title and added to the catalog.
+
+        Args:
+            gag: Gag to look for.
+            destination_folder: Folder the gags are saved in.
+
+        Returns:
+            Content type and path of the file, or None if it was not downloaded.
+        """
+        index = self._get_directory_index(destination_folder)
+        catalog = self.catalog
+
+        if catalog is not None:
+            entry = catalog.get_downloaded(gag.id)
+            file_path = catalog.get_absolute_path(entry) if entry else None
+            if file_path is not None and index.contains(file_path):
+                return ContentType[entry.content_type], file_path
+
+        for content_type in self.content_type_order():
+            file_path = self._get_file_path(gag, content_type, destination_folder)
+            if index.contains(file_path):
+                if catalog is not None:
+                    self.record_download(gag, content_type, None, file_path, hash_file=False)
+                return content_type, file_path
+        return None
+
+    def find_downloaded(self, gag: Gag, destination_folder: str) -> Optional[bool]:
+        """Check whether a gag was downloaded before.
+
+        Args:
+            gag: Gag to check.
+            destination_folder: Folder the gags are saved in.
+
+        Returns:
+            Whether the downloaded file is a video, None if it was not downloaded.
+        """
+        existing = self.find_existing(gag, destination_folder)
+        return None if existing is None else existing[0] == ContentType.VIDEO
+
+    def record_download(
+        self,
+        gag: Gag,
+        content_type: ContentType,
+        suffix: Optional[str],
+        file_path: Path,
+        hash_file: bool = True,
+    ) -> None:
+        """Add a downloaded gag to the catalog, if there is one.
+
+        Args:
+            gag: Downloaded gag.
+            content_type: Type of the downloaded content.
+            suffix: URL suffix the gag was found in, None if unknown.
+            file_path: Path of the downloaded file.
+            hash_file: Whether to store the SHA-256 of the file.
+        """
+        catalog = self.catalog
+        if catalog is None:
+            return
+        try:
+            sha256 = file_hash(file_path) if hash_file else None
+            catalog.record_download(gag, content_type.name, suffix, file_path, sha256)
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"Could not add {gag.id} to the download catalog: {str(e)}")
+
+    def record_failure(self, gag: Gag, error: str) -> None:
+        """Add a failed gag to the catalog, if there is one.
+
+        Args:
+            gag: Gag that could not be downloaded.
+            error: Reason of the failure.
+        """
+        catalog = self.catalog
+        if catalog is None:
+            return
+        try:
+            catalog.record_failure(gag, error)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not add {gag.id} to the download catalog: {str(e)}")
+
+    def get_content_url(self, gag: Gag, suffix: str) -> str:
+        """Get the CDN URL of a gag variant.
+
+        Args:
+            gag: Gag to download.
+            suffix: URL suffix of the variant.
+
+        Returns:
+            URL of the variant.
+        """
+        return f"{self.BASE_URL}{gag.id}{suffix}"
+
+    def _get_min_size(
+        self, content_type: ContentType, content_url: str, content_type_header: str
+    ) -> Optional[int]:
+        """Get the minimum body size a successful response must have to be saved.
+
+        Videos must be served with a video content type. Responses with an
+        unexpected content type are only accepted if they are large enough,
+        HTML responses are never accepted.
+
+        Args:
+            content_type: Type of content that was requested.
+            content_url: URL that was requested.
+            content_type_header: Content-Type header of the response.
+
+        Returns:
+            Minimum size in bytes, or None if the response must be rejected.
+        """
+        if content_type != ContentType.VIDEO:
+            return 0
+
+        if "video" in content_type_header.lower() or "mp4" in content_type_header.lower():
+            return 0
+
+        if content_type_header == "text/html":
+            self.logger.warning(
+                f"Video URL responded with HTML, likely not a video: {content_url}"
+            )
+            return None
+
+        self.logger.warning(
+            f"Video URL responded with non-video content type: {content_type_header}"
+        )
+        return self.MIN_VIDEO_SIZE
+
+    def is_probe_match(
+        self,
+        content_type: ContentType,
+        content_url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        head: bytes,
+    ) -> bool:
+        """Check whether a probe response shows that a variant exists.
+
+        Args:
+            content_type: Type of content that was probed.
+            content_url: URL that was probed.
+            status_code: HTTP status code of the probe.
+            headers: Response headers of the probe.
+            head: First bytes of the response body.
+
+        Returns:
+            True if the variant exists and has the expected format.
+        """
+        if status_code not in (200, 206):
+            self.logger.info(f"Probe of {content_url} returned {status_code}")
+            return False
+
+        content_type_header = headers.get("Content-Type", "")
+        if content_type_header.lower().startswith("text/html"):
+            self.logger.info(f"Probe of {content_url} returned HTML")
+            return False
+
+        if not self._has_expected_magic(content_type, head):
+            self.logger.info(f"Probe of {content_url} has unexpected magic bytes")
+            return False
+
+        total_size = self._get_total_size(headers)
+        if (
+            content_type == ContentType.VIDEO
+            and "video" not in content_type_header.lower()
+            and total_size is not None
+            and total_size < self.MIN_VIDEO_SIZE
+        ):
+            self.logger.info(f"Probe of {content_url} is too small for a video")
+            return False
+
+        return True
+
+    @staticmethod
+    def _has_expected_magic(content_type: ContentType, head: bytes) -> bool:
+        """Check the leading bytes of a body against the expected file formats.
+
+        Args:
+            content_type: Type of content that was requested.
+            head: First bytes of the response body.
+
+        Returns:
+            True if the bytes look like a video or image respectively.
+        """
+        if content_type == ContentType.VIDEO:
+            # MP4 has its "ftyp" box after a 4 byte size field
+            return head[4:8] == b"ftyp" or head.startswith(b"\x1a\x45\xdf\xa3")
+
+        if head[:4] == b"RIFF":
+            return head[8:12] == b"WEBP"
+        return head.startswith((b"\xff\xd8\xff", b"\x89PNG", b"GIF8"))
+
+    @staticmethod
+    def _get_total_size(headers: Mapping[str, str]) -> Optional[int]:
+        """Get the full size of a resource from a (possibly partial) response.
+
+        Args:
+            headers: Response headers.
+
+        Returns:
+            Size in bytes, or None if the server did not report it.
+        """
+        content_range = headers.get("Content-Range", "")
+        if "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return int(total) if total.isdigit() else None
+
+        content_length = headers.get("Content-Length", "")
+        return int(content_length) if content_length.isdigit() else None
+
+    def begin_probe(self, gag: Gag, suffix: str) -> Tuple[str, Dict[str, str]]:
+        """Get the request that checks whether a variant exists, and count it.
+
+        A probe requests only the first PROBE_SIZE bytes. Check the response
+        with is_probe_match().
+
+        Args:
+            gag: Gag to probe.
+            suffix: URL suffix of the variant.
+
+        Returns:
+            URL and extra headers of the probe request.
+        """
+        self.suffix_stats.record_probe()
+        return self.get_content_url(gag, suffix), {"Range": f"bytes=0-{self.PROBE_SIZE - 1}"}
+
+    def begin_variant(
+        self, gag: Gag, content_type: ContentType, suffix: str, file_path: Path
+    ) -> VariantDownload:
+        """Start the download of a variant, see VariantDownload.
+
+        Args:
+            gag: Gag to download.
+            content_type: Type of content to download.
+            suffix: URL suffix of the variant.
+            file_path: Path claimed for the gag.
+
+        Returns:
+            The download of the variant.
+        """
+        return VariantDownload(self, gag, content_type, suffix, file_path)
+
+    def _probe_variant(self, gag: Gag, content_type: ContentType, suffix: str) -> bool:
+        """Check cheaply whether a variant exists before downloading it.
+
+        Requests only the first PROBE_SIZE bytes and checks the status code,
+        Content-Type and magic bytes, so wrong guesses do not cost a full body.
+
+        Args:
+            gag: Gag to probe.
+            content_type: Type of content to probe.
+            suffix: URL suffix of the variant.
+
+        Returns:
+            True if the variant exists and has the expected format.
+        """
+        content_url, headers = self.begin_probe(gag, suffix)
+        description = f"probe of {content_url}"
+        try:
+            return self._with_retries(
+                lambda: self._probe_url(content_type, content_url, headers), description
+            )
+        except (requests.RequestException, TransientHTTPError, IncompleteDownload) as e:
+            self.log_transfer_error(description, e)
+        return False
+
+    def _probe_url(
+        self, content_type: ContentType, content_url: str, headers: Dict[str, str]
+    ) -> bool:
+        """Request the first bytes of a variant and check them.
+
+        Args:
+            content_type: Type of content to probe.
+            content_url: URL of the variant.
+            headers: Headers of the probe request.
+
+        Returns:
+            True if the variant exists and has the expected format.
+        """
+        response = self._get(content_url, headers)
+        try:
+            head = b""
+            if response.status_code in (200, 206):
+                head = next(response.iter_content(chunk_size=self.PROBE_SIZE), b"")
+            return self.is_probe_match(
+                content_type, content_url, response.status_code, response.headers, head
+            )
+        finally:
+            response.close()
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """Send a streamed GET request through the pooled session.
+
+        Args:
+            url: URL to request.
+            headers: Extra request headers.
+
+        Returns:
+            The response. Callers must close it.
+
+        Raises:
+            TransientHTTPError: If the status code is worth retrying.
+        """
+        self.rate_limiter.acquire_request()
+        start_time = time.monotonic()
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=self.REQUEST_TIMEOUT, stream=True
+            )
+        except (requests.ConnectionError, requests.Timeout):
+            self.report_request(time.monotonic() - start_time, None)
+            raise
+        self.report_request(time.monotonic() - start_time, response.status_code)
+
+        try:
+            self.check_status(url, response.status_code, response.headers)
+        except TransientHTTPError:
+            response.close()
+            raise
+        return response
+
+    def check_status(self, url: str, status_code: int, headers: Mapping[str, str]) -> None:
+        """Raise for a status code that is worth retrying.
+
+        Args:
+            url: URL that was requested.
+            status_code: HTTP status code of the response.
+            headers: Response headers.
+
+        Raises:
+            TransientHTTPError: If the retry policy treats the status as transient.
+        """
+        if self.retry_policy.is_transient_status(status_code):
+            retry_after = self.retry_policy.parse_retry_after(headers.get("Retry-After"))
+            raise TransientHTTPError(url, status_code, retry_after)
+
+    def report_request(self, latency: float, status_code: Optional[int]) -> None:
+        """Pass the outcome of a request to the request listener, if any.
+
+        Args:
+            latency: Seconds until the response headers arrived.
+            status_code: HTTP status code, None for connection errors and timeouts.
+        """
+        if self.request_listener:
+            self.request_listener(latency, status_code)
+
+    def retry_delay(self, attempt: int, error: Exception, description: str) -> Optional[float]:
+        """Get how long to wait before retrying a transient failure.
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1.
+            error: Transient error of the attempt.
+            description: Description of the operation for the logs.
+
+        Returns:
+            Seconds to wait, or None if all attempts are used up.
+        """
+        policy = self.retry_policy
+        if attempt >= policy.max_attempts:
+            return None
+        delay = policy.get_delay(attempt, getattr(error, "retry_after", None))
+        self.logger.warning(
+            f"Transient error in {description} (attempt {attempt}/{policy.max_attempts}): "
+            f"{str(error) or type(error).__name__}, retrying in {delay:.1f}s"
+        )
+        return delay
+
+    def log_transfer_error(self, description: str, error: Exception) -> None:
+        """Log a request that failed for good.
+
+        Args:
+            description: Description of the operation, such as "probe of <url>".
+            error: Last error of the operation.
+        """
+        if isinstance(error, (TransientHTTPError, IncompleteDownload)):
+            self.logger.error(
+                f"Giving up on {description} after {self.retry_policy.max_attempts} "
+                f"attempts: {str(error)}"
+            )
+        else:
+            self.logger.error(f"Error in {description}: {str(error) or type(error).__name__}")
+
+    def _with_retries(self, operation: Callable[[], T], description: str) -> T:
+        """Run an operation, retrying transient failures with backoff.
+
+        The backoff sleeps only the calling worker, other downloads go on.
+
+        Args:
+            operation: Callable performing the request.
+            description: Description of the operation for the logs.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            The last transient error once all attempts are used up, or any
+            non-transient error immediately.
+        """
+        attempt = 1
+        while True:
+            try:
+                return operation()
+            except self.TRANSIENT_ERRORS as e:
+                delay = self.retry_delay(attempt, e, description)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def _get_part_path(self, gag: Gag, file_path: Path, suffix: str) -> Path:
+        """Get the path a variant is downloaded to before it is complete.
+
+        The name is made of the gag id and the suffix, so a partial file is
+        only ever resumed with bytes of the same gag and variant. Gags with
+        the same title do not share partial files.
+
+        Args:
+            gag: Gag being downloaded.
+            file_path: Final path of the file.
+            suffix: URL suffix of the variant being downloaded.
+
+        Returns:
+            Path of the partial download next to the final path.
+        """
+        return file_path.with_name(f"{gag.id}{suffix}.part")
+
+    @staticmethod
+    def _get_resume_headers(part_path: Path) -> Tuple[int, Dict[str, str]]:
+        """Get the offset and request headers to resume a partial download.
+
+        Args:
+            part_path: Path of the partial download.
+
+        Returns:
+            Tuple of (bytes already downloaded, extra request headers).
+        """
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        if resume_from:
+            return resume_from, {"Range": f"bytes={resume_from}-"}
+        return 0, {}
+
+    @staticmethod
+    def _get_body_offset(status_code: int, headers: Mapping[str, str]) -> Optional[int]:
+        """Get the offset of the first body byte within the full resource.
+
+        Args:
+            status_code: HTTP status code of the response.
+            headers: Response headers.
+
+        Returns:
+            Offset of the body, 0 for a full response, or None if a partial
+            response has no usable Content-Range header.
+        """
+        if status_code != 206:
+            return 0
+
+        content_range = headers.get("Content-Range", "")
+        match = re.match(r"bytes (\d+)-", content_range)
+        return int(match.group(1)) if match else None
+
+    def _write_chunks(self, chunks: Iterable[bytes], download: VariantDownload) -> int:
+        """Write response chunks to a partial download file.
+
+        Only one chunk is held in memory at a time. Every chunk goes through
+        the bandwidth limit.
+
+        Args:
+            chunks: Iterable of response body chunks.
+            download: Download the chunks belong to.
+
+        Returns:
+            Number of bytes written.
+        """
+        written = 0
+        with download.open() as f:
+            for chunk in chunks:
+                if chunk:
+                    self.rate_limiter.acquire_bytes(len(chunk))
+                    f.write(chunk)
+                    written += len(chunk)
+        return written
+
+    def _finalize_part(
+        self,
+        part_path: Path,
+        file_path: Path,
+        expected_size: Optional[int],
+        min_size: int,
+    ) -> bool:
+        """Verify a finished partial download and move it to its final path.
+
+        Args:
+            part_path: Path of the partial download.
+            file_path: Final path of the file.
+            expected_size: Full size reported by the server, if known.
+            min_size: Minimum number of bytes the file must have.
+
+        Returns:
+            True if the file is complete and was moved into place.
+
+        Raises:
+            IncompleteDownload: If the file does not have the expected size.
+                A short file is kept to be resumed, a longer one is removed
+                so the next attempt starts over.
+        """
+        size = part_path.stat().st_size
+
+        if expected_size is not None and size != expected_size:
+            if size > expected_size:
+                part_path.unlink()
+            raise IncompleteDownload(file_path.name, size, expected_size)
+
+        if size < min_size:
+            self.logger.warning(f"Response too small ({size} bytes), discarding {file_path.name}")
+            part_path.unlink()
+            return False
+
+        # Atomic on the same file system, so the final path only ever holds
+        # complete files.
+        os.replace(part_path, file_path)
+        with self._index_lock:
+            index = self.directory_index
+        if index is not None:
+            index.add(file_path)
+        return True
+
+    def mark_downloaded(self, gag: Gag, content_type: ContentType, file_path: Path) -> None:
+        """Record the downloaded file on the gag.
+
+        Args:
+            gag: Gag that was downloaded.
+            content_type: Type of the downloaded content.
+            file_path: Path of the downloaded file.
+        """
+        gag.is_video = content_type == ContentType.VIDEO
+        gag.url = str(file_path)
+
+    def use_existing(self, gag: Gag, content_type: ContentType, file_path: Path) -> None:
+        """Take a file that was downloaded before as the download of a gag.
+
+        Args:
+            gag: Gag that was downloaded before.
+            content_type: Type of the downloaded content.
+            file_path: Path of the downloaded file.
+        """
+        self.logger.info(f"{content_type.name.capitalize()} already downloaded: {file_path.name}")
+        self.mark_downloaded(gag, content_type, file_path)
+
     def _try_download_with_suffix(
-        self, gag: Gag, content_type: ContentType, suffix: str
+        self,
+        gag: Gag,
+        content_type: ContentType,
+        suffix: str,
+        file_path: Optional[Path] = None,
     ) -> bool:
         """Try to download gag with a specific URL suffix.
 
@@ -77,96 +1030,68 @@ class DownloadHandler:
             gag: Gag to download.
             content_type: Type of content to try downloading.
             suffix: URL suffix to try.
+            file_path: Path claimed for the gag. Resolved from the title if not given.
 
         Returns:
             True if download was successful, False otherwise.
         """
-        content_type_name = content_type.name.lower()
-        file_ext = ".mp4" if content_type == ContentType.VIDEO else ".jpg"
-        save_location = (
-            self.VIDEO_SAVE_LOCATION
-            if content_type == ContentType.VIDEO
-            else self.IMAGE_SAVE_LOCATION
-        )
-
-        sanitized_title = self._sanitize_title(gag.title)
-
-        file_path = (
-            Path(self.destination_folder)
-            / save_location
-            / f"{sanitized_title}{file_ext}"
-        )
+        if file_path is None:
+            file_path = self._get_file_path(gag, content_type)
 
         self.logger.info(
-            f"Attempting to download {content_type_name} for gag: {gag.id} - {gag.title}"
+            f"Attempting to download {content_type.name.lower()} for gag: {gag.id} - {gag.title}"
         )
 
-        if file_path.exists():
-            self.logger.info(
-                f"{content_type_name.capitalize()} already downloaded: {file_path.name}"
+        if self.is_downloaded(file_path):
+            self.use_existing(gag, content_type, file_path)
+            return True
+
+        description = f"{content_type.name.lower()} download of {gag.id}"
+        try:
+            return self._with_retries(
+                lambda: self._download_variant(gag, content_type, suffix, file_path),
+                description,
             )
+        except (requests.RequestException, TransientHTTPError, IncompleteDownload) as e:
+            self.log_transfer_error(description, e)
+        return False
 
-            gag.is_video = content_type == ContentType.VIDEO
-            gag.url = str(file_path)
-            return True
+    def _download_variant(
+        self, gag: Gag, content_type: ContentType, suffix: str, file_path: Path
+    ) -> bool:
+        """Download one variant of a gag, resuming a partial download if present.
 
-        content_url = f"{self.BASE_URL}{gag.id}{suffix}"
-        self.logger.info(f"Requesting URL: {content_url}")
+        Args:
+            gag: Gag to download.
+            content_type: Type of content to download.
+            suffix: URL suffix of the variant.
+            file_path: Final path of the file.
 
+        Returns:
+            True if download was successful, False if the variant does not
+            exist or is not valid.
+
+        Raises:
+            requests.RequestException: If the transfer failed.
+            TransientHTTPError: If the CDN answered with a transient error.
+            IncompleteDownload: If the body ended before the announced size.
+        """
+        download = self.begin_variant(gag, content_type, suffix, file_path)
+        response = self._get(download.url, download.prepare())
         try:
-            response = requests.get(content_url, headers=self.HEADERS, timeout=10)
+            action = download.start(response.status_code, response.headers)
+            if action == VariantDownload.RESTART:
+                return self._download_variant(gag, content_type, suffix, file_path)
+            if action == VariantDownload.REJECT:
+                return False
 
-            self.logger.info(
-                f"{content_type_name.capitalize()} download response code: {response.status_code}"
+            written = self._write_chunks(
+                response.iter_content(chunk_size=self.chunk_size), download
             )
-            if response.status_code == 200:
-                content_type_header = response.headers.get("Content-Type", "")
-                self.logger.info(f"Content-Type header: {content_type_header}")
-
-                if content_type == ContentType.VIDEO:
-                    if (
-                        "video" not in content_type_header.lower()
-                        and "mp4" not in content_type_header.lower()
-                    ):
-                        if content_type_header == "text/html":
-                            self.logger.warning(
-                                f"Video URL responded with HTML, likely not a video: {content_url}"
-                            )
-                            return False
-                        self.logger.warning(
-                            f"Video URL responded with non-video content type: {content_type_header}"
-                        )
-
-                        content_length = len(response.content)
-                        if (
-                            content_length < 10000
-                        ):  # Less than 10KB is probably not a valid video
-                            return False
-
-                content_length = len(response.content)
-                self.logger.info(f"Response content length: {content_length} bytes")
-
-                self.logger.info(
-                    f"{content_type_name.capitalize()} downloaded as {file_path.name}"
-                )
-
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-
-                with open(file_path, "wb") as f:
-                    f.write(response.content)
-
-                gag.is_video = content_type == ContentType.VIDEO
-                gag.url = str(file_path)
-                return True
-            else:
-                self.logger.warning(
-                    f"Failed to download {content_type_name}, response code: {response.status_code}"
-                )
-
-        except requests.RequestException as e:
-            self.logger.error(f"Error downloading {content_type_name}: {str(e)}")
-
-        return False
+            self.logger.info(f"Response content length: {written} bytes")
+            return download.finish()
+        finally:
+            response.close()
 
     def _sanitize_title(self, title: str) -> str:
         """Sanitize a title for use in filenames.
@@ -190,18 +1115,38 @@ class DownloadHandler:
         Returns:
             True if download was successful, False otherwise.
         """
-        if content_type == ContentType.VIDEO:
-            if self._try_download_with_suffix(gag, content_type, self.VIDEO_SUFFIX_720):
-                return True
-            if self._try_download_with_suffix(gag, content_type, self.VIDEO_SUFFIX_460):
-                return True
-            return False
-        else:  # ContentType.IMAGE
-            if self._try_download_with_suffix(gag, content_type, self.IMAGE_SUFFIX_700):
-                return True
-            if self._try_download_with_suffix(gag, content_type, self.IMAGE_SUFFIX_460):
+        file_path = self.claim_file_path(gag, content_type)
+        try:
+            if self.is_downloaded(file_path):
+                self.use_existing(gag, content_type, file_path)
                 return True
+
+            for suffix in self.suffix_stats.order_suffixes(content_type.name):
+                if self.probe_variants and not self._probe_variant(gag, content_type, suffix):
+                    continue
+                if self._try_download_with_suffix(gag, content_type, suffix, file_path):
+                    self.suffix_stats.record_hit(content_type.name, suffix)
+                    self.record_download(gag, content_type, suffix, Path(gag.url))
+                    return True
             return False
+        finally:
+            # Held until the catalog knows the file, which then keeps others off it
+            self.release_file_path(gag, file_path)
+
+    def content_type_order(self) -> List[ContentType]:
+        """Get the order content types are tried in, likeliest first.
+
+        Returns:
+            Content types ordered by their observed hit rate.
+        """
+        return [ContentType[name] for name in self.suffix_stats.order_groups()]
+
+    def save_stats(self) -> None:
+        """Persist the variant statistics and log a summary of them."""
+        self.logger.info(self.suffix_stats.summary())
+        self.suffix_stats.save()
+        if self.catalog is not None:
+            self.logger.info(f"Download catalog: {self.catalog.count_by_status()}")
 
     def try_video_download(self, gag: Gag) -> bool:
         """Try to download the gag as a video.
@@ -226,7 +1171,9 @@ class DownloadHandler:
         return self._try_download(gag, ContentType.IMAGE)
 
     def download_gag(self, gag: Gag, destination_folder: str) -> bool:
-        """Download a gag, trying first as video then as image.
+        """Download a gag, trying the likeliest content type first.
+
+        Without any statistics the video is tried before the image.
 
         Args:
             gag: Gag to download.
@@ -239,17 +1186,25 @@ class DownloadHandler:
 
         Path(destination_folder).mkdir(parents=True, exist_ok=True)
 
-        self.logger.info(f"Trying video download first for gag ID: {gag.id}")
-        if self.try_video_download(gag):
-            self.logger.info(f"Successfully downloaded as video: {gag.id}")
+        existing = self.find_existing(gag, destination_folder)
+        if existing is not None:
+            content_type, file_path = existing
+            self.use_existing(gag, content_type, file_path)
             return True
 
-        self.logger.info(
-            f"Video download failed for gag ID: {gag.id}. Trying as image."
-        )
-        if self.try_image_download(gag):
-            self.logger.info(f"Successfully downloaded as image: {gag.id}")
-            return True
+        for content_type in self.content_type_order():
+            content_type_name = content_type.name.lower()
+            self.logger.info(f"Trying {content_type_name} download for gag ID: {gag.id}")
+
+            if content_type == ContentType.VIDEO:
+                success = self.try_video_download(gag)
+            else:
+                success = self.try_image_download(gag)
+
+            if success:
+                self.logger.info(f"Successfully downloaded as {content_type_name}: {gag.id}")
+                return True
 
         self.logger.error(f"Failed to download gag: {gag.full_url}")
+        self.record_failure(gag, "No downloadable variant found")
         return False
@@ -0,0 +1,170 @@
+"""Global rate limiting for requests to the 9GAG CDN.
+
+RateLimiter combines two token buckets, one for requests per second and
+one for bytes per second. All worker threads and asyncio tasks share a
+single limiter, and its limits can be changed while a download runs.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread safe token bucket.
+
+    Callers reserve tokens and get back how long they have to wait for
+    them. Reservations may put the bucket into debt, which keeps large
+    requests (a chunk bigger than the bucket) fair and avoids starvation.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second. None or 0 disables the limit.
+            capacity: Maximum number of tokens. Defaults to one second worth.
+        """
+        self._lock = threading.Lock()
+        self.rate: Optional[float] = None
+        self.capacity = 0.0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(rate, capacity)
+
+    @property
+    def unlimited(self) -> bool:
+        """Whether the bucket lets everything through."""
+        return not self.rate
+
+    def set_rate(self, rate: Optional[float], capacity: Optional[float] = None) -> None:
+        """Change the rate of the bucket.
+
+        Args:
+            rate: Tokens added per second. None or 0 disables the limit.
+            capacity: Maximum number of tokens. Defaults to one second worth.
+        """
+        with self._lock:
+            self._refill()
+            self.rate = rate if rate and rate > 0 else None
+            self.capacity = capacity or (self.rate or 0.0)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update. Requires the lock."""
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket.
+
+        Args:
+            tokens: Number of tokens to take.
+
+        Returns:
+            Seconds the caller has to wait before using the tokens.
+        """
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Shared requests/sec and bytes/sec limiter for the CDN client."""
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+    ):
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_second: Maximum requests per second, None for unlimited.
+            bytes_per_second: Maximum download bandwidth, None for unlimited.
+        """
+        self.requests = TokenBucket()
+        self.bandwidth = TokenBucket()
+        self.set_limits(requests_per_second, bytes_per_second)
+
+    @property
+    def requests_per_second(self) -> Optional[float]:
+        """Current request rate limit, None if unlimited."""
+        return self.requests.rate
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        """Current bandwidth limit, None if unlimited."""
+        return self.bandwidth.rate
+
+    def set_limits(
+        self,
+        requests_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+    ) -> None:
+        """Change both limits. Takes effect for all workers immediately.
+
+        Args:
+            requests_per_second: Maximum requests per second, None for unlimited.
+            bytes_per_second: Maximum download bandwidth, None for unlimited.
+        """
+        self.requests.set_rate(requests_per_second)
+        self.bandwidth.set_rate(bytes_per_second)
+
+    def acquire_request(self) -> None:
+        """Block until another request may be sent."""
+        delay = self.requests.reserve()
+        if delay:
+            time.sleep(delay)
+
+    def acquire_bytes(self, size: int) -> None:
+        """Block until the given number of bytes may be consumed.
+
+        Args:
+            size: Number of bytes read from the network.
+        """
+        delay = self.bandwidth.reserve(size)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_request_async(self) -> None:
+        """Wait without blocking the event loop until another request may be sent."""
+        delay = self.requests.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def acquire_bytes_async(self, size: int) -> None:
+        """Wait without blocking the event loop until the bytes may be consumed.
+
+        Args:
+            size: Number of bytes read from the network.
+        """
+        delay = self.bandwidth.reserve(size)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def describe(self) -> str:
+        """Get a human readable description of the limits.
+
+        Returns:
+            Description for the logs.
+        """
+        requests = (
+            f"{self.requests_per_second:g} requests/s"
+            if self.requests_per_second
+            else "unlimited requests"
+        )
+        bandwidth = (
+            f"{self.bytes_per_second / 1024:g} KB/s"
+            if self.bytes_per_second
+            else "unlimited bandwidth"
+        )
+        return f"{requests}, {bandwidth}"
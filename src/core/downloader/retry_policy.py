@@ -0,0 +1,127 @@
+"""Retry policy for transient CDN failures.
+
+A missing variant (404) is a normal answer and is never retried. Rate
+limiting (429), server errors (5xx), timeouts, dropped connections and
+bodies shorter than announced are transient and are retried with
+exponential backoff and jitter, honouring the Retry-After header when the
+server sends one.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+
+class TransientHTTPError(Exception):
+    """Raised when the CDN answers with a status code worth retrying."""
+
+    def __init__(self, url: str, status_code: int, retry_after: Optional[float] = None):
+        """Initialize the error.
+
+        Args:
+            url: URL that was requested.
+            status_code: HTTP status code of the response.
+            retry_after: Seconds the server asked us to wait, if any.
+        """
+        super().__init__(f"Transient HTTP error {status_code} for {url}")
+        self.url = url
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class IncompleteDownload(Exception):
+    """Raised when a response body is shorter than the size the server announced.
+
+    The partial download is kept, so the retry resumes it with a Range request.
+    """
+
+    def __init__(self, path: str, size: int, expected_size: int):
+        """Initialize the error.
+
+        Args:
+            path: Path of the partial download.
+            size: Number of bytes received so far.
+            expected_size: Full size reported by the server.
+        """
+        super().__init__(f"Incomplete download of {path}: {size} of {expected_size} bytes")
+        self.path = path
+        self.size = size
+        self.expected_size = expected_size
+
+
+@dataclass
+class RetryPolicy:
+    """Settings for retrying transient failures."""
+
+    # Total number of attempts, including the first one
+    max_attempts: int = 3
+
+    # Backoff before the second attempt, doubled for every further attempt
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    # Fraction of the backoff that is randomized to spread out retries
+    jitter: float = 0.5
+
+    # Longest Retry-After we are willing to honour
+    max_retry_after: float = 120.0
+
+    retry_statuses: FrozenSet[int] = field(
+        default_factory=lambda: frozenset({408, 425, 429, 500, 502, 503, 504})
+    )
+
+    def is_transient_status(self, status_code: int) -> bool:
+        """Check whether a status code is worth retrying.
+
+        Args:
+            status_code: HTTP status code.
+
+        Returns:
+            True if the request should be retried.
+        """
+        return status_code in self.retry_statuses
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Get the time to wait before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed, starting at 1.
+            retry_after: Seconds the server asked us to wait, if any.
+
+        Returns:
+            Delay in seconds.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = backoff * (1 - self.jitter * random.random())
+
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header.
+
+        Args:
+            value: Header value, either seconds or an HTTP date.
+
+        Returns:
+            Seconds to wait, or None if the header is missing or invalid.
+        """
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,154 @@
+"""Hit-rate statistics for the CDN URL suffixes.
+
+Every gag exists in only some of the variants (720p video, 460p video,
+700px image, ...). SuffixStats counts which variant each downloaded gag
+was found in, so the handler can try the likeliest variant first instead
+of always walking the fixed default order.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# A variant is identified by its group (content type name) and URL suffix
+Variant = Tuple[str, str]
+
+
+class SuffixStats:
+    """Thread safe hit counters per variant with adaptive ordering."""
+
+    def __init__(self, variants: Sequence[Variant], stats_file: Optional[Union[str, Path]] = None):
+        """Initialize the statistics.
+
+        Args:
+            variants: All variants in their default order.
+            stats_file: Optional JSON file the counters are loaded from and saved to.
+        """
+        self.default_order: List[Variant] = list(variants)
+        self.stats_file = Path(stats_file) if stats_file else None
+
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {suffix: 0 for _, suffix in self.default_order}
+        self.probes_made = 0
+        self.probes_saved = 0
+
+        if self.stats_file:
+            self.load()
+
+    def _sorted(self, variants: Sequence[Variant]) -> List[Variant]:
+        """Sort variants by hit count, keeping the default order for ties."""
+        return sorted(variants, key=lambda variant: -self.hits.get(variant[1], 0))
+
+    def order_groups(self) -> List[str]:
+        """Get the groups ordered by their total hit count.
+
+        Returns:
+            Group names, likeliest first.
+        """
+        with self._lock:
+            totals: Dict[str, int] = {}
+            for group, suffix in self.default_order:
+                totals[group] = totals.get(group, 0) + self.hits.get(suffix, 0)
+            return sorted(totals, key=lambda group: -totals[group])
+
+    def order_suffixes(self, group: str) -> List[str]:
+        """Get the suffixes of a group ordered by hit count.
+
+        Args:
+            group: Group to get the suffixes for.
+
+        Returns:
+            Suffixes, likeliest first.
+        """
+        with self._lock:
+            variants = [variant for variant in self.default_order if variant[0] == group]
+            return [suffix for _, suffix in self._sorted(variants)]
+
+    def variant_order(self) -> List[Variant]:
+        """Get the order all variants are currently tried in.
+
+        Returns:
+            Variants grouped by group, likeliest group and suffix first.
+        """
+        order: List[Variant] = []
+        for group in self.order_groups():
+            order.extend((group, suffix) for suffix in self.order_suffixes(group))
+        return order
+
+    def record_probe(self) -> None:
+        """Count a request made to find out whether a variant exists."""
+        with self._lock:
+            self.probes_made += 1
+
+    def record_hit(self, group: str, suffix: str) -> None:
+        """Record that a gag was found in a variant.
+
+        Also accounts how many probes the current order saved compared to
+        the default order for this gag.
+
+        Args:
+            group: Group of the variant.
+            suffix: Suffix of the variant.
+        """
+        variant = (group, suffix)
+        actual_position = self.variant_order().index(variant)
+        with self._lock:
+            self.probes_saved += self.default_order.index(variant) - actual_position
+            self.hits[suffix] = self.hits.get(suffix, 0) + 1
+
+    def hit_rates(self) -> Dict[str, float]:
+        """Get the share of found gags per suffix.
+
+        Returns:
+            Mapping of suffix to hit rate between 0 and 1.
+        """
+        with self._lock:
+            total = sum(self.hits.values())
+            return {suffix: (hits / total if total else 0.0) for suffix, hits in self.hits.items()}
+
+    def summary(self) -> str:
+        """Get a one line summary for the logs.
+
+        Returns:
+            Human readable summary of the counters.
+        """
+        rates = ", ".join(f"{suffix}: {rate:.0%}" for suffix, rate in self.hit_rates().items())
+        return (
+            f"Variant hit rates: {rates}; probes made: {self.probes_made}, "
+            f"probes saved by ordering: {self.probes_saved}"
+        )
+
+    def load(self) -> None:
+        """Load the hit counters from the stats file, ignoring unreadable files."""
+        if not self.stats_file or not self.stats_file.exists():
+            return
+
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                for suffix, hits in data.get("hits", {}).items():
+                    if suffix in self.hits:
+                        self.hits[suffix] = int(hits)
+        except (OSError, ValueError):
+            pass
+
+    def save(self) -> bool:
+        """Save the hit counters to the stats file.
+
+        Returns:
+            True if the counters were saved, False otherwise.
+        """
+        if not self.stats_file:
+            return False
+
+        try:
+            with self._lock:
+                data = {"hits": dict(self.hits)}
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.stats_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            return True
+        except OSError:
+            return False
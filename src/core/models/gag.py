@@ -1,17 +1,67 @@
 """Gag data model."""
 
-from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 
-@dataclass
 class Gag:
-    """Data model for a 9GAG post."""
+    """Data model for a 9GAG post.
 
-    id: str
-    title: str
-    url: Optional[str] = None
-    is_video: Optional[bool] = None
+    Exports can hold hundreds of thousands of gags, so the attributes live
+    in __slots__ instead of a per-instance __dict__. Equality and repr work
+    like those of a dataclass with the same fields.
+    """
+
+    __slots__ = ("id", "title", "url", "is_video", "section", "sources")
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        url: Optional[str] = None,
+        is_video: Optional[bool] = None,
+        section: Optional[str] = None,
+        sources: Tuple[str, ...] = (),
+    ):
+        """Initialize the gag.
+
+        Args:
+            id: Gag id, the last part of the gag URL.
+            title: Title of the gag.
+            url: Path of the downloaded file, set once the gag is downloaded.
+            is_video: Whether the downloaded file is a video.
+            section: Section of the data export the gag was found in, such
+                as "Upvotes".
+            sources: Every section and export file the gag was found in.
+                The deduplicator adds the tags of later duplicates, also
+                after the gag was passed on.
+        """
+        self.id = id
+        self.title = title
+        self.url = url
+        self.is_video = is_video
+        self.section = section
+        self.sources = sources
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        """Get the field values in declaration order."""
+        return (self.id, self.title, self.url, self.is_video, self.section, self.sources)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all fields with another gag."""
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()  # type: ignore[attr-defined]
+
+    # Mutable like the dataclass it replaces, so not hashable
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Represent the gag with all its fields."""
+        return (
+            f"{self.__class__.__name__}(id={self.id!r}, title={self.title!r}, "
+            f"url={self.url!r}, is_video={self.is_video!r}, section={self.section!r}, "
+            f"sources={self.sources!r})"
+        )
 
     @property
     def full_url(self) -> str:
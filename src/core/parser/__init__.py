@@ -1,5 +1,29 @@
-"""Parser module for extracting gag data from HTML."""
+"""Parser module for extracting gag data from HTML.
 
-from .html_parser import HtmlParser
+The classes are imported on first access, so importing the package does
+not load BeautifulSoup.
+"""
 
-__all__ = ["HtmlParser"]
+from typing import TYPE_CHECKING
+
+from src.utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .deduplicator import GagDeduplicator
+    from .fast_scanner import FastScanner
+    from .html_parser import HtmlParser
+    from .parse_cache import ParseCache
+    from .stream_parser import StreamingHtmlParser
+
+__all__ = ["FastScanner", "GagDeduplicator", "HtmlParser", "ParseCache", "StreamingHtmlParser"]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "FastScanner": ".fast_scanner",
+        "GagDeduplicator": ".deduplicator",
+        "HtmlParser": ".html_parser",
+        "ParseCache": ".parse_cache",
+        "StreamingHtmlParser": ".stream_parser",
+    },
+)
@@ -0,0 +1,59 @@
+"""De-duplication of gags across sections and data exports.
+
+A gag that is both upvoted and saved, or that appears in several merged
+exports, is listed more than once. GagDeduplicator passes every gag id
+through once, in a single pass over the input. Where the duplicates were
+found is kept in the sources of the gag that is passed on.
+"""
+
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from src.core.models import Gag
+
+
+class GagDeduplicator:
+    """Lets every gag id through once, merging the source tags of duplicates."""
+
+    def __init__(self):
+        """Initialize the deduplicator."""
+        # First gag seen for every id
+        self._seen: Dict[str, Gag] = {}
+        self.duplicates = 0
+
+    @staticmethod
+    def _merge(sources: Tuple[str, ...], *tags: Optional[str]) -> Tuple[str, ...]:
+        """Add tags to a tuple of source tags, skipping known and empty ones."""
+        for tag in tags:
+            if tag and tag not in sources:
+                sources += (tag,)
+        return sources
+
+    def filter(self, gags: Iterable[Gag], source: Optional[str] = None) -> Iterator[Gag]:
+        """Pass on the gags whose id was not seen before.
+
+        Gags are passed on as soon as they are read, so the input can still
+        be parsed while the first gags are downloaded. The section and source
+        of a duplicate are added to the sources of the gag passed on first,
+        even if that one was already processed.
+
+        Args:
+            gags: Gags to filter, usually the gags of one export.
+            source: Tag for where the gags come from, such as the export file name.
+
+        Yields:
+            Gags with ids not seen before, tagged with their section and source.
+        """
+        seen = self._seen
+        for gag in gags:
+            first = seen.get(gag.id)
+            if first is None:
+                gag.sources = self._merge(gag.sources, gag.section, source)
+                seen[gag.id] = gag
+                yield gag
+            else:
+                self.duplicates += 1
+                first.sources = self._merge(first.sources, *gag.sources, gag.section, source)
+
+    def __len__(self) -> int:
+        """Get the number of distinct gag ids seen."""
+        return len(self._seen)
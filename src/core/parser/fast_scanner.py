@@ -0,0 +1,239 @@
+"""Regex based fast path for well-formed 9GAG data exports.
+
+The export is very regular: every gag is a row like
+<tr><td>date</td><td><a href=".../gag/ID">...</a></td><td>title</td></tr>.
+FastScanner pulls the ids and titles straight out of the raw bytes with
+precompiled patterns, decoding only the fields it keeps.
+
+The scanner only handles the shape it knows. Markup it does not expect
+inside a section table (nested tags, unclosed cells, headers with markup,
+comments or scripts near the sections, ...) makes it give up, and the
+caller falls back to a full parser. The first rows of every table are
+also checked against the BeautifulSoup parser before the result is used.
+"""
+
+import html
+import re
+from typing import Callable, Dict, Iterable, List, Match, Optional, Sequence, Tuple
+
+from src.core.models import Gag
+
+# Parses an HTML snippet holding one table with the reference parser
+TableVerifier = Callable[[str, str], List[Gag]]
+
+# Section headers and table starts, in document order
+_TOKEN = re.compile(rb"<h3\b[^>]*>(.*?)</h3\s*>|<table\b[^>]*>", re.IGNORECASE | re.DOTALL)
+_TABLE_END = re.compile(rb"</table\s*>", re.IGNORECASE)
+_HEADER_START = re.compile(rb"<h3\b", re.IGNORECASE)
+
+# Raw text and comments, whose content a regex cannot tell from markup
+_RAW_TEXT = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<(script|style|textarea)\b.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_MARKUP = re.compile(rb"<\s*/?\s*(?:h3|table|tr|td)\b", re.IGNORECASE)
+
+# A gag row: date, link to the gag and title, optionally followed by more plain cells
+_GAG_ROW = (
+    rb"<tr\b[^>]*>\s*<td\b[^>]*>[^<]*</td>\s*"
+    rb"<td\b[^>]*>\s*<a\s(?:[^>]*\s)?href\s*=\s*\"([^\"<]*)\"[^>]*>[^<]*</a\s*>\s*</td>\s*"
+    rb"<td\b[^>]*>([^<]*)</td>\s*(?:<td\b[^>]*>[^<]*</td>\s*)*</tr\s*>"
+)
+_HEADER_ROW = rb"<tr\b[^>]*>\s*(?:<th\b[^>]*>[^<]*</th>\s*)*</tr\s*>"
+_ROW = re.compile(_GAG_ROW, re.IGNORECASE)
+
+# Everything a section table of the expected shape may hold
+_TABLE_BODY = re.compile(
+    rb"(?:" + _GAG_ROW + rb"|\s+|" + _HEADER_ROW + rb"|</?(?:thead|tbody|tfoot)\b[^>]*>)*",
+    re.IGNORECASE,
+)
+# In a table of that shape, row ends only occur between rows
+_ROW_END = re.compile(rb"</tr\s*>", re.IGNORECASE)
+
+
+class ShapeMismatch(Exception):
+    """The document does not have the shape the scanner expects."""
+
+
+class FastScanner:
+    """Extracts gags from well-formed exports with precompiled patterns."""
+
+    # Rows per table that are checked against the reference parser
+    VERIFY_ROWS = 25
+
+    # Bytes of a table checked against its pattern at a time. The regex engine
+    # keeps state for every row it matched, so whole tables are not matched at once.
+    CHECK_BYTES = 256 * 1024
+
+    @classmethod
+    def scan(
+        cls,
+        data: bytes,
+        sections: Sequence[str],
+        verify: Optional[TableVerifier] = None,
+    ) -> Optional[List[Gag]]:
+        """Extract the gags of the requested sections.
+
+        Args:
+            data: Raw UTF-8 bytes of the export. Any bytes-like object works,
+                such as an mmap.
+            sections: Section headers to extract, such as "Upvotes" and "Saved".
+            verify: Optional reference parser. The first rows of every table
+                must give the same gags with it.
+
+        Returns:
+            Gags tagged with their section in the order of sections, or None
+            if the document does not have the expected shape.
+        """
+        rows = cls._scan_rows(data, sections, verify)
+        if rows is None:
+            return None
+        return [
+            Gag(id=gag_id, title=title, section=section)
+            for section in sections
+            for gag_id, title in rows.get(section, [])
+        ]
+
+    @classmethod
+    def _scan_rows(
+        cls, data: bytes, sections: Sequence[str], verify: Optional[TableVerifier]
+    ) -> Optional[Dict[str, List[Tuple[str, str]]]]:
+        """Extract the id and title of every gag by section, None on a shape mismatch."""
+        try:
+            return cls._scan(data, sections, verify)
+        except (ShapeMismatch, UnicodeDecodeError):
+            return None
+
+    @classmethod
+    def _scan(
+        cls, data: bytes, sections: Sequence[str], verify: Optional[TableVerifier]
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """Extract the gag rows, raising ShapeMismatch on unexpected markup."""
+        for raw_text in _RAW_TEXT.finditer(data):
+            if _MARKUP.search(raw_text.group(0)):
+                raise ShapeMismatch("Markup hidden in a comment or raw text element")
+
+        found: Dict[str, List[Tuple[str, str]]] = {}
+        waiting: List[str] = []
+        seen = set()
+        position = 0
+
+        while len(found) < len(sections):
+            token = _TOKEN.search(data, position)
+            if token is None:
+                break
+            position = token.end()
+
+            header = token.group(1)
+            if header is not None:
+                if b"<" in header:
+                    raise ShapeMismatch("Section header with markup")
+                section = cls._text(header)
+                if section in sections and section not in seen:
+                    seen.add(section)
+                    waiting.append(section)
+                continue
+
+            # A table start, which belongs to the sections waiting for it
+            end = _TABLE_END.search(data, position)
+            if end is None:
+                raise ShapeMismatch("Unclosed table")
+            body_end = end.start()
+            if waiting:
+                cls._check_table(data, position, body_end)
+                rows = cls._read_rows(_ROW.finditer(data, position, body_end))
+                if verify is not None:
+                    cls._verify(data, token.group(0), position, body_end, rows, waiting, verify)
+                for section in waiting:
+                    found[section] = rows
+                waiting = []
+            elif _HEADER_START.search(data, position, body_end):
+                # The table may hold a nested table that a header inside it selects
+                raise ShapeMismatch("Section header inside a table")
+            position = end.end()
+
+        return found
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        """Decode raw bytes, translating line endings like a text-mode read."""
+        text = raw.decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    @classmethod
+    def _text(cls, raw: bytes) -> str:
+        """Decode raw text, resolving character references like html.parser."""
+        text = cls._decode(raw)
+        return html.unescape(text) if "&" in text else text
+
+    @classmethod
+    def _check_table(cls, data: bytes, start: int, end: int) -> None:
+        """Check that a table only holds the expected rows.
+
+        The table is matched in slices that end after a row, which together
+        match exactly when the whole table does.
+
+        Args:
+            data: Raw bytes of the export.
+            start: Offset right after the <table> tag.
+            end: Offset of the </table> tag.
+        """
+        while start < end:
+            row_end = _ROW_END.search(data, min(start + cls.CHECK_BYTES, end), end)
+            slice_end = row_end.end() if row_end else end
+            if not _TABLE_BODY.fullmatch(data, start, slice_end):
+                raise ShapeMismatch("Unexpected markup in a section table")
+            start = slice_end
+
+    @classmethod
+    def _read_rows(cls, rows: Iterable[Match[bytes]]) -> List[Tuple[str, str]]:
+        """Read the id and title of every gag row, like HtmlParser.get_gags_from_table.
+
+        Args:
+            rows: Matches of the gag rows, holding the raw href and title.
+
+        Returns:
+            Id and title of every row that holds a gag.
+        """
+        gags = []
+        for row in rows:
+            href, title = row.groups()
+            gag_id = cls._text(href).split("/")[-1]
+            if gag_id:
+                text = cls._text(title)
+                gags.append((gag_id, text.strip() if text else "No Title"))
+        return gags
+
+    @classmethod
+    def _verify(
+        cls,
+        data: bytes,
+        table_tag: bytes,
+        start: int,
+        end: int,
+        rows: List[Tuple[str, str]],
+        sections: Sequence[str],
+        verify: TableVerifier,
+    ) -> None:
+        """Check the first rows of a table against the reference parser.
+
+        Args:
+            data: Raw bytes of the export.
+            table_tag: The <table> start tag.
+            start: Offset right after the <table> tag.
+            end: Offset of the </table> tag.
+            rows: Id and title of every gag of the table.
+            sections: Sections the table belongs to.
+            verify: Reference parser.
+        """
+        sample_end = start
+        for _, row in zip(range(cls.VERIFY_ROWS), _ROW.finditer(data, start, end)):
+            sample_end = row.end()
+        snippet = cls._decode(table_tag + data[start:sample_end] + b"</table>")
+
+        expected = cls._read_rows(_ROW.finditer(data, start, sample_end))
+        reference = [(gag.id, gag.title) for gag in verify(snippet, sections[0])]
+        if reference != expected or rows[: len(expected)] != expected:
+            raise ShapeMismatch("Result differs from the reference parser")
@@ -1,16 +1,28 @@
 """HTML parser using BeautifulSoup to extract gag information."""
 
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from src.core.models import Gag
 
+from .deduplicator import GagDeduplicator
+from .fast_scanner import FastScanner
+from .mapped_file import iter_text, map_file
+from .parse_cache import ParseCache
+from .stream_parser import StreamingHtmlParser
+
 
 class HtmlParser:
     """Parser for 9GAG HTML data exports."""
 
+    UPVOTES_SECTION = "Upvotes"
+    SAVED_SECTION = "Saved"
+
+    # Bytes of the export decoded per streaming step
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     @staticmethod
     def read_html_file(file_path: str) -> BeautifulSoup:
         """Read an HTML file and return a BeautifulSoup object.
@@ -26,11 +38,14 @@ class HtmlParser:
         return soup
 
     @classmethod
-    def get_gags_from_table(cls, table: BeautifulSoup) -> List[Gag]:
+    def get_gags_from_table(
+        cls, table: BeautifulSoup, section: Optional[str] = None
+    ) -> List[Gag]:
         """Extract gag details from a table element.
 
         Args:
             table: BeautifulSoup table element.
+            section: Section header the table belongs to, stored on the gags.
 
         Returns:
             List of Gag objects.
@@ -51,10 +66,68 @@ class HtmlParser:
                 title = columns[2].text.strip() if columns[2].text else "No Title"
 
                 if gag_id:
-                    gags.append(Gag(id=gag_id, title=title))
+                    gags.append(Gag(id=gag_id, title=title, section=section))
 
         return gags
 
+    @classmethod
+    def get_sections(cls, upvoted_gags: bool = False, saved_gags: bool = False) -> List[str]:
+        """Get the section headers to extract, in the order their gags are returned.
+
+        Args:
+            upvoted_gags: Whether to extract upvoted gags.
+            saved_gags: Whether to extract saved gags.
+
+        Returns:
+            List of section headers.
+        """
+        sections = []
+        if upvoted_gags:
+            sections.append(cls.UPVOTES_SECTION)
+        if saved_gags:
+            sections.append(cls.SAVED_SECTION)
+        return sections
+
+    @classmethod
+    def extract_sections(cls, soup: BeautifulSoup, sections: Sequence[str]) -> List[Gag]:
+        """Extract the gags of several sections in a single pass over the document.
+
+        The first <h3> whose text is a section name selects the next <table>.
+        Headers and tables are found in the same traversal, which stops once
+        every requested section has its table.
+
+        Args:
+            soup: BeautifulSoup object.
+            sections: Section headers to extract, such as "Upvotes" and "Saved".
+
+        Returns:
+            List of Gag objects tagged with their section, in the order of sections.
+        """
+        tables: Dict[str, Tag] = {}
+        waiting: List[str] = []
+        seen = set()
+
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            if element.name == "h3":
+                section = element.string
+                if section in sections and section not in seen:
+                    seen.add(section)
+                    waiting.append(section)
+            elif element.name == "table" and waiting:
+                for section in waiting:
+                    tables[section] = element
+                waiting = []
+                if len(tables) == len(sections):
+                    break
+
+        gags: List[Gag] = []
+        for section in sections:
+            if section in tables:
+                gags.extend(cls.get_gags_from_table(tables[section], section))
+        return gags
+
     @classmethod
     def extract_gags(
         cls, soup: BeautifulSoup, upvoted_gags: bool = False, saved_gags: bool = False
@@ -69,27 +142,225 @@ class HtmlParser:
         Returns:
             List of Gag objects.
         """
-        gags = []
+        return cls.extract_sections(soup, cls.get_sections(upvoted_gags, saved_gags))
 
-        if upvoted_gags:
-            upvotes_headers = soup.find_all("h3", text="Upvotes")
-            if upvotes_headers and len(upvotes_headers) > 0:
-                up_votes_table = upvotes_headers[0].find_next("table")
-                if up_votes_table:
-                    gags.extend(cls.get_gags_from_table(up_votes_table))
+    @classmethod
+    def _parse_table_html(cls, table_html: str, section: str) -> List[Gag]:
+        """Parse an HTML snippet holding one table with BeautifulSoup.
 
-        if saved_gags:
-            saved_headers = soup.find_all("h3", text="Saved")
-            if saved_headers and len(saved_headers) > 0:
-                saved_table = saved_headers[0].find_next("table")
-                if saved_table:
-                    gags.extend(cls.get_gags_from_table(saved_table))
+        Args:
+            table_html: HTML of the table.
+            section: Section header the table belongs to.
 
-        return gags
+        Returns:
+            List of Gag objects.
+        """
+        table = BeautifulSoup(table_html, "html.parser").find("table")
+        return cls.get_gags_from_table(table, section) if table else []
+
+    @classmethod
+    def scan_file(cls, file_path: str, sections: Sequence[str]) -> Optional[List[Gag]]:
+        """Extract gags with the regex fast path.
+
+        The file is memory-mapped rather than read, and the first rows of
+        every table are checked against BeautifulSoup.
+
+        Args:
+            file_path: Path to the HTML file.
+            sections: Section headers to extract.
+
+        Returns:
+            List of Gag objects, or None if the file does not have the shape
+            the fast path expects and must be parsed in full.
+        """
+        with map_file(file_path) as data:
+            return FastScanner.scan(data, sections, verify=cls._parse_table_html)
+
+    @classmethod
+    def stream_file(
+        cls,
+        file_path: str,
+        upvoted_gags: bool = False,
+        saved_gags: bool = False,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[Gag]:
+        """Parse a 9GAG HTML file in chunks, yielding gags as they are found.
+
+        The file is memory-mapped and decoded chunk by chunk. No document
+        tree is built, and reading stops once the requested sections are
+        done. Yields the same gags as parse_file.
+
+        Args:
+            file_path: Path to the HTML file.
+            upvoted_gags: Whether to extract upvoted gags.
+            saved_gags: Whether to extract saved gags.
+            chunk_size: Bytes decoded per step.
+
+        Yields:
+            Gag objects, upvoted ones first.
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        sections = cls.get_sections(upvoted_gags, saved_gags)
+        if not sections:
+            return
+
+        parser = StreamingHtmlParser(sections)
+        with map_file(file_path) as data:
+            for chunk in iter_text(data, chunk_size):
+                parser.feed(chunk)
+                yield from parser.pop_gags()
+                if parser.finished:
+                    break
+        parser.close()
+        yield from parser.pop_gags()
+
+    @classmethod
+    def _iter_file(
+        cls,
+        file_path: str,
+        upvoted_gags: bool,
+        saved_gags: bool,
+        cache: Optional[ParseCache],
+        fast: bool,
+    ) -> Iterator[Gag]:
+        """Yield the gags of a file from the cache, the fast path or the stream.
+
+        Args:
+            file_path: Path to the HTML file.
+            upvoted_gags: Whether to extract upvoted gags.
+            saved_gags: Whether to extract saved gags.
+            cache: Optional parse cache. Only a fully consumed stream is stored.
+            fast: Whether to try the regex fast path before streaming.
+
+        Yields:
+            Gag objects, upvoted ones first.
+        """
+        sections = cls.get_sections(upvoted_gags, saved_gags)
+        if cache is not None:
+            cached = cache.get(file_path, sections)
+            if cached is not None:
+                yield from cached
+                return
+
+        scanned = cls.scan_file(file_path, sections) if fast and sections else None
+        if scanned is not None:
+            if cache is not None:
+                cache.put(file_path, sections, scanned)
+            yield from scanned
+            return
+
+        parsed = []
+        for gag in cls.stream_file(file_path, upvoted_gags, saved_gags):
+            parsed.append(gag)
+            yield gag
+        if cache is not None:
+            cache.put(file_path, sections, parsed)
+
+    @classmethod
+    def iter_gags(
+        cls,
+        file_path: str,
+        upvoted_gags: bool = False,
+        saved_gags: bool = False,
+        cache: Optional[ParseCache] = None,
+        fast: bool = False,
+    ) -> Iterator[Gag]:
+        """Get an iterator over the gags of a 9GAG HTML file.
+
+        The file is parsed lazily while the iterator is consumed, so gags can
+        be downloaded before the whole export is read. The total number of
+        gags is only known once the iterator is exhausted.
+
+        Args:
+            file_path: Path to the HTML file.
+            upvoted_gags: Whether to extract upvoted gags.
+            saved_gags: Whether to extract saved gags.
+            cache: Optional parse cache. A fully consumed iterator is stored in it.
+            fast: Whether to try the regex fast path first. It scans the
+                whole file before the first gag, which is still quicker than
+                streaming it.
+
+        Returns:
+            Iterator of Gag objects, upvoted ones first.
+
+        Raises:
+            FileNotFoundError: If the file does not exist. Raised right away,
+                not on the first iteration.
+        """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if cache is None and not fast:
+            return cls.stream_file(file_path, upvoted_gags, saved_gags)
+        return cls._iter_file(file_path, upvoted_gags, saved_gags, cache, fast)
+
+    @classmethod
+    def iter_exports(
+        cls,
+        file_paths: Sequence[str],
+        upvoted_gags: bool = False,
+        saved_gags: bool = False,
+        cache: Optional[ParseCache] = None,
+        fast: bool = False,
+        deduplicator: Optional[GagDeduplicator] = None,
+    ) -> Iterator[Gag]:
+        """Get an iterator over the gags of several exports, every gag id once.
+
+        Gags found in several sections or files are passed on the first time.
+        The section and file name of every later copy are added to the sources
+        of that gag, so they are complete once the iterator is exhausted.
+
+        Args:
+            file_paths: Paths to the HTML files, read in this order.
+            upvoted_gags: Whether to extract upvoted gags.
+            saved_gags: Whether to extract saved gags.
+            cache: Optional parse cache, see iter_gags.
+            fast: Whether to try the regex fast path first, see iter_gags.
+            deduplicator: Deduplicator to use, for example to read the number
+                of dropped duplicates afterwards.
+
+        Returns:
+            Iterator of Gag objects.
+
+        Raises:
+            FileNotFoundError: If one of the files does not exist. Raised right
+                away, not on the first iteration.
+        """
+        for file_path in file_paths:
+            if not Path(file_path).exists():
+                raise FileNotFoundError(f"File not found: {file_path}")
+
+        if deduplicator is None:
+            deduplicator = GagDeduplicator()
+        return cls._iter_exports(file_paths, upvoted_gags, saved_gags, cache, fast, deduplicator)
+
+    @classmethod
+    def _iter_exports(
+        cls,
+        file_paths: Sequence[str],
+        upvoted_gags: bool,
+        saved_gags: bool,
+        cache: Optional[ParseCache],
+        fast: bool,
+        deduplicator: GagDeduplicator,
+    ) -> Iterator[Gag]:
+        """Yield the gags of several exports through a deduplicator."""
+        for file_path in file_paths:
+            gags = cls.iter_gags(file_path, upvoted_gags, saved_gags, cache, fast)
+            yield from deduplicator.filter(gags, source=Path(file_path).name)
 
     @classmethod
     def parse_file(
-        cls, file_path: str, upvoted_gags: bool = False, saved_gags: bool = False
+        cls,
+        file_path: str,
+        upvoted_gags: bool = False,
+        saved_gags: bool = False,
+        streaming: bool = False,
+        cache: Optional[ParseCache] = None,
+        fast: bool = False,
     ) -> List[Gag]:
         """Parse a 9GAG HTML file and extract gags.
 
@@ -97,6 +368,11 @@ class HtmlParser:
             file_path: Path to the HTML file.
             upvoted_gags: Whether to extract upvoted gags.
             saved_gags: Whether to extract saved gags.
+            streaming: Whether to use the streaming parser instead of building
+                a BeautifulSoup tree. Much lighter on large exports.
+            cache: Optional parse cache to load the gags from and store them in.
+            fast: Whether to try the regex fast path first. Falls back to the
+                other parsers if the file does not have the expected shape.
 
         Returns:
             List of Gag objects.
@@ -105,5 +381,19 @@ class HtmlParser:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        soup = cls.read_html_file(str(file_path))
-        return cls.extract_gags(soup, upvoted_gags, saved_gags)
+        sections = cls.get_sections(upvoted_gags, saved_gags)
+        if cache is not None:
+            cached = cache.get(file_path, sections)
+            if cached is not None:
+                return cached
+
+        gags = cls.scan_file(str(file_path), sections) if fast and sections else None
+        if gags is None and streaming:
+            gags = list(cls.stream_file(str(file_path), upvoted_gags, saved_gags))
+        elif gags is None:
+            soup = cls.read_html_file(str(file_path))
+            gags = cls.extract_sections(soup, sections)
+
+        if cache is not None:
+            cache.put(file_path, sections, gags)
+        return gags
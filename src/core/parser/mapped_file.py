@@ -0,0 +1,101 @@
+"""Memory-mapped input for the export parsers.
+
+Data exports can be hundreds of megabytes. Instead of reading them into a
+Python str, the fast scanner and the streaming parser work on a read-only
+memory map of the file. The pages belong to the operating system's file
+cache: they are loaded on demand and can be dropped again under memory
+pressure, so the private memory of the process does not grow with the
+size of the export.
+"""
+
+import codecs
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+PathLike = Union[str, Path]
+
+# What map_file gives access to: an mmap, or bytes for empty or unmappable files
+Buffer = Union[mmap.mmap, bytes]
+
+# Decoded bytes after which iter_text hands the pages behind it back to the kernel
+RELEASE_BYTES = 8 * 1024 * 1024
+
+
+@contextmanager
+def map_file(file_path: PathLike) -> Iterator[Buffer]:
+    """Map a file into memory read-only.
+
+    Args:
+        file_path: Path of the file.
+
+    Yields:
+        The mapped file contents. Empty files, which cannot be mapped, and
+        files on file systems without mmap support are read as bytes.
+    """
+    with open(file_path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            yield b""
+            return
+
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield fp.read()
+            return
+
+        with mapped:
+            # The parsers read front to back, so let the kernel read ahead
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+
+
+def release_pages(data: Buffer, end: int) -> None:
+    """Drop the pages of a memory map before an offset from the process.
+
+    The pages stay in the file cache and are mapped in again if they are
+    read later, but no longer count towards the memory of the process.
+
+    Args:
+        data: Bytes or a memory map. Nothing is done for bytes.
+        end: Offset up to which the pages are released, rounded down to a page.
+    """
+    if not isinstance(data, mmap.mmap) or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    end -= end % mmap.PAGESIZE
+    if end > 0:
+        data.madvise(mmap.MADV_DONTNEED, 0, end)
+
+
+def iter_text(data: Buffer, chunk_size: int, encoding: str = "utf-8") -> Iterator[str]:
+    """Decode a buffer piece by piece.
+
+    Characters split between chunks are decoded once complete, and line
+    endings are translated to "\\n" like a file opened in text mode.
+    Pages of a memory map are released once decoded, so only the part
+    around the current position stays resident.
+
+    Args:
+        data: Bytes or a memory map.
+        chunk_size: Bytes decoded per step.
+        encoding: Encoding of the data.
+
+    Yields:
+        The decoded text, one chunk at a time.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    released = 0
+    for start in range(0, len(data), chunk_size):
+        if start - released >= RELEASE_BYTES:
+            release_pages(data, start)
+            released = start
+        text = decoder.decode(data[start : start + chunk_size])
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
@@ -0,0 +1,227 @@
+"""On-disk cache of parsed data exports.
+
+Parsing a large export takes seconds, while the same file is usually run
+again and again while a job is retried. ParseCache stores the extracted
+gags of each export and section selection as gzipped JSON. An entry is
+valid while the file keeps its size and modification time. If only the
+modification time changed, the content hash decides. The cache is bounded
+in size, and the least recently used entries are evicted first.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from src.core.models import Gag
+from src.utils.helpers import file_hash
+from src.utils.logging import Logger
+
+PathLike = Union[str, Path]
+
+
+class ParseCache:
+    """Size bounded cache of the gags extracted from data exports."""
+
+    # Bump when the stored format or the parsing results change
+    VERSION = 1
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    SUFFIX = ".json.gz"
+
+    def __init__(
+        self,
+        cache_dir: PathLike,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        logger: Optional[Logger] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Folder the entries are stored in. Created when needed.
+            max_bytes: Maximum total size of the entries on disk.
+            logger: Optional logger for hits, misses and evictions.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.logger = logger
+
+    def _log(self, message: str) -> None:
+        """Log an info message if a logger is set."""
+        if self.logger:
+            self.logger.info(message)
+
+    def _warn(self, message: str) -> None:
+        """Log a warning message if a logger is set."""
+        if self.logger:
+            self.logger.warning(message)
+
+    def _entry_path(self, file_path: PathLike, sections: Sequence[str]) -> Path:
+        """Get the cache file of an export and section selection."""
+        key = json.dumps([os.path.abspath(file_path), list(sections)])
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{name}{self.SUFFIX}"
+
+    def _read_entry(self, entry_path: Path) -> Optional[Dict[str, Any]]:
+        """Read a cache entry, dropping it if it is damaged."""
+        try:
+            with gzip.open(entry_path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError):
+            self._log(f"Dropping damaged parse cache entry {entry_path.name}")
+            self._remove(entry_path)
+            return None
+
+    @staticmethod
+    def _remove(entry_path: Path) -> None:
+        """Delete a cache entry if it still exists and can be deleted."""
+        try:
+            entry_path.unlink()
+        except OSError:
+            pass
+
+    def get(self, file_path: PathLike, sections: Sequence[str]) -> Optional[List[Gag]]:
+        """Get the cached gags of an export.
+
+        A cache that cannot be read, for example because its folder is not
+        writable, is a miss. Parsing never fails because of the cache.
+
+        Args:
+            file_path: Path of the export.
+            sections: Section headers that were extracted.
+
+        Returns:
+            The gags, or None on a cache miss.
+        """
+        name = Path(file_path).name
+        entry_path = self._entry_path(file_path, sections)
+        try:
+            entry = self._read_entry(entry_path)
+            if entry is None or entry.get("version") != self.VERSION:
+                self._log(f"Parse cache miss for {name}")
+                return None
+            return self._load_entry(file_path, entry_path, entry)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            # Valid JSON, but not an entry written by this version
+            self._log(f"Dropping damaged parse cache entry {entry_path.name}")
+            self._remove(entry_path)
+            return None
+        except OSError as e:
+            self._warn(f"Parse cache not usable, parsing {name} without it: {str(e)}")
+            return None
+
+    def _load_entry(
+        self, file_path: PathLike, entry_path: Path, entry: Dict[str, Any]
+    ) -> Optional[List[Gag]]:
+        """Get the gags of an entry if it is still valid for the export.
+
+        Raises:
+            KeyError, TypeError, ValueError: If the entry is malformed.
+            OSError: If the export or the cache cannot be accessed.
+        """
+        name = Path(file_path).name
+        stat = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            self._log(f"Parse cache miss for {name}: file size changed")
+            return None
+
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            if file_hash(file_path) != entry["sha256"]:
+                self._log(f"Parse cache miss for {name}: file content changed")
+                return None
+            # Same content, only touched: keep the entry valid for the new time
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._write_entry(entry_path, entry)
+
+        gags = [
+            Gag(id=gag_id, title=title, section=section) for gag_id, title, section in entry["gags"]
+        ]
+
+        # Mark as recently used for the eviction order
+        os.utime(entry_path)
+        self._log(f"Parse cache hit for {name}: {len(gags)} gags")
+        return gags
+
+    def put(self, file_path: PathLike, sections: Sequence[str], gags: Sequence[Gag]) -> None:
+        """Store the gags of an export and evict old entries if needed.
+
+        If the entry cannot be written, a warning is logged and the gags are
+        not cached.
+
+        Args:
+            file_path: Path of the export.
+            sections: Section headers that were extracted.
+            gags: Gags extracted from the export.
+        """
+        name = Path(file_path).name
+        try:
+            stat = os.stat(file_path)
+            entry = {
+                "version": self.VERSION,
+                "path": os.path.abspath(file_path),
+                "sections": list(sections),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_hash(file_path),
+                "gags": [[gag.id, gag.title, gag.section] for gag in gags],
+            }
+            entry_path = self._entry_path(file_path, sections)
+            self._write_entry(entry_path, entry)
+            self.evict(keep=entry_path)
+        except OSError as e:
+            self._warn(f"Cannot store {name} in the parse cache: {str(e)}")
+            return
+        self._log(f"Stored {len(gags)} gags of {name} in the parse cache")
+
+    def _write_entry(self, entry_path: Path, entry: Dict[str, Any]) -> None:
+        """Write a cache entry atomically."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = entry_path.with_name(entry_path.name + ".tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(temp_path, entry_path)
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete the least recently used entries until the cache fits its size.
+
+        Args:
+            keep: Entry that is never evicted, usually the one just written.
+
+        Returns:
+            Number of evicted entries.
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        entries = []
+        for entry_path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry_path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if entry_path == keep:
+                continue
+            self._remove(entry_path)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._log(f"Evicted {evicted} entries from the parse cache")
+        return evicted
+
+    def clear(self) -> None:
+        """Delete all cache entries."""
+        if self.cache_dir.exists():
+            for entry_path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+                self._remove(entry_path)
@@ -0,0 +1,254 @@
+"""Event based parser for 9GAG HTML data exports.
+
+StreamingHtmlParser is fed the export in chunks and collects gags while it
+reads, without building a document tree. Only the tables that follow the
+requested section headers are looked at. The results match
+HtmlParser.extract_sections: the first <h3> whose only text is the section
+name selects the next <table>, and every row of that table with more than
+two cells becomes a gag tagged with the section.
+"""
+
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.models import Gag
+
+# Elements without content, which never get an end tag
+_VOID_TAGS = frozenset(("br", "hr", "img", "input", "link", "meta", "wbr"))
+
+
+@dataclass
+class _Header:
+    """An <h3> being read."""
+
+    text: List[str] = field(default_factory=list)
+
+    # Child count of each open element of the header, the <h3> first
+    children: List[int] = field(default_factory=lambda: [0])
+
+    last_was_data: bool = False
+
+    # Whether the header still holds nothing but a single string, like Tag.string
+    single_string: bool = True
+
+
+@dataclass
+class _Cell:
+    """Text and first link of a <td> being read."""
+
+    text: List[str] = field(default_factory=list)
+    has_link: bool = False
+    href: str = ""
+
+
+@dataclass
+class _Table:
+    """A section table being read."""
+
+    sections: List[str]
+
+    # Number of <table> tags open inside the section table, itself included
+    depth: int = 1
+
+    # Cells of the rows not turned into gags yet, in the order the rows start
+    rows: List[List[_Cell]] = field(default_factory=list)
+
+
+class StreamingHtmlParser(HTMLParser):
+    """Collects gags from the section tables of an export as it is fed."""
+
+    def __init__(self, sections: Sequence[str]):
+        """Initialize the parser.
+
+        Args:
+            sections: Section headers to extract, such as "Upvotes" and "Saved".
+                Gags are returned in this order of sections.
+        """
+        super().__init__(convert_charrefs=True)
+        self.sections = list(sections)
+
+        self._found: Dict[str, List[Gag]] = {section: [] for section in self.sections}
+        self._done: set = set()
+        self._next_section = 0
+
+        self._header: Optional[_Header] = None
+
+        # Sections whose header was found, waiting for their table
+        self._waiting: List[str] = []
+        self._table: Optional[_Table] = None
+
+        self._open_rows: List[List[_Cell]] = []
+        self._open_cells: List[_Cell] = []
+
+    @property
+    def finished(self) -> bool:
+        """Whether all requested sections were read."""
+        return len(self._done) == len(self.sections)
+
+    def pop_gags(self) -> List[Gag]:
+        """Take the gags that are ready, keeping the order of the sections.
+
+        Gags of a section are held back until all earlier sections are done.
+
+        Returns:
+            Gags found since the last call.
+        """
+        ready: List[Gag] = []
+        while self._next_section < len(self.sections):
+            section = self.sections[self._next_section]
+            ready.extend(self._found[section])
+            self._found[section] = []
+            if section not in self._done:
+                break
+            self._next_section += 1
+        return ready
+
+    def close(self) -> None:
+        """Finish parsing and release the sections that were not found."""
+        super().close()
+        self._finish_table()
+        self._done.update(self.sections)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Track headers, section tables, rows, cells and links."""
+        header = self._header
+        if header is not None:
+            header.children[-1] += 1
+            header.last_was_data = False
+            if tag in _VOID_TAGS:
+                header.single_string = False
+            else:
+                header.children.append(0)
+        elif tag == "h3" and not self.finished:
+            self._header = _Header()
+
+        if tag == "table":
+            if self._table is not None:
+                self._table.depth += 1
+            elif self._waiting:
+                self._table = _Table(self._waiting)
+                self._waiting = []
+
+        if self._table is None:
+            return
+
+        if tag == "tr":
+            row: List[_Cell] = []
+            self._table.rows.append(row)
+            self._open_rows.append(row)
+        elif tag == "td" and self._open_rows:
+            # Like find_all("td"), a cell belongs to every row it is nested in
+            cell = _Cell()
+            for row in self._open_rows:
+                row.append(cell)
+            self._open_cells.append(cell)
+        elif tag == "a":
+            for cell in self._open_cells:
+                if not cell.has_link:
+                    cell.has_link = True
+                    cell.href = dict(attrs).get("href") or ""
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Handle a self closing tag, which has no content."""
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close headers, section tables, rows and cells."""
+        header = self._header
+        if header is not None:
+            header.last_was_data = False
+            if header.children.pop() != 1:
+                header.single_string = False
+            if not header.children:
+                self._end_header()
+            return
+
+        if self._table is None:
+            return
+
+        if tag == "td" and self._open_cells:
+            self._open_cells.pop()
+        elif tag == "tr" and self._open_rows:
+            self._open_rows.pop()
+            self._open_cells = [c for c in self._open_cells if self._in_open_row(c)]
+            if not self._open_rows:
+                self._flush_rows()
+        elif tag == "table":
+            self._table.depth -= 1
+            if self._table.depth == 0:
+                self._finish_table()
+
+    def handle_data(self, data: str) -> None:
+        """Collect the text of headers and cells."""
+        header = self._header
+        if header is not None:
+            # Data may arrive in pieces, which still form a single string
+            if not header.last_was_data:
+                header.children[-1] += 1
+                header.last_was_data = True
+            header.text.append(data)
+        for cell in self._open_cells:
+            cell.text.append(data)
+
+    def _in_open_row(self, cell: _Cell) -> bool:
+        """Check whether a cell belongs to a row that is still open."""
+        return any(any(c is cell for c in row) for row in self._open_rows)
+
+    def _end_header(self) -> None:
+        """Check whether the closed header starts a requested section."""
+        header = self._header
+        self._header = None
+
+        # Mirrors HtmlParser.extract_sections, which compares Tag.string
+        if not header.single_string:
+            return
+        section = "".join(header.text)
+        if section not in self._found or section in self._done or section in self._waiting:
+            return
+        if self._table is None or section not in self._table.sections:
+            self._waiting.append(section)
+
+    def _flush_rows(self) -> None:
+        """Turn the completed rows of the section table into gags."""
+        table = self._table
+        rows = [row for row in map(self._read_row, table.rows) if row is not None]
+        table.rows = []
+        for section in table.sections:
+            self._found[section].extend(
+                Gag(id=gag_id, title=title, section=section) for gag_id, title in rows
+            )
+
+    def _finish_table(self) -> None:
+        """Turn the remaining rows of the closed section table into gags."""
+        if self._table is None:
+            return
+        self._flush_rows()
+        self._done.update(self._table.sections)
+        self._table = None
+        self._open_rows = []
+        self._open_cells = []
+
+    @staticmethod
+    def _read_row(cells: List[_Cell]) -> Optional[Tuple[str, str]]:
+        """Read a gag from the cells of a row, like HtmlParser.get_gags_from_table.
+
+        Args:
+            cells: Cells of the row.
+
+        Returns:
+            Id and title of the gag, or None if the row holds no gag.
+        """
+        if len(cells) <= 2:
+            return None
+
+        href = cells[1].href if cells[1].has_link else ""
+        gag_id = href.split("/")[-1] if href else ""
+        if not gag_id:
+            return None
+
+        text = "".join(cells[2].text)
+        title = text.strip() if text else "No Title"
+        return gag_id, title
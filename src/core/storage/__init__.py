@@ -0,0 +1,7 @@
+"""Storage helpers for the downloaded gags."""
+
+from .catalog import CatalogEntry, DownloadCatalog
+from .directory_index import DirectoryIndex
+from .job_journal import JobJournal, JournalState
+
+__all__ = ["CatalogEntry", "DirectoryIndex", "DownloadCatalog", "JobJournal", "JournalState"]
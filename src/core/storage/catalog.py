@@ -0,0 +1,304 @@
+"""SQLite catalog of the downloads in a destination folder.
+
+The catalog records every gag by its id: title, chosen variant, file path,
+size, hash, timestamps and status. Skip decisions no longer depend on the
+sanitized title, so gags with the same title do not collide and renamed
+gags are not downloaded again. Failed gags can be queried for a rerun.
+
+The downloaded entries are also kept in memory, so skip decisions do not
+query the database.
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.core.models import Gag
+
+PathLike = Union[str, Path]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    gag_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    content_type TEXT,
+    variant TEXT,
+    path TEXT,
+    size INTEGER,
+    sha256 TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS downloads_status ON downloads (status);
+"""
+
+_COLUMNS = (
+    "gag_id, title, status, content_type, variant, path, size, sha256, error, "
+    "attempts, created_at, updated_at"
+)
+
+
+@dataclass
+class CatalogEntry:
+    """One gag in the download catalog."""
+
+    gag_id: str
+    title: str
+    status: str
+    content_type: Optional[str] = None
+    variant: Optional[str] = None
+
+    # Path relative to the destination folder
+    path: Optional[str] = None
+
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: str = ""
+    updated_at: str = ""
+
+    @property
+    def is_video(self) -> bool:
+        """Whether the gag was downloaded as a video."""
+        return self.content_type == "VIDEO"
+
+
+class DownloadCatalog:
+    """Thread safe SQLite catalog of downloaded and failed gags."""
+
+    FILENAME = "9gag_catalog.sqlite3"
+
+    STATUS_DOWNLOADED = "downloaded"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, destination_folder: PathLike, filename: str = FILENAME):
+        """Open or create the catalog of a destination folder.
+
+        Args:
+            destination_folder: Folder the gags are saved in.
+            filename: Name of the database file inside the folder.
+        """
+        self.root = Path(destination_folder)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / filename
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        self._downloaded: Dict[str, CatalogEntry] = {}
+        self._path_owners: Dict[str, str] = {}
+        for entry in self.entries(self.STATUS_DOWNLOADED):
+            self._remember(entry)
+
+    @staticmethod
+    def _now() -> str:
+        """Get the current UTC time as an ISO 8601 string."""
+        return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @staticmethod
+    def _path_key(path: str) -> str:
+        """Normalize a relative path for ownership lookups."""
+        return os.path.normcase(os.path.normpath(path))
+
+    def _relative(self, path: PathLike) -> str:
+        """Get a path relative to the destination folder if it lies inside it."""
+        # abspath instead of resolve() keeps lookups free of file system calls
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        if relative.startswith(os.pardir):
+            return str(path)
+        return Path(relative).as_posix()
+
+    def _remember(self, entry: CatalogEntry) -> None:
+        """Keep a downloaded entry in memory. Requires the lock or the constructor."""
+        self._downloaded[entry.gag_id] = entry
+        if entry.path:
+            self._path_owners[self._path_key(entry.path)] = entry.gag_id
+
+    def _forget(self, gag_id: str) -> None:
+        """Drop an entry from memory. Requires the lock."""
+        entry = self._downloaded.pop(gag_id, None)
+        if entry and entry.path:
+            self._path_owners.pop(self._path_key(entry.path), None)
+
+    def get_downloaded(self, gag_id: str) -> Optional[CatalogEntry]:
+        """Get the catalog entry of a downloaded gag.
+
+        Args:
+            gag_id: Id of the gag.
+
+        Returns:
+            The entry, or None if the gag was not downloaded.
+        """
+        with self._lock:
+            return self._downloaded.get(gag_id)
+
+    def get_path_owner(self, path: PathLike) -> Optional[str]:
+        """Get the id of the gag a file belongs to.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            Id of the gag, or None if no downloaded gag uses the path.
+        """
+        key = self._path_key(self._relative(path))
+        with self._lock:
+            return self._path_owners.get(key)
+
+    def get_absolute_path(self, entry: CatalogEntry) -> Optional[Path]:
+        """Get the absolute path of a downloaded file.
+
+        Args:
+            entry: Catalog entry.
+
+        Returns:
+            The path, or None if the entry has no file.
+        """
+        return self.root / entry.path if entry.path else None
+
+    def record_download(
+        self,
+        gag: Gag,
+        content_type: str,
+        variant: Optional[str],
+        path: PathLike,
+        sha256: Optional[str] = None,
+    ) -> CatalogEntry:
+        """Record a downloaded gag.
+
+        Args:
+            gag: Downloaded gag.
+            content_type: Name of the content type, "VIDEO" or "IMAGE".
+            variant: URL suffix the gag was found in, None if unknown.
+            path: Path of the downloaded file.
+            sha256: Hash of the file, None if it was not computed.
+
+        Returns:
+            The new catalog entry.
+        """
+        size = os.path.getsize(path)
+        entry = CatalogEntry(
+            gag_id=gag.id,
+            title=gag.title,
+            status=self.STATUS_DOWNLOADED,
+            content_type=content_type,
+            variant=variant,
+            path=self._relative(path),
+            size=size,
+            sha256=sha256,
+        )
+        return self._upsert(entry)
+
+    def record_failure(self, gag: Gag, error: str) -> CatalogEntry:
+        """Record a gag that could not be downloaded.
+
+        Args:
+            gag: Gag that failed.
+            error: Reason of the failure.
+
+        Returns:
+            The new catalog entry.
+        """
+        entry = CatalogEntry(gag_id=gag.id, title=gag.title, status=self.STATUS_FAILED, error=error)
+        return self._upsert(entry)
+
+    def _upsert(self, entry: CatalogEntry) -> CatalogEntry:
+        """Insert or update an entry, counting the attempts.
+
+        Args:
+            entry: Entry to store.
+
+        Returns:
+            The entry with its timestamps and attempt count.
+        """
+        now = self._now()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT attempts, created_at FROM downloads WHERE gag_id = ?",
+                (entry.gag_id,),
+            ).fetchone()
+            entry.attempts = (row["attempts"] if row else 0) + 1
+            entry.created_at = row["created_at"] if row else now
+            entry.updated_at = now
+
+            with self._connection:
+                self._connection.execute(
+                    f"INSERT OR REPLACE INTO downloads ({_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry.gag_id,
+                        entry.title,
+                        entry.status,
+                        entry.content_type,
+                        entry.variant,
+                        entry.path,
+                        entry.size,
+                        entry.sha256,
+                        entry.error,
+                        entry.attempts,
+                        entry.created_at,
+                        entry.updated_at,
+                    ),
+                )
+
+            self._forget(entry.gag_id)
+            if entry.status == self.STATUS_DOWNLOADED:
+                self._remember(entry)
+        return entry
+
+    def entries(self, status: Optional[str] = None) -> List[CatalogEntry]:
+        """Query catalog entries.
+
+        Args:
+            status: Only return entries with this status, None for all.
+
+        Returns:
+            Matching entries, oldest first.
+        """
+        query = f"SELECT {_COLUMNS} FROM downloads"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at, gag_id"
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [CatalogEntry(**dict(row)) for row in rows]
+
+    def failed(self) -> List[CatalogEntry]:
+        """Get all gags whose last download attempt failed.
+
+        Returns:
+            Failed entries, oldest first.
+        """
+        return self.entries(self.STATUS_FAILED)
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Count the entries per status.
+
+        Returns:
+            Mapping of status to number of gags.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) AS count FROM downloads GROUP BY status"
+            ).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,107 @@
+"""In-memory index of the files in the destination folder.
+
+Checking whether a gag was downloaded before used to cost several stat
+calls per gag, which is slow on network shares and slow disks.
+DirectoryIndex lists the save folders once with os.scandir, then answers
+membership queries from a set. Files written later are added to the
+index, so it stays up to date during a run.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Set, Union
+
+PathLike = Union[str, Path]
+
+
+class DirectoryIndex:
+    """Thread safe set of the files below a root folder."""
+
+    def __init__(self, root: PathLike, folders: Iterable[str]):
+        """Initialize the index. Call build() to list the folders.
+
+        Args:
+            root: Destination folder the gags are saved in.
+            folders: Folders below root to index, e.g. "gags/images".
+        """
+        self.root = Path(root)
+        self.folders = list(folders)
+        self._lock = threading.Lock()
+        self._files: Set[str] = set()
+        self._folder_keys = {self._key(self.root / folder) for folder in self.folders}
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        """Normalize a path for lookups, ignoring case where the OS does."""
+        return os.path.normcase(os.path.abspath(path))
+
+    def build(self) -> int:
+        """List the indexed folders, replacing the current contents.
+
+        Returns:
+            Number of files found.
+        """
+        files: Set[str] = set()
+        for folder in self.folders:
+            try:
+                with os.scandir(self.root / folder) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            files.add(self._key(entry.path))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+        with self._lock:
+            self._files = files
+        return len(files)
+
+    def covers(self, path: PathLike) -> bool:
+        """Check whether a path lies directly in one of the indexed folders.
+
+        Args:
+            path: Path to check.
+
+        Returns:
+            True if the index can answer for the path.
+        """
+        return self._key(Path(path).parent) in self._folder_keys
+
+    def contains(self, path: PathLike) -> bool:
+        """Check whether a file exists.
+
+        Paths outside the indexed folders are checked on disk.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            True if the file exists.
+        """
+        if not self.covers(path):
+            return Path(path).is_file()
+        with self._lock:
+            return self._key(path) in self._files
+
+    def add(self, path: PathLike) -> None:
+        """Record a file that was written.
+
+        Args:
+            path: Path of the new file.
+        """
+        with self._lock:
+            self._files.add(self._key(path))
+
+    def discard(self, path: PathLike) -> None:
+        """Forget a file that was removed.
+
+        Args:
+            path: Path of the removed file.
+        """
+        with self._lock:
+            self._files.discard(self._key(path))
+
+    def __len__(self) -> int:
+        """Get the number of indexed files."""
+        with self._lock:
+            return len(self._files)
@@ -0,0 +1,264 @@
+"""Append-only journal of the gags of a download run.
+
+The download engines append one JSON line per event: a gag was queued,
+its download started, it was done or it failed. Once all gags of the
+input were queued, a complete line follows. If the run is interrupted,
+replaying the journal gives the gags that were queued but not finished,
+in their original order, so the run can go on with exactly the remaining
+work instead of parsing the exports and checking every file again.
+
+Every line is flushed when it is written, so a crashed or killed process
+loses nothing. The file is synced to disk at most once per sync interval,
+so a power loss drops at most the last interval. A line that was cut off
+half way is skipped on replay.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, TextIO, Union
+
+from src.core.models import Gag
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class JournalState:
+    """What a journal knows about a run."""
+
+    # Gags queued but not finished, in the order they were queued
+    remaining: List[Gag] = field(default_factory=list)
+
+    # Ids of every gag the journal has seen
+    known: Set[str] = field(default_factory=set)
+
+    done: int = 0
+    failed: int = 0
+
+    # Whether every gag of the input was queued
+    complete: bool = False
+
+
+class JobJournal:
+    """Thread safe, append-only JSON lines journal of a download run."""
+
+    FILENAME = "9gag_journal.jsonl"
+
+    QUEUED = "queued"
+    STARTED = "started"
+    DONE = "done"
+    FAILED = "failed"
+    COMPLETE = "complete"
+
+    # Seconds between two syncs of the file to disk
+    SYNC_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        destination_folder: PathLike,
+        filename: str = FILENAME,
+        resume: bool = False,
+        sync_interval: float = SYNC_INTERVAL,
+    ):
+        """Open the journal of a destination folder.
+
+        Args:
+            destination_folder: Folder the gags are saved in.
+            filename: Name of the journal file inside the folder.
+            resume: Whether to continue the journal of an interrupted run.
+                Otherwise a new journal is started.
+            sync_interval: Seconds between two syncs of the file to disk.
+        """
+        self.root = Path(destination_folder)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / filename
+        self.sync_interval = sync_interval
+
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+
+        if resume:
+            self.state = self.replay(self.path)
+            # Without the complete line the exports are read again and every
+            # gag seen before is skipped, which needs the full history
+            if self.state.complete:
+                self._compact(self.state)
+        else:
+            self.state = JournalState()
+            self.path.write_text("", encoding="utf-8")
+
+        # Queued gags without an outcome, so a resumed gag is not queued twice
+        self._open: Set[str] = {gag.id for gag in self.state.remaining}
+        self._file: Optional[TextIO] = open(self.path, "a", encoding="utf-8")
+        if resume and not self._ends_with_newline(self.path):
+            # End the line a crash cut off, so the next record is readable
+            self._file.write("\n")
+
+    @classmethod
+    def replay(cls, path: PathLike) -> JournalState:
+        """Read a journal and work out what is left to do.
+
+        Args:
+            path: Journal file. A missing file is an empty journal.
+
+        Returns:
+            The state of the run recorded in the journal.
+        """
+        state = JournalState()
+        pending: Dict[str, Gag] = {}
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return state
+
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    event = record["event"]
+                except (ValueError, KeyError, TypeError):
+                    # Cut off by a crash while it was written
+                    continue
+
+                if event == cls.COMPLETE:
+                    state.complete = True
+                    continue
+
+                gag_id = record.get("id")
+                if not gag_id:
+                    continue
+                if event == cls.QUEUED:
+                    if gag_id not in pending:
+                        pending[gag_id] = Gag(
+                            id=gag_id,
+                            title=record.get("title", ""),
+                            section=record.get("section"),
+                            sources=tuple(record.get("sources", ())),
+                        )
+                    state.known.add(gag_id)
+                elif event == cls.DONE:
+                    if pending.pop(gag_id, None) is not None:
+                        state.done += 1
+                elif event == cls.FAILED:
+                    if pending.pop(gag_id, None) is not None:
+                        state.failed += 1
+
+        state.remaining = list(pending.values())
+        return state
+
+    def _compact(self, state: JournalState) -> None:
+        """Rewrite the journal with only the remaining gags.
+
+        Resuming again then only reads the work that is still left, not
+        the history of every earlier run. The file is replaced atomically,
+        so an interruption keeps either the old or the new journal.
+
+        Args:
+            state: Replayed state of the journal.
+        """
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for gag in state.remaining:
+                f.write(self._queued_line(gag))
+            if state.complete:
+                f.write(self._line({"event": self.COMPLETE}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def _ends_with_newline(path: Path) -> bool:
+        """Check whether a file is empty or its last line is complete."""
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _line(record: dict) -> str:
+        """Serialize a record as one line of the journal."""
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    @classmethod
+    def _queued_line(cls, gag: Gag) -> str:
+        """Serialize a queued gag with everything needed to download it again."""
+        record = {"event": cls.QUEUED, "id": gag.id, "title": gag.title}
+        if gag.section:
+            record["section"] = gag.section
+        if gag.sources:
+            record["sources"] = list(gag.sources)
+        return cls._line(record)
+
+    def _write(self, line: str) -> None:
+        """Append a line, syncing the file if the interval has passed. Requires the lock."""
+        if self._file is None:
+            return
+        self._file.write(line)
+        self._file.flush()
+        now = time.monotonic()
+        if now - self._last_sync >= self.sync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def queued(self, gag: Gag) -> None:
+        """Record that a gag was handed to the engine.
+
+        Args:
+            gag: Queued gag.
+        """
+        with self._lock:
+            if gag.id in self._open:
+                return
+            self._open.add(gag.id)
+            self._write(self._queued_line(gag))
+
+    def started(self, gag: Gag) -> None:
+        """Record that the download of a gag started.
+
+        Args:
+            gag: Gag being downloaded.
+        """
+        with self._lock:
+            self._write(self._line({"event": self.STARTED, "id": gag.id}))
+
+    def finished(self, gag: Gag, success: bool, error: Optional[str] = None) -> None:
+        """Record the outcome of a download.
+
+        Args:
+            gag: Downloaded gag.
+            success: Whether the download succeeded.
+            error: Reason of a failure.
+        """
+        record = {"event": self.DONE if success else self.FAILED, "id": gag.id}
+        if not success and error:
+            record["error"] = error
+        with self._lock:
+            self._open.discard(gag.id)
+            self._write(self._line(record))
+
+    def complete(self) -> None:
+        """Record that every gag of the input was queued."""
+        with self._lock:
+            self._write(self._line({"event": self.COMPLETE}))
+
+    def sync(self) -> None:
+        """Write everything recorded so far to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close the journal. Later records are ignored."""
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,5 +1,16 @@
-"""User interface components for the application."""
+"""User interface components for the application.
 
-from .app import App
+App is imported on first access, so modules of the package such as the
+download worker can be used without loading Tk.
+"""
+
+from typing import TYPE_CHECKING
+
+from src.utils.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .app import App
 
 __all__ = ["App"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {"App": ".app"})
@@ -4,16 +4,18 @@ This class is the frame for the main window.
 It contains all the subframes and the main application loop.
 """
 
+import time
 import tkinter as tk
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
 from pathlib import Path
 
 import customtkinter as ctk
 
 from src.config import Color, Theme, SettingsManager
-from src.core.downloader import DownloadHandler
+from src.core.downloader import ConcurrencyController, DownloadEngine, DownloadHandler
 from src.core.models import Gag
-from src.core.parser import HtmlParser
+from src.core.parser import GagDeduplicator
+from src.core.storage import JobJournal
 from src.ui.frames import (
     CheckboxesFrame,
     DestinationFolderFrame,
@@ -21,20 +23,39 @@ from src.ui.frames import (
     HeaderFrame,
     ProgressBarFrame,
     SourceFileFrame,
+    ThrottleFrame,
 )
+from src.ui.download_worker import DownloadWorker, ProgressEvent, ProgressEventType
 from src.utils.helpers import create_dirs_if_not_exist
 from src.utils.logging import Logger
 
+if TYPE_CHECKING:
+    from src.core.downloader import AsyncDownloadEngine
+    from src.core.parser import ParseCache
+
 
 class App(ctk.CTk):
     """Main application window."""
 
+    # Milliseconds between two polls of the download progress queue
+    POLL_INTERVAL_MS = 50
+
+    # Progress events taken off the queue at a time
+    EVENT_BATCH_SIZE = 500
+
+    # Seconds a poll may spend applying events, so the window stays responsive
+    POLL_TIME_BUDGET = 0.02
+
+    # Seconds to wait for a cancelled download to stop when the window is closed
+    SHUTDOWN_TIMEOUT = 10.0
+
     def __init__(
         self,
         downloader: DownloadHandler,
         theme: Theme,
         logger: Logger,
         settings_manager: SettingsManager,
+        parse_cache: Optional["ParseCache"] = None,
     ):
         """Initialize the application window.
 
@@ -43,12 +64,21 @@ class App(ctk.CTk):
             theme: Theme configuration.
             logger: Logger instance.
             settings_manager: Settings manager for persisting user preferences.
+            parse_cache: Optional cache of parsed data exports.
         """
         super().__init__()
         self.downloader = downloader
         self.theme = theme
         self.logger = logger
         self.settings_manager = settings_manager
+        self.parse_cache = parse_cache
+        self._download_worker: Optional[DownloadWorker] = None
+        self._download_start_time = 0.0
+        self._deduplicator = GagDeduplicator()
+        self._journal: Optional[JobJournal] = None
+
+        # Error that stopped the current download, such as an unreadable export
+        self._download_error: Optional[str] = None
 
         # Set up the UI
         self._setup_window()
@@ -127,6 +157,15 @@ class App(ctk.CTk):
             fg_color=self.theme.section_bg,
         )
 
+        self.throttle_frame = ThrottleFrame(
+            self.main_container,
+            theme=self.theme,
+            corner_radius=self.theme.corner_radius,
+            border_width=self.theme.border_width,
+            border_color=self.theme.border_color,
+            fg_color=self.theme.section_bg,
+        )
+
         self.progress_frame = ProgressBarFrame(
             self.main_container,
             theme=self.theme,
@@ -165,6 +204,11 @@ class App(ctk.CTk):
         self.checkboxes_frame.set_saved_gags_var(settings.saved_gags_selected)
         self.checkboxes_frame.set_upvoted_gags_var(settings.upvoted_gags_selected)
 
+        # Apply rate limits
+        self.throttle_frame.set_limits(
+            settings.max_requests_per_second, settings.max_kilobytes_per_second
+        )
+
     def _bind_events(self) -> None:
         """Bind events for saving settings."""
         # Bind window resize event
@@ -181,6 +225,9 @@ class App(ctk.CTk):
         # Bind checkbox changes
         self.checkboxes_frame.set_checkbox_changed_callback(self._on_checkbox_changed)
 
+        # Bind rate limit changes
+        self.throttle_frame.set_limits_changed_callback(self._on_limits_changed)
+
     def _on_window_configure(self, event: tk.Event) -> None:
         """Handle window resize events.
 
@@ -222,6 +269,21 @@ class App(ctk.CTk):
         """
         self.settings_manager.update_checkboxes(saved_selected, upvoted_selected)
 
+    def _on_limits_changed(
+        self, requests_per_second: float, kilobytes_per_second: float
+    ) -> None:
+        """Handle rate limit changes, also while a download is running.
+
+        Args:
+            requests_per_second: Maximum requests per second, 0 for unlimited.
+            kilobytes_per_second: Maximum bandwidth in KB/s, 0 for unlimited.
+        """
+        self.downloader.rate_limiter.set_limits(
+            requests_per_second, kilobytes_per_second * 1024
+        )
+        self.logger.info(f"Rate limits set to {self.downloader.rate_limiter.describe()}")
+        self.settings_manager.update_rate_limits(requests_per_second, kilobytes_per_second)
+
     def _place_widgets(self) -> None:
         """Place all widgets in the grid."""
         # Place main container
@@ -239,7 +301,8 @@ class App(ctk.CTk):
         self.main_container.grid_rowconfigure(1, weight=0)  # Checkboxes row
         self.main_container.grid_rowconfigure(2, weight=0)  # Source row
         self.main_container.grid_rowconfigure(3, weight=0)  # Destination row
-        self.main_container.grid_rowconfigure(4, weight=0)  # Download row
+        self.main_container.grid_rowconfigure(4, weight=0)  # Throttle row
+        self.main_container.grid_rowconfigure(5, weight=0)  # Download row
 
         row = 0
         # Place frames
@@ -278,6 +341,15 @@ class App(ctk.CTk):
             pady=self.theme.padding,
         )
 
+        row += 1
+        self.throttle_frame.grid(
+            row=row,
+            column=0,
+            sticky=tk.NSEW,
+            padx=self.theme.padding,
+            pady=self.theme.padding,
+        )
+
         row += 1
         self.download_frame.grid(
             row=row,
@@ -315,18 +387,14 @@ class App(ctk.CTk):
             )
             return
 
-        # Parse gags from the source file
+        # Open the source file, it is parsed while the gags are downloaded
         gags = self._parse_gags(source_file, upvoted_gags_check, saved_gags_check)
-        if not gags:
-            self.logger.error("No upvoted or saved gags found")
-            self.set_progress_message(
-                text="No upvoted or saved gags found", color=Color.ERROR
-            )
+        if gags is None:
             return
 
         # Show progress bar
         self.progress_frame.grid(
-            row=5, column=0, columnspan=2, sticky=tk.W + tk.E, padx=5, pady=5
+            row=6, column=0, columnspan=2, sticky=tk.W + tk.E, padx=5, pady=5
         )
 
         # Ensure download directories exist
@@ -337,8 +405,10 @@ class App(ctk.CTk):
 
     def _parse_gags(
         self, source_file: str, upvoted_gags: bool, saved_gags: bool
-    ) -> Optional[List[Gag]]:
-        """Parse gags from the source file.
+    ) -> Optional[Iterator[Gag]]:
+        """Get a lazy iterator over the gags of the source file.
+
+        A gag that is both upvoted and saved is only downloaded once.
 
         Args:
             source_file: Path to the source HTML file.
@@ -346,11 +416,20 @@ class App(ctk.CTk):
             saved_gags: Whether to include saved gags.
 
         Returns:
-            List of gags or None if parsing failed.
+            Iterator of gags or None if the file could not be opened.
         """
+        # BeautifulSoup is loaded with the parser, on the first download
+        from src.core.parser import HtmlParser
+
+        self._deduplicator = GagDeduplicator()
         try:
-            return HtmlParser.parse_file(
-                source_file, upvoted_gags=upvoted_gags, saved_gags=saved_gags
+            return HtmlParser.iter_exports(
+                [source_file],
+                upvoted_gags=upvoted_gags,
+                saved_gags=saved_gags,
+                cache=self.parse_cache,
+                fast=True,
+                deduplicator=self._deduplicator,
             )
         except FileNotFoundError:
             self.logger.error("9GAG data file not found")
@@ -365,120 +444,173 @@ class App(ctk.CTk):
             )
             return None
 
-    def _process_downloads(self, gags: List[Gag], destination_folder: str) -> None:
-        """Process and download all gags.
+    def _process_downloads(self, gags: Iterable[Gag], destination_folder: str) -> None:
+        """Start downloading all gags on a background worker.
+
+        The worker counts already downloaded gags and hands the rest to the
+        download engine. Its progress events are drained on the main thread
+        by _poll_download_events(), so widgets are only touched from here.
 
         Args:
-            gags: List of gags to download.
+            gags: Gags to download, possibly still being parsed.
             destination_folder: Folder to save downloads in.
         """
-        total_gags = len(gags)
-        one_percent = total_gags / 100 if total_gags > 0 else 1
-
-        # Reset and initialize progress bar stats
+        # Reset and initialize progress bar stats, the total is not known yet
         self.progress_frame.reset_stats()
-        self.progress_frame.set_total_items(total_gags)
+        self.progress_frame.set_total_items(None)
+        self._download_error = None
 
-        # Download statistics
-        successful = 0
-        failed = 0
-        already_downloaded = 0
+        # Recorded so an interrupted run can be resumed from the command line
+        self._journal = JobJournal(destination_folder)
+        engine = self._create_engine(self._journal)
+        self.progress_frame.set_concurrency(engine.concurrency)
 
-        # For time estimate calculation
-        import time
+        self._download_start_time = time.time()
+        self._download_worker = DownloadWorker(
+            engine, gags, destination_folder, self.downloader.find_downloaded
+        )
+        self._download_worker.start()
+        self.after(self.POLL_INTERVAL_MS, self._poll_download_events)
 
-        start_time = time.time()
+    def _poll_download_events(self) -> None:
+        """Apply the progress events posted by the download worker."""
+        worker = self._download_worker
+        if worker is None:
+            return
 
-        # Download each gag
-        for i, gag in enumerate(gags):
-            # Check if download was canceled
-            if self.progress_frame.is_download_cancelled():
-                self.set_progress_message(
-                    f"Download canceled: {successful} successful, {failed} failed, {already_downloaded} already downloaded",
-                    color=Color.WARNING,
-                )
+        # Check if download was canceled
+        if self.progress_frame.is_download_cancelled():
+            worker.cancel()
+
+        # The progress frame only repaints periodically, so applying events
+        # is cheap and a poll can take all of them within its time budget
+        finished = False
+        last_event = None
+        deadline = time.monotonic() + self.POLL_TIME_BUDGET
+        while not finished and time.monotonic() < deadline:
+            events = worker.drain(self.EVENT_BATCH_SIZE)
+            if not events:
                 break
-
-            # Update current item
-            self.progress_frame.update_current_item(gag.title, i)
-
-            # Update progress
-            progress_percent = i / one_percent / 100
-            progress_int = int(i / one_percent)
-
-            # Calculate estimated time remaining
-            elapsed = time.time() - start_time
-            if i > 0:
-                items_per_second = i / elapsed if elapsed > 0 else 0
-                remaining_items = total_gags - i
-                if items_per_second > 0:
-                    remaining_seconds = remaining_items / items_per_second
-                    minutes = int(remaining_seconds // 60)
-                    seconds = int(remaining_seconds % 60)
-                    remaining_time = f"{minutes:02d}:{seconds:02d}"
+            for event in events:
+                if event.type is ProgressEventType.FINISHED:
+                    finished = True
+                elif event.type is ProgressEventType.TOTAL:
+                    self.progress_frame.set_total_items(event.total)
+                elif event.type is ProgressEventType.ERROR:
+                    self._download_error = event.error
+                    self.logger.error(f"Download failed: {event.error}")
+                    self.set_progress_message(f"Download failed: {event.error}", color=Color.ERROR)
                 else:
-                    remaining_time = "--:--"
-            else:
-                remaining_time = "--:--"
-
-            self.progress_frame.set_progress_bar(
-                progress_percent,
-                progress_int,
-                color=Color.MAIN,
-                remaining_time=remaining_time,
-            )
+                    self._apply_download_event(event)
+                    last_event = event
 
-            # Update status message
-            self.set_progress_message(
-                f"Downloading gag: {gag.title} ({i + 1}/{total_gags})",
-                color=Color.SUCCESS,
-            )
+        if last_event is not None:
+            self._update_progress(last_event)
 
-            # Process UI events
-            self.update()
+        if finished:
+            self._finish_downloads()
+        else:
+            self.after(self.POLL_INTERVAL_MS, self._poll_download_events)
 
-            # Detect if file already exists
-            is_cached = False
-            image_path = (
-                Path(destination_folder)
-                / "gags/images"
-                / f"{self._sanitize_filename(gag.title)}.jpg"
+    def _apply_download_event(self, event: ProgressEvent) -> None:
+        """Count a cached or finished gag in the progress frame.
+
+        Args:
+            event: CACHED or RESULT event from the download worker.
+        """
+        gag = event.gag
+        if event.type is ProgressEventType.CACHED:
+            self.progress_frame.increment_counters(cached=True, is_video=event.is_video)
+            self.progress_frame.update_current_item(
+                gag.title, event.index, is_video=event.is_video, is_cached=True
             )
-            video_path = (
-                Path(destination_folder)
-                / "gags/videos"
-                / f"{self._sanitize_filename(gag.title)}.mp4"
+        elif event.success:
+            self.progress_frame.increment_counters(success=True, is_video=event.is_video)
+            self.progress_frame.update_current_item(
+                gag.title,
+                self.progress_frame.processed_items - 1,
+                is_video=event.is_video,
             )
+            self.logger.info(
+                f"Downloaded as {'video' if event.is_video else 'image'}: {gag.title}"
+            )
+        else:
+            self.progress_frame.increment_counters(failure=True)
 
-            if image_path.exists() or video_path.exists():
-                is_cached = True
-                is_video = video_path.exists()
-                already_downloaded += 1
-                self.progress_frame.increment_counters(cached=True, is_video=is_video)
-                self.progress_frame.update_current_item(
-                    gag.title, i, is_video=is_video, is_cached=True
-                )
-                successful += 1
-                continue
+    def _update_progress(self, event: ProgressEvent) -> None:
+        """Refresh the progress bar with the latest event.
 
-            # Download the gag
-            # First, try as video (our downloader tries video first, then image)
-            download_result = self.downloader.download_gag(gag, destination_folder)
+        Args:
+            event: Most recent event from the download worker.
+        """
+        total_gags = self.progress_frame.total_items
+        processed = self.progress_frame.processed_items
+        if total_gags:
+            progress_percent = processed / total_gags
+        else:
+            # The export is still being parsed
+            progress_percent = 0.0
+        progress_int = int(progress_percent * 100)
+
+        # Calculate estimated time remaining
+        elapsed = time.time() - self._download_start_time
+        items_per_second = processed / elapsed if elapsed > 0 else 0
+        if items_per_second > 0 and total_gags is not None:
+            remaining_seconds = (total_gags - processed) / items_per_second
+            minutes = int(remaining_seconds // 60)
+            seconds = int(remaining_seconds % 60)
+            remaining_time = f"{minutes:02d}:{seconds:02d}"
+        else:
+            remaining_time = "--:--"
+
+        self.progress_frame.set_concurrency(event.concurrency)
+        self.progress_frame.set_progress_bar(
+            progress_percent,
+            progress_int,
+            color=Color.MAIN,
+            remaining_time=remaining_time,
+        )
 
-            if download_result:
-                successful += 1
-                self.progress_frame.increment_counters(
-                    success=True, is_video=gag.is_video
-                )
-                self.progress_frame.update_current_item(
-                    gag.title, i, is_video=gag.is_video
-                )
-                self.logger.info(
-                    f"Downloaded as {'video' if gag.is_video else 'image'}: {gag.title}"
-                )
-            else:
-                failed += 1
-                self.progress_frame.increment_counters(failure=True)
+        # Update status message
+        total_text = self.progress_frame.total_text
+        self.set_progress_message(
+            f"Downloading gag: {event.gag.title} ({processed}/{total_text})",
+            color=Color.SUCCESS,
+        )
+
+    def _finish_downloads(self) -> None:
+        """Show the final statistics once the download worker is done."""
+        self._download_worker = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        if self._download_error is not None:
+            # Parsing happens on the worker, so this is where its errors end up
+            self.progress_frame.flush()
+            self.set_progress_message(f"Download failed: {self._download_error}", color=Color.ERROR)
+            self.download_frame.enable_download_button()
+            self.progress_frame.pack_open_log_button()
+            return
+
+        if self.progress_frame.total_items == 0:
+            self.logger.error("No upvoted or saved gags found")
+            self.progress_frame.flush()
+            self.set_progress_message(
+                text="No upvoted or saved gags found", color=Color.ERROR
+            )
+            self.download_frame.enable_download_button()
+            return
+
+        already_downloaded = self.progress_frame.cached_items
+        successful = self.progress_frame.successful_items + already_downloaded
+        failed = self.progress_frame.failed_items
+
+        # Gags listed in both sections are only downloaded once
+        duplicates = self._deduplicator.duplicates
+        duplicates_text = f", {duplicates} duplicates skipped" if duplicates else ""
+        if duplicates:
+            self.logger.info(f"Skipped {duplicates} duplicate gags")
 
         # Update progress to complete
         self.progress_frame.set_progress_bar(1.0, 100, color=Color.SUCCESS)
@@ -490,35 +622,89 @@ class App(ctk.CTk):
             status_color = Color.SUCCESS
 
         # Final message takes into account already downloaded files
-        if already_downloaded > 0:
+        if self.progress_frame.is_download_cancelled():
             self.set_progress_message(
-                f"Download finished: {successful} successful ({already_downloaded} already downloaded), {failed} failed",
+                f"Download canceled: {successful} successful, {failed} failed, {already_downloaded} already downloaded{duplicates_text}",
+                color=Color.WARNING,
+            )
+        elif already_downloaded > 0:
+            self.set_progress_message(
+                f"Download finished: {successful} successful ({already_downloaded} already downloaded), {failed} failed{duplicates_text}",
                 color=status_color,
             )
         else:
             self.set_progress_message(
-                f"Download finished: {successful} successful, {failed} failed",
+                f"Download finished: {successful} successful, {failed} failed{duplicates_text}",
                 color=status_color,
             )
 
         # Enable UI elements
         self.download_frame.enable_download_button()
         self.progress_frame.pack_open_log_button()
-        self.update()
 
-    def _sanitize_filename(self, title: str) -> str:
-        """Sanitize a title for use in filenames.
+    def destroy(self) -> None:
+        """Stop a running download before the window is closed.
+
+        The worker is joined before the journal is closed, so the handler is
+        no longer in use once the window is gone and can be closed.
+        """
+        worker = self._download_worker
+        if worker is not None:
+            worker.cancel()
+            worker.join(self.SHUTDOWN_TIMEOUT)
+            if worker.is_alive():
+                self.logger.warning(
+                    f"Download did not stop within {self.SHUTDOWN_TIMEOUT:.0f} seconds"
+                )
+            self._download_worker = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        super().destroy()
+
+    def _create_engine(
+        self, journal: Optional[JobJournal] = None
+    ) -> Union[DownloadEngine, "AsyncDownloadEngine"]:
+        """Create the download engine selected in the settings.
 
         Args:
-            title: Title to sanitize.
+            journal: Optional journal the engine records the run in.
 
         Returns:
-            Sanitized title.
+            Thread pool or asyncio based download engine.
         """
-        import re
+        settings = self.settings_manager.settings
+        controller = None
+        if settings.adaptive_concurrency:
+            controller = ConcurrencyController(
+                min_concurrency=1,
+                max_concurrency=max(settings.max_download_workers, 1),
+                initial_concurrency=settings.download_workers,
+                logger=self.logger,
+            )
 
-        sanitized = re.sub(r'[\\/*?:"<>|]', "", title)
-        return sanitized[:100]  # Limit length to 100 chars
+        if settings.download_backend == "asyncio":
+            try:
+                # aiohttp is only loaded for the asyncio backend
+                from src.core.downloader import AsyncDownloadEngine
+
+                return AsyncDownloadEngine(
+                    self.downloader,
+                    max_concurrency=settings.download_workers,
+                    logger=self.logger,
+                    controller=controller,
+                    journal=journal,
+                )
+            except ImportError as e:
+                self.logger.warning(f"{str(e)}, falling back to threads")
+
+        return DownloadEngine(
+            self.downloader,
+            max_workers=settings.download_workers,
+            logger=self.logger,
+            controller=controller,
+            journal=journal,
+        )
 
     def set_progress_message(self, text: str, color: str = Color.WHITE) -> None:
         """Set the progress message displayed to the user.
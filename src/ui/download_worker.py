@@ -0,0 +1,174 @@
+"""Background download worker for the UI.
+
+DownloadWorker runs a download engine on its own thread so the Tk main
+loop never blocks on the network. Progress is reported as ProgressEvents
+on a thread-safe queue, which the UI drains from the main thread with
+after(). The worker never touches a widget.
+
+The gags may come from a lazy iterator, such as HtmlParser.iter_gags, in
+which case parsing also happens on the worker thread. A TOTAL event is
+posted once the number of gags is known.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Union
+
+from src.core.downloader import DownloadEngine, DownloadResult
+from src.core.models import Gag
+
+if TYPE_CHECKING:
+    from src.core.downloader import AsyncDownloadEngine
+
+# Returns whether an already downloaded gag is a video, None if not downloaded yet
+DownloadedCheck = Callable[[Gag, str], Optional[bool]]
+
+
+class ProgressEventType(Enum):
+    """Kinds of progress events."""
+
+    CACHED = auto()
+    RESULT = auto()
+    TOTAL = auto()
+    ERROR = auto()
+    FINISHED = auto()
+
+
+@dataclass
+class ProgressEvent:
+    """Progress update posted by the download worker."""
+
+    type: ProgressEventType
+    gag: Optional[Gag] = None
+    index: int = -1
+    success: bool = False
+    is_video: bool = False
+    concurrency: int = 0
+    error: Optional[str] = None
+
+    # Number of gags, set on TOTAL events
+    total: Optional[int] = None
+
+
+class DownloadWorker:
+    """Runs the download pipeline on a background thread."""
+
+    def __init__(
+        self,
+        engine: Union[DownloadEngine, "AsyncDownloadEngine"],
+        gags: Iterable[Gag],
+        destination_folder: str,
+        find_downloaded: DownloadedCheck,
+    ):
+        """Initialize the worker.
+
+        Args:
+            engine: Download engine doing the actual downloads.
+            gags: Gags to download, consumed on the worker thread.
+            destination_folder: Folder to save the downloaded content.
+            find_downloaded: Check for gags that were downloaded before,
+                called on the worker thread.
+        """
+        self.engine = engine
+        self.gags = gags
+        self.destination_folder = destination_folder
+        self.find_downloaded = find_downloaded
+
+        self.events: "queue.Queue[ProgressEvent]" = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gag-download-worker", daemon=True)
+
+    def start(self) -> None:
+        """Start downloading on the background thread."""
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop the downloads. Safe to call from any thread."""
+        self._cancel_event.set()
+        self.engine.cancel()
+
+    def is_alive(self) -> bool:
+        """Check whether the worker thread is still running.
+
+        Returns:
+            True while downloads are running.
+        """
+        return self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the worker thread to finish.
+
+        Args:
+            timeout: Seconds to wait at most, None to wait forever.
+        """
+        self._thread.join(timeout)
+
+    def drain(self, max_events: int) -> List[ProgressEvent]:
+        """Take the pending events off the queue without blocking.
+
+        Args:
+            max_events: Maximum number of events to return.
+
+        Returns:
+            Events in the order they were posted.
+        """
+        events: List[ProgressEvent] = []
+        while len(events) < max_events:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _pending_gags(self) -> Iterator[Gag]:
+        """Yield the gags that still need downloading, reporting cached ones."""
+        total = 0
+        for index, gag in enumerate(self.gags):
+            if self._cancel_event.is_set():
+                return
+            total = index + 1
+
+            is_video = self.find_downloaded(gag, self.destination_folder)
+            if is_video is not None:
+                self.events.put(
+                    ProgressEvent(
+                        ProgressEventType.CACHED,
+                        gag=gag,
+                        index=index,
+                        success=True,
+                        is_video=is_video,
+                        concurrency=self.engine.concurrency,
+                    )
+                )
+                continue
+
+            yield gag
+
+        self.events.put(ProgressEvent(ProgressEventType.TOTAL, total=total))
+
+    def _on_result(self, result: DownloadResult) -> None:
+        """Post a finished download."""
+        self.events.put(
+            ProgressEvent(
+                ProgressEventType.RESULT,
+                gag=result.gag,
+                index=result.index,
+                success=result.success,
+                is_video=result.gag.is_video,
+                concurrency=self.engine.concurrency,
+                error=result.error,
+            )
+        )
+
+    def _run(self) -> None:
+        """Run the engine and post a FINISHED event when done."""
+        try:
+            self.engine.run(
+                self._pending_gags(), self.destination_folder, on_result=self._on_result
+            )
+        except Exception as e:
+            self.events.put(ProgressEvent(ProgressEventType.ERROR, error=str(e)))
+        finally:
+            self.events.put(ProgressEvent(ProgressEventType.FINISHED))
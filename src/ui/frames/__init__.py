@@ -6,6 +6,7 @@ from .download_frame import DownloadFrame
 from .header_frame import HeaderFrame
 from .progress_bar_frame import ProgressBarFrame
 from .source_file_frame import SourceFileFrame
+from .throttle_frame import ThrottleFrame
 
 __all__ = [
     "CheckboxesFrame",
@@ -14,4 +15,5 @@ __all__ = [
     "HeaderFrame",
     "ProgressBarFrame",
     "SourceFileFrame",
+    "ThrottleFrame",
 ]
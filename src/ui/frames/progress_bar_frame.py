@@ -1,8 +1,12 @@
 """Progress bar frame for displaying download progress.
 
 This frame shows a detailed progress bar with statistics to track the download progress.
+Updates only change plain attributes, the widgets are repainted with the latest
+state at most every RENDER_INTERVAL seconds. The total may be unknown while the
+export is still being parsed, it is shown as "?" until it is set.
 """
 
+import time
 import tkinter as tk
 from typing import Any, Dict, Optional
 
@@ -15,6 +19,9 @@ from src.utils.logging import Logger
 class ProgressBarFrame(ctk.CTkFrame):
     """Frame containing a detailed progress bar and download statistics."""
 
+    # Minimum seconds between two repaints of the widgets
+    RENDER_INTERVAL = 0.075
+
     def __init__(self, master: Any, theme: Theme, **kwargs: Dict[str, Any]):
         """Initialize the progress bar frame.
 
@@ -241,6 +248,25 @@ class ProgressBarFrame(ctk.CTkFrame):
         )
         self.status_value.grid(row=2, column=1, sticky=tk.E, padx=(5, 0))
 
+        # Downloads in flight
+        concurrency_label = ctk.CTkLabel(
+            stats_frame,
+            text="Parallel Downloads:",
+            font=self.theme.small_font,
+            text_color=self.theme.text_color,
+            anchor="w",
+        )
+        concurrency_label.grid(row=3, column=0, sticky=tk.W)
+
+        self.concurrency_value = ctk.CTkLabel(
+            stats_frame,
+            text="-",
+            font=self.theme.small_font,
+            text_color=self.theme.text_color,
+            anchor="w",
+        )
+        self.concurrency_value.grid(row=3, column=0, sticky=tk.E, padx=(5, 0))
+
         # Media type stats frame
         media_stats_frame = ctk.CTkFrame(status_section, fg_color="transparent")
         media_stats_frame.pack(fill=tk.X, pady=(self.theme.small_padding, 0))
@@ -328,8 +354,8 @@ class ProgressBarFrame(ctk.CTkFrame):
         # Pack buttons
         self.cancel_button.pack(side=tk.LEFT, padx=self.theme.small_padding)
 
-        # Initialize variables for download tracking
-        self.total_items = 0
+        # Initialize variables for download tracking, None while the total is unknown
+        self.total_items: Optional[int] = 0
         self.processed_items = 0
         self.successful_items = 0
         self.failed_items = 0
@@ -338,12 +364,108 @@ class ProgressBarFrame(ctk.CTkFrame):
         self.video_items = 0
         self.is_canceled = False
 
+        # Latest state to show, applied to the widgets by _render()
+        self.current_item = "None"
+        self.current_is_video: Optional[bool] = None
+        self.status = ("Ready", self.theme.info_color)
+        self.progress = (0.0, 0, self.theme.text_color)
+        self.remaining_time = "--:--"
+        self.concurrency: Optional[int] = None
+
+        # Widget options as last rendered, so unchanged widgets are skipped
+        self._rendered: Dict[str, Any] = {}
+        self._last_render = 0.0
+        self._render_pending = False
+
+    def _schedule_render(self) -> None:
+        """Schedule a repaint, at most one per RENDER_INTERVAL."""
+        if self._render_pending:
+            return
+
+        self._render_pending = True
+        elapsed = time.monotonic() - self._last_render
+        delay = max(0.0, self.RENDER_INTERVAL - elapsed)
+        self.after(int(delay * 1000), self._render)
+
+    def _configure(self, widget: Any, key: str, **options: Any) -> None:
+        """Configure a widget if its options changed since the last render.
+
+        Args:
+            widget: Widget to configure.
+            key: Name of the widget in the render cache.
+            **options: Options to pass to configure().
+        """
+        if self._rendered.get(key) != options:
+            self._rendered[key] = options
+            widget.configure(**options)
+
+    def _render(self) -> None:
+        """Apply the latest state to the widgets."""
+        self._render_pending = False
+        self._last_render = time.monotonic()
+
+        self._configure(self.total_items_value, "total", text=self.total_text)
+        self._configure(self.processed_value, "processed", text=str(self.processed_items))
+        self._configure(self.success_value, "success", text=str(self.successful_items))
+        self._configure(self.failed_value, "failed", text=str(self.failed_items))
+        self._configure(self.cached_value, "cached", text=str(self.cached_items))
+        self._configure(self.image_count, "images", text=str(self.image_items))
+        self._configure(self.video_count, "videos", text=str(self.video_items))
+        self._configure(self.current_item_value, "current", text=self.current_item)
+
+        # Update file type indicator
+        if self.current_is_video is None:
+            self._configure(self.file_type_indicator, "file_type", text="")
+        elif self.current_is_video:
+            self._configure(
+                self.file_type_indicator,
+                "file_type",
+                text="Video 🎬",
+                text_color=self.theme.warning_color,
+            )
+        else:
+            self._configure(
+                self.file_type_indicator,
+                "file_type",
+                text="Image 🖼️",
+                text_color=self.theme.info_color,
+            )
+
+        status_text, status_color = self.status
+        self._configure(self.status_value, "status", text=status_text, text_color=status_color)
+
+        progress_value, progress_percentage, color = self.progress
+        if self._rendered.get("progress_bar") != progress_value:
+            self._rendered["progress_bar"] = progress_value
+            self.progress_bar.set(progress_value)
+        self._configure(
+            self.progress_bar_percentage,
+            "percentage",
+            text=f"{progress_percentage}%",
+            text_color=color,
+        )
+
+        self._configure(self.time_estimate, "time", text=f"Est. time: {self.remaining_time}")
+        self._configure(
+            self.concurrency_value,
+            "concurrency",
+            text="-" if self.concurrency is None else str(self.concurrency),
+        )
+
+    @property
+    def total_text(self) -> str:
+        """Total number of items as shown to the user, "?" while unknown."""
+        return "?" if self.total_items is None else str(self.total_items)
+
+    def flush(self) -> None:
+        """Render the latest state right away instead of waiting for the next repaint."""
+        self._render()
+
     def _cancel_download(self) -> None:
         """Cancel the current download."""
         self.is_canceled = True
-        self.status_value.configure(
-            text="Canceling...", text_color=self.theme.warning_color
-        )
+        self.status = ("Canceling...", self.theme.warning_color)
+        self.flush()
         self.logger_instance.info("Download canceled by user")
 
     def pack_open_log_button(self) -> None:
@@ -368,32 +490,26 @@ class ProgressBarFrame(ctk.CTkFrame):
         self.video_items = 0
         self.is_canceled = False
 
+        self.current_item = "None"
+        self.current_is_video = None
+        self.status = ("Ready", self.theme.info_color)
+        self.progress = (0.0, 0, self.theme.text_color)
+        self.remaining_time = "--:--"
+        self.concurrency = None
+
         # Update UI
-        self.total_items_value.configure(text="0")
-        self.processed_value.configure(text="0")
-        self.success_value.configure(text="0")
-        self.failed_value.configure(text="0")
-        self.cached_value.configure(text="0")
-        self.image_count.configure(text="0")
-        self.video_count.configure(text="0")
-        self.current_item_value.configure(text="None")
-        self.file_type_indicator.configure(text="")
-        self.status_value.configure(text="Ready", text_color=self.theme.info_color)
-        self.time_estimate.configure(text="Est. time: --:--")
-        self.progress_bar.set(0)
-        self.progress_bar_percentage.configure(
-            text="0%", text_color=self.theme.text_color
-        )
-
-    def set_total_items(self, total: int) -> None:
+        self.flush()
+
+    def set_total_items(self, total: Optional[int]) -> None:
         """Set the total number of items to download.
 
         Args:
-            total: Total number of items to download.
+            total: Total number of items to download, None if not known yet.
         """
         self.total_items = total
-        self.total_items_value.configure(text=str(total))
-        self.status_value.configure(text="Starting", text_color=self.theme.info_color)
+        if self.processed_items == 0:
+            self.status = ("Starting", self.theme.info_color)
+        self._schedule_render()
 
     def update_current_item(
         self,
@@ -410,33 +526,16 @@ class ProgressBarFrame(ctk.CTkFrame):
             is_video: Whether the item is a video or image.
             is_cached: Whether the item was already downloaded.
         """
-        # Update the current item label
-        self.current_item_value.configure(
-            text=f"{item_title} ({current_index + 1}/{self.total_items})"
-        )
-
-        # Update file type indicator
-        if is_video is not None:
-            if is_video:
-                self.file_type_indicator.configure(
-                    text="Video 🎬", text_color=self.theme.warning_color
-                )
-            else:
-                self.file_type_indicator.configure(
-                    text="Image 🖼️", text_color=self.theme.info_color
-                )
-        else:
-            self.file_type_indicator.configure(text="")
+        self.current_item = f"{item_title} ({current_index + 1}/{self.total_text})"
+        self.current_is_video = is_video
 
         # Update status
         if is_cached:
-            self.status_value.configure(
-                text="Already Downloaded", text_color=self.theme.info_color
-            )
+            self.status = ("Already Downloaded", self.theme.info_color)
         else:
-            self.status_value.configure(
-                text="Downloading", text_color=self.theme.success_color
-            )
+            self.status = ("Downloading", self.theme.success_color)
+
+        self._schedule_render()
 
     def increment_counters(
         self,
@@ -453,38 +552,32 @@ class ProgressBarFrame(ctk.CTkFrame):
             cached: Whether to increment the cached counter.
             is_video: Whether the item is a video.
         """
-        # Increment processed counter
         self.processed_items += 1
-        self.processed_value.configure(text=str(self.processed_items))
 
-        # Increment specific counters
         if success:
             self.successful_items += 1
-            self.success_value.configure(text=str(self.successful_items))
-
-            # Increment media type counter
-            if is_video:
-                self.video_items += 1
-                self.video_count.configure(text=str(self.video_items))
-            else:
-                self.image_items += 1
-                self.image_count.configure(text=str(self.image_items))
-
         if failure:
             self.failed_items += 1
-            self.failed_value.configure(text=str(self.failed_items))
-
         if cached:
             self.cached_items += 1
-            self.cached_value.configure(text=str(self.cached_items))
 
-            # For cached items, also increment the media type counter
+        # Downloaded and cached items both count per media type
+        if success or cached:
             if is_video:
                 self.video_items += 1
-                self.video_count.configure(text=str(self.video_items))
             else:
                 self.image_items += 1
-                self.image_count.configure(text=str(self.image_items))
+
+        self._schedule_render()
+
+    def set_concurrency(self, level: int) -> None:
+        """Show the number of downloads currently running in parallel.
+
+        Args:
+            level: Current concurrency level of the download engine.
+        """
+        self.concurrency = level
+        self._schedule_render()
 
     def set_progress_bar(
         self,
@@ -503,27 +596,18 @@ class ProgressBarFrame(ctk.CTkFrame):
         """
         # Ensure progress_value is in the range [0, 1]
         progress_value = max(0, min(1, progress_value))
-
-        # Update progress bar
-        self.progress_bar.set(progress_value)
-
-        # Update percentage label
-        self.progress_bar_percentage.configure(
-            text=f"{progress_percentage}%", text_color=color
-        )
+        self.progress = (progress_value, progress_percentage, color)
 
         # Update time estimate if provided
         if remaining_time:
-            self.time_estimate.configure(text=f"Est. time: {remaining_time}")
+            self.remaining_time = remaining_time
 
-        # Update status when complete
+        # Update status when complete, and show the final state right away
         if progress_value >= 1.0:
-            self.status_value.configure(
-                text="Complete", text_color=self.theme.success_color
-            )
-
-        # Update the UI
-        self.update()
+            self.status = ("Complete", self.theme.success_color)
+            self.flush()
+        else:
+            self._schedule_render()
 
     def is_download_cancelled(self) -> bool:
         """Check if the download was cancelled by the user.
@@ -0,0 +1,156 @@
+"""Throttle frame for limiting the download speed.
+
+This frame lets the user cap the request rate and the bandwidth used for
+downloading. The limits can be changed while a download is running.
+"""
+
+import tkinter as tk
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import customtkinter as ctk
+
+from src.config import Theme
+
+
+class ThrottleFrame(ctk.CTkFrame):
+    """Frame with inputs for the download rate limits."""
+
+    def __init__(self, master: Any, theme: Theme, **kwargs: Dict[str, Any]):
+        """Initialize the throttle frame.
+
+        Args:
+            master: Parent widget.
+            theme: Theme configuration.
+            **kwargs: Additional keyword arguments to pass to CTkFrame.
+        """
+        super().__init__(master, **kwargs)
+        self.theme = theme
+
+        # Callback for when the limits change
+        self.limits_changed_callback: Optional[Callable[[float, float], None]] = None
+
+        self._create_widgets()
+
+    def _create_widgets(self) -> None:
+        """Create and place the widgets in the frame."""
+        container = ctk.CTkFrame(self, fg_color="transparent")
+        container.pack(padx=self.theme.padding, pady=self.theme.padding, fill=tk.BOTH, expand=True)
+
+        title_label = ctk.CTkLabel(
+            container, text="Speed Limits", font=self.theme.title_font, anchor="w"
+        )
+        title_label.pack(anchor="w", pady=(0, self.theme.small_padding))
+
+        input_row = ctk.CTkFrame(container, fg_color="transparent")
+        input_row.pack(fill=tk.X, pady=self.theme.small_padding)
+
+        self.requests_entry = self._create_entry(input_row, "Requests/s:")
+        self.bandwidth_entry = self._create_entry(input_row, "KB/s:")
+
+        self.apply_button = ctk.CTkButton(
+            input_row,
+            text="Apply",
+            width=self.theme.button_width,
+            height=self.theme.button_height,
+            font=self.theme.normal_font,
+            fg_color=self.theme.button_color,
+            hover_color=self.theme.button_hover_color,
+            text_color=self.theme.button_text_color,
+            corner_radius=self.theme.button_corner_radius,
+            command=self._on_apply,
+        )
+        self.apply_button.pack(side=tk.RIGHT, padx=(self.theme.small_padding, 0))
+
+        help_text = ctk.CTkLabel(
+            container,
+            text="Leave empty or set to 0 for no limit. Applies to running downloads too.",
+            font=self.theme.small_font,
+            text_color=self.theme.entry_placeholder_color,
+            anchor="w",
+        )
+        help_text.pack(anchor="w", pady=(self.theme.small_padding, 0))
+
+    def _create_entry(self, master: Any, label: str) -> ctk.CTkEntry:
+        """Create a labelled entry for one limit.
+
+        Args:
+            master: Parent widget.
+            label: Text of the label in front of the entry.
+
+        Returns:
+            The created entry.
+        """
+        ctk.CTkLabel(master, text=label, font=self.theme.normal_font).pack(
+            side=tk.LEFT, padx=(0, self.theme.small_padding)
+        )
+        entry = ctk.CTkEntry(
+            master,
+            width=80,
+            placeholder_text="0",
+            font=self.theme.normal_font,
+            fg_color=self.theme.entry_bg,
+            text_color=self.theme.entry_fg,
+            placeholder_text_color=self.theme.entry_placeholder_color,
+            corner_radius=self.theme.corner_radius,
+        )
+        entry.pack(side=tk.LEFT, padx=(0, self.theme.padding))
+        entry.bind("<Return>", lambda _event: self._on_apply())
+        return entry
+
+    @staticmethod
+    def _parse_limit(value: str) -> float:
+        """Parse the value of a limit entry.
+
+        Args:
+            value: Text of the entry.
+
+        Returns:
+            The limit, 0 if the entry is empty or invalid.
+        """
+        try:
+            return max(0.0, float(value.strip() or 0))
+        except ValueError:
+            return 0.0
+
+    def _on_apply(self) -> None:
+        """Handle the apply button."""
+        requests_per_second, kilobytes_per_second = self.get_limits()
+        self.set_limits(requests_per_second, kilobytes_per_second)
+        if self.limits_changed_callback:
+            self.limits_changed_callback(requests_per_second, kilobytes_per_second)
+
+    def set_limits_changed_callback(self, callback: Callable[[float, float], None]) -> None:
+        """Set the callback for when the limits change.
+
+        Args:
+            callback: Function to call when the limits are applied.
+                     Takes two float arguments: requests per second and KB/s,
+                     0 meaning unlimited.
+        """
+        self.limits_changed_callback = callback
+
+    def get_limits(self) -> Tuple[float, float]:
+        """Get the entered limits.
+
+        Returns:
+            Tuple of requests per second and KB/s, 0 meaning unlimited.
+        """
+        return (
+            self._parse_limit(self.requests_entry.get()),
+            self._parse_limit(self.bandwidth_entry.get()),
+        )
+
+    def set_limits(self, requests_per_second: float, kilobytes_per_second: float) -> None:
+        """Show the given limits in the entries.
+
+        Args:
+            requests_per_second: Maximum requests per second, 0 for unlimited.
+            kilobytes_per_second: Maximum bandwidth in KB/s, 0 for unlimited.
+        """
+        for entry, value in (
+            (self.requests_entry, requests_per_second),
+            (self.bandwidth_entry, kilobytes_per_second),
+        ):
+            entry.delete(0, tk.END)
+            if value:
+                entry.insert(0, f"{value:g}")
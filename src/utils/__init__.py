@@ -1,13 +1,22 @@
-"""Utilities package for the application."""
+"""Utilities package for the application.
 
-from .utils import (
-    GagDetail,
-    create_dirs_if_not_exist,
-    extract_gags,
-    get_gag_details,
-    open_log,
-    read_html_file,
-)
+The helpers of the utils module are imported on first access, so using
+the logging package does not load BeautifulSoup.
+"""
+
+from typing import TYPE_CHECKING
+
+from .lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .utils import (
+        GagDetail,
+        create_dirs_if_not_exist,
+        extract_gags,
+        get_gag_details,
+        open_log,
+        read_html_file,
+    )
 
 __all__ = [
     "GagDetail",
@@ -17,3 +26,5 @@ __all__ = [
     "open_log",
     "read_html_file",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {name: ".utils" for name in __all__})
@@ -1,5 +1,5 @@
 """Helper utilities for the application."""
 
-from .file_utils import create_dirs_if_not_exist, ensure_dir_exists
+from .file_utils import create_dirs_if_not_exist, ensure_dir_exists, file_hash
 
-__all__ = ["create_dirs_if_not_exist", "ensure_dir_exists"]
+__all__ = ["create_dirs_if_not_exist", "ensure_dir_exists", "file_hash"]
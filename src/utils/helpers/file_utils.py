@@ -1,5 +1,6 @@
 """File utilities."""
 
+import hashlib
 from pathlib import Path
 from typing import Union
 
@@ -18,6 +19,23 @@ def ensure_dir_exists(directory_path: Union[str, Path]) -> Path:
     return path
 
 
+def file_hash(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 of a file in chunks.
+
+    Args:
+        path: File to hash.
+        chunk_size: Bytes read at a time.
+
+    Returns:
+        Hex digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def create_dirs_if_not_exist(selected_path: str) -> None:
     """Create gags folders if they don't exist.
 
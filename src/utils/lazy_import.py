@@ -0,0 +1,44 @@
+"""Lazy attribute loading for packages (PEP 562).
+
+Packages such as the downloader or the parser re-export classes from
+modules that import requests, aiohttp or BeautifulSoup. With lazy_exports
+a package only imports such a module when one of its names is first
+accessed, so importing the package stays cheap and commands that never
+use a subsystem never pay for loading it.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Create the module __getattr__ and __dir__ of a package.
+
+    Usage in a package __init__:
+
+        __getattr__, __dir__ = lazy_exports(__name__, {"Name": ".module"})
+
+    Args:
+        package: Name of the package, usually __name__.
+        exports: Module each public name is defined in, relative to the package.
+
+    Returns:
+        The __getattr__ and __dir__ functions for the package.
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # Cache it, so the next access does not go through __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
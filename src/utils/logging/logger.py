@@ -63,7 +63,11 @@ class Logger:
     """Wrapper around Python's logging module."""
 
     def __init__(
-        self, name: str, log_level: int = logging.INFO, log_file: Optional[str] = None
+        self,
+        name: str,
+        log_level: int = logging.INFO,
+        log_file: Optional[str] = None,
+        console: bool = True,
     ):
         """Initialize a logger.
 
@@ -71,10 +75,11 @@ class Logger:
             name: Logger name.
             log_level: Logging level.
             log_file: Log file path. If None, defaults to "{name}.log".
+            console: Whether to log to the console as well.
         """
         self.name = name
         self.log_file = log_file or f"{name}.log"
-        self.logger = setup_logger(name, log_level, self.log_file)
+        self.logger = setup_logger(name, log_level, self.log_file, console=console)
 
     def error(self, message: str) -> None:
         """Log an error message.
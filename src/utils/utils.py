@@ -1,34 +1,32 @@
 """Helper functions for the application."""
 
 import os
-from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List
 
 from bs4 import BeautifulSoup
 
+from src.core.models import Gag
 
-@dataclass
-class GagDetail:
-    """Data class representing a gag detail extracted from HTML."""
-
-    id: str
-    title: str
-    url: Optional[str] = None
+# Former duplicate of Gag, kept as an alias for compatibility
+GagDetail = Gag
 
 
 def read_html_file(file_name: str) -> BeautifulSoup:
     """Read an HTML file and returns a BeautifulSoup object.
 
+    Kept for compatibility, use HtmlParser.read_html_file instead.
+
     Args:
         file_name: Path to the HTML file.
 
     Returns:
         BeautifulSoup object.
     """
-    with open(file_name, "r", encoding="utf-8") as fp:
-        soup = BeautifulSoup(fp, "html.parser")
-        return soup
+    # Imported here, the parser package itself depends on src.utils
+    from src.core.parser import HtmlParser
+
+    return HtmlParser.read_html_file(file_name)
 
 
 def create_dirs_if_not_exist(selected_path: str) -> None:
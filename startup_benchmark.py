@@ -0,0 +1,178 @@
+"""
+Startup benchmark for 9GAG Downloader.
+This script measures how long the command line takes until its first output.
+
+Every scenario starts a fresh interpreter, with HOME pointing to an empty
+temporary folder, so the saved settings and caches of the user play no role.
+
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 20 --budget-ms 200
+    python startup_benchmark.py --importtime
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent
+
+ROW = '<tr><td>2021</td><td><a href="https://9gag.com/gag/{id}">link</a></td><td>{id}</td></tr>\n'
+
+
+def write_export(path: Path, gags: int) -> None:
+    """Write a data export with the given number of upvoted gags."""
+    rows = "".join(ROW.format(id=f"a{index}") for index in range(gags))
+    path.write_text(
+        "<html><body>\n<h3>Upvotes</h3>\n<table>\n" + rows + "</table>\n</body></html>\n",
+        encoding="utf-8",
+    )
+
+
+def time_until_exit(command: List[str], env: Dict[str, str]) -> float:
+    """Run a command to the end and get the seconds it took."""
+    start = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, env=env, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def time_until_output(command: List[str], env: Dict[str, str]) -> float:
+    """Run a command until it writes its first byte to stderr, then stop it.
+
+    The download command writes its first progress line to stderr before
+    anything is downloaded, so no request is sent.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        first = process.stderr.read(1)
+        elapsed = time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+        process.stderr.close()
+    if not first:
+        raise RuntimeError(f"No output from {' '.join(command)}")
+    return elapsed
+
+
+def import_times(command: List[str], env: Dict[str, str], top: int) -> List[Tuple[int, str]]:
+    """Get the modules that took longest to import before the first output.
+
+    The command runs with -X importtime and is stopped at the first line of
+    its own output, so only imports that delay the first output are listed.
+
+    Returns:
+        Cumulative microseconds and module name, slowest first.
+    """
+    process = subprocess.Popen(
+        [command[0], "-X", "importtime"] + command[1:],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    times = []
+    try:
+        for line in process.stderr:
+            if not line.startswith("import time:"):
+                break
+            if "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            # Modules and what they import directly, deeper ones are part of those
+            if len(name) - len(name.lstrip()) > 3:
+                continue
+            times.append((int(cumulative), name.strip()))
+    finally:
+        process.kill()
+        process.wait()
+        process.stderr.close()
+    return sorted(times, reverse=True)[:top]
+
+
+def measure(run: Callable[[], float], runs: int) -> List[float]:
+    """Run a scenario once to warm up the file cache, then the given number of times."""
+    run()
+    return [run() for _ in range(runs)]
+
+
+def main() -> int:
+    """Run the benchmark.
+
+    Returns:
+        Exit code, 1 if the command line is slower than the budget.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--runs", type=int, default=10, help="runs per scenario")
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail if the median time to first output is larger"
+    )
+    parser.add_argument(
+        "--importtime", action="store_true", help="list the slowest imports of the command line"
+    )
+    parser.add_argument("--top", type=int, default=15, help="imports to list with --importtime")
+    args = parser.parse_args()
+
+    temp_dir = Path(tempfile.mkdtemp(prefix="9gag_startup_"))
+    try:
+        env = dict(os.environ, HOME=str(temp_dir), APPDATA=str(temp_dir))
+        export = temp_dir / "export.html"
+        write_export(export, 1000)
+        python = [sys.executable]
+        download = python + [
+            "-m",
+            "src",
+            "download",
+            str(export),
+            "--dest",
+            str(temp_dir / "gags"),
+            "--upvoted",
+            "--log-file",
+            str(temp_dir / "cli.log"),
+        ]
+
+        scenarios = [
+            ("interpreter", lambda: time_until_exit(python + ["-c", "pass"], env)),
+            ("import src.cli", lambda: time_until_exit(python + ["-c", "import src.cli"], env)),
+            (
+                "download --help",
+                lambda: time_until_exit(python + ["-m", "src", "download", "--help"], env),
+            ),
+            ("download, first progress", lambda: time_until_output(download, env)),
+        ]
+
+        print(f"{'scenario':<28}{'min ms':>10}{'median ms':>12}")
+        medians = {}
+        for name, run in scenarios:
+            times = measure(run, args.runs)
+            medians[name] = statistics.median(times) * 1000
+            print(f"{name:<28}{min(times) * 1000:>10.1f}{medians[name]:>12.1f}")
+
+        if args.importtime:
+            print("\nSlowest imports before the first progress line (cumulative ms):")
+            for microseconds, module in import_times(download, env, args.top):
+                print(f"{microseconds / 1000:>10.1f}  {module}")
+
+        if args.budget_ms is not None:
+            slowest = max(medians["download --help"], medians["download, first progress"])
+            if slowest > args.budget_ms:
+                print(f"\nOver budget: {slowest:.1f} ms > {args.budget_ms:.0f} ms")
+                return 1
+            print(f"\nWithin budget: {slowest:.1f} ms <= {args.budget_ms:.0f} ms")
+        return 0
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
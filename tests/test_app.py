@@ -0,0 +1,81 @@
+"""Tests for the download flow of the application window."""
+
+import unittest
+from unittest.mock import MagicMock, call, patch
+
+from src.config import Color
+from src.core.storage import JobJournal
+
+try:
+    from src.ui.app import App
+    from src.ui.download_worker import DownloadWorker, ProgressEvent, ProgressEventType
+except ImportError:  # pragma: no cover - depends on the environment
+    App = None
+
+
+@unittest.skipIf(App is None, "customtkinter is not available")
+class TestAppDownloadFlow(unittest.TestCase):
+    """Test cases for the download flow, run on a window without a display."""
+
+    def setUp(self):
+        """Set up a window whose widgets are mocks."""
+        self.app = MagicMock(spec=App)
+        self.app.POLL_TIME_BUDGET = App.POLL_TIME_BUDGET
+        self.app.EVENT_BATCH_SIZE = App.EVENT_BATCH_SIZE
+        self.app.POLL_INTERVAL_MS = App.POLL_INTERVAL_MS
+        self.app.SHUTDOWN_TIMEOUT = App.SHUTDOWN_TIMEOUT
+        self.app._journal = None
+        self.app._download_error = None
+        self.app._finish_downloads = lambda: App._finish_downloads(self.app)
+        self.app.progress_frame = MagicMock()
+        self.app.download_frame = MagicMock()
+        self.app.logger = MagicMock()
+        self.app.progress_frame.is_download_cancelled.return_value = False
+        self.app.progress_frame.total_items = None
+
+        self.worker = MagicMock(spec=DownloadWorker)
+        self.app._download_worker = self.worker
+
+    def test_parse_error_shown_after_finish(self):
+        """Test that an error of the worker is not replaced by the final statistics."""
+        self.worker.drain.side_effect = [
+            [
+                ProgressEvent(ProgressEventType.ERROR, error="cannot read the export"),
+                ProgressEvent(ProgressEventType.FINISHED),
+            ],
+            [],
+        ]
+
+        App._poll_download_events(self.app)
+
+        self.app.set_progress_message.assert_called_with(
+            "Download failed: cannot read the export", color=Color.ERROR
+        )
+        self.app.progress_frame.set_progress_bar.assert_not_called()
+        self.app.download_frame.enable_download_button.assert_called_once()
+        self.assertIsNone(self.app._download_worker)
+
+    def test_destroy_stops_worker_before_closing(self):
+        """Test that closing the window waits for the worker and closes the journal."""
+        journal = MagicMock(spec=JobJournal)
+        self.app._journal = journal
+        self.worker.is_alive.return_value = False
+        calls = MagicMock()
+        calls.attach_mock(self.worker.cancel, "cancel")
+        calls.attach_mock(self.worker.join, "join")
+        calls.attach_mock(journal.close, "close")
+
+        with patch.object(App.__bases__[0], "destroy") as destroy:
+            destroy.side_effect = lambda: calls.destroy()
+            App.destroy(self.app)
+
+        self.assertEqual(
+            calls.mock_calls,
+            [call.cancel(), call.join(App.SHUTDOWN_TIMEOUT), call.close(), call.destroy()],
+        )
+        self.assertIsNone(self.app._journal)
+        self.assertIsNone(self.app._download_worker)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,311 @@
+"""Tests for the asyncio download engine."""
+
+import asyncio
+import os
+import shutil
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.core.downloader import AsyncDownloadEngine, DownloadHandler, RetryPolicy
+from src.core.models import Gag
+from src.core.storage import JobJournal
+from src.utils.logging import Logger
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:  # pragma: no cover - depends on the environment
+    web = None
+
+VIDEO_CONTENT = b"\x00\x00\x00\x18ftypmp42" + b"v" * 20000
+IMAGE_CONTENT = b"\xff\xd8\xff\xe0" + b"i" * 100
+
+
+def create_cdn_app(delay=0.0, failures=None, trickle=0.0, truncate=()):
+    """Create a fake CDN serving one video and one image gag.
+
+    Args:
+        delay: Seconds to wait before answering each request.
+        failures: Number of 503 responses to send per file name before
+            serving it.
+        trickle: Seconds to wait between the pieces of a body, which is
+            then sent in four pieces.
+        truncate: File names whose first full request is answered with the
+            full size announced but only half the body. Range requests are
+            answered with the rest.
+
+    Returns:
+        aiohttp web application.
+    """
+    files = {
+        "video1_720w_gt.mp4": (VIDEO_CONTENT, "video/mp4"),
+        "image1_460s.jpg": (IMAGE_CONTENT, "image/jpeg"),
+    }
+    failures = dict(failures or {})
+    truncate = set(truncate)
+
+    async def handle(request):
+        if delay:
+            await asyncio.sleep(delay)
+        name = request.match_info["name"]
+        if failures.get(name, 0) > 0:
+            failures[name] -= 1
+            return web.Response(status=503)
+        if name not in files:
+            return web.Response(status=404)
+        body, content_type = files[name]
+        start = int(request.headers.get("Range", "bytes=0-")[6:].split("-")[0])
+        end = len(body)
+        if name in truncate and "Range" not in request.headers:
+            truncate.discard(name)
+            end //= 2
+        if start or end < len(body):
+            return web.Response(
+                status=206,
+                body=body[start:end],
+                content_type=content_type,
+                headers={"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"},
+            )
+        if not trickle:
+            return web.Response(body=body, content_type=content_type)
+
+        response = web.StreamResponse(headers={"Content-Type": content_type})
+        response.content_length = len(body)
+        await response.prepare(request)
+        piece = -(-len(body) // 4)
+        for start in range(0, len(body), piece):
+            await response.write(body[start : start + piece])
+            await asyncio.sleep(trickle)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/photo/{name}", handle)
+    return app
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncDownloadEngine(unittest.TestCase):
+    """Test cases for the async download engine."""
+
+    def setUp(self):
+        """Set up the test case."""
+        self.logger = MagicMock(spec=Logger)
+        self.handler = DownloadHandler(self.logger)
+
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_output_dir = os.path.join(current_dir, "test_output_async")
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if Path(self.test_output_dir).exists():
+            shutil.rmtree(self.test_output_dir)
+
+    def _run_with_server(self, coro_factory, delay=0.0, failures=None, trickle=0.0, truncate=()):
+        """Run a coroutine while a fake CDN server is listening.
+
+        Args:
+            coro_factory: Callable taking the engine and returning a coroutine.
+            delay: Response delay of the fake CDN.
+            failures: Number of 503 responses per file name.
+            trickle: Delay between the pieces of a body.
+            truncate: File names whose first body ends halfway.
+
+        Returns:
+            Result of the coroutine.
+        """
+
+        async def main():
+            server = TestServer(create_cdn_app(delay, failures, trickle, truncate))
+            await server.start_server()
+            try:
+                self.handler.BASE_URL = str(server.make_url("/photo/"))
+                engine = AsyncDownloadEngine(self.handler, max_concurrency=4)
+                return await coro_factory(engine)
+            finally:
+                await server.close()
+
+        return asyncio.run(main())
+
+    def test_video_then_image_fallback(self):
+        """Test that videos and images are found with the suffix fallback."""
+        gags = [
+            Gag(id="video1", title="Video Gag"),
+            Gag(id="image1", title="Image Gag"),
+            Gag(id="missing", title="Missing Gag"),
+        ]
+
+        results = self._run_with_server(lambda engine: engine.run_async(gags, self.test_output_dir))
+
+        by_id = {result.gag.id: result for result in results}
+        self.assertTrue(by_id["video1"].success)
+        self.assertTrue(by_id["image1"].success)
+        self.assertFalse(by_id["missing"].success)
+
+        self.assertTrue(gags[0].is_video)
+        self.assertFalse(gags[1].is_video)
+        video_path = Path(self.test_output_dir) / "gags/videos" / "Video Gag.mp4"
+        image_path = Path(self.test_output_dir) / "gags/images" / "Image Gag.jpg"
+        self.assertEqual(video_path.read_bytes(), VIDEO_CONTENT)
+        self.assertEqual(image_path.read_bytes(), IMAGE_CONTENT)
+
+    def test_probes_counted_only_when_sent(self):
+        """Test that no probes are recorded when variants are not probed."""
+        for probe_variants in (True, False):
+            with self.subTest(probe_variants=probe_variants):
+                self.handler = DownloadHandler(self.logger, probe_variants=probe_variants)
+                gag = Gag(id="image1", title="Image Gag")
+                destination = os.path.join(self.test_output_dir, str(probe_variants))
+
+                results = self._run_with_server(lambda engine: engine.run_async([gag], destination))
+
+                self.assertTrue(results[0].success)
+                probes_made = self.handler.suffix_stats.probes_made
+                self.assertEqual(probes_made > 0, probe_variants)
+
+    def test_journal_records_outcomes(self):
+        """Test that the journal of a finished run leaves nothing to resume."""
+        gags = [Gag(id="video1", title="Video Gag"), Gag(id="missing", title="Missing Gag")]
+        journal = JobJournal(self.test_output_dir)
+
+        async def run(engine):
+            engine.journal = journal
+            return await engine.run_async(gags, self.test_output_dir)
+
+        self._run_with_server(run)
+        journal.close()
+
+        state = JobJournal.replay(journal.path)
+        self.assertEqual(state.remaining, [])
+        self.assertEqual((state.done, state.failed), (1, 1))
+        self.assertTrue(state.complete)
+
+    def test_cancel_stops_in_flight_downloads(self):
+        """Test that cancelling aborts the running requests."""
+        gags = [Gag(id=f"video{i}", title=f"Gag {i}") for i in range(20)]
+
+        async def run_and_cancel(engine):
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.2, engine.cancel)
+            return await engine.run_async(gags, self.test_output_dir)
+
+        results = self._run_with_server(run_and_cancel, delay=1.0)
+
+        self.assertLess(len(results), len(gags))
+
+    def test_transient_errors_retried(self):
+        """Test that 503 responses are retried until the file is served."""
+        self.handler.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+        gags = [Gag(id="image1", title="Image Gag")]
+
+        results = self._run_with_server(
+            lambda engine: engine.run_async(gags, self.test_output_dir),
+            failures={"image1_460s.jpg": 2},
+        )
+
+        self.assertTrue(results[0].success)
+
+    def test_truncated_body_resumed(self):
+        """Test that a body shorter than announced is resumed with a Range request."""
+        self.handler.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+        gags = [Gag(id="video1", title="Video Gag")]
+
+        results = self._run_with_server(
+            lambda engine: engine.run_async(gags, self.test_output_dir),
+            truncate={"video1_720w_gt.mp4"},
+        )
+
+        self.assertTrue(results[0].success)
+        video_path = Path(self.test_output_dir) / "gags/videos" / "Video Gag.mp4"
+        self.assertEqual(video_path.read_bytes(), VIDEO_CONTENT)
+        self.assertIn(
+            "Resuming", " ".join(str(call.args[0]) for call in self.logger.info.call_args_list)
+        )
+
+    def test_slow_body_not_cut_off(self):
+        """Test that a body taking longer than the request timeout still downloads."""
+        self.handler.REQUEST_TIMEOUT = 0.5
+        gags = [Gag(id="video1", title="Video Gag")]
+
+        # Every piece arrives within the timeout, the whole body does not
+        results = self._run_with_server(
+            lambda engine: engine.run_async(gags, self.test_output_dir), trickle=0.3
+        )
+
+        self.assertTrue(results[0].success)
+        video_path = Path(self.test_output_dir) / "gags/videos" / "Video Gag.mp4"
+        self.assertEqual(video_path.read_bytes(), VIDEO_CONTENT)
+
+    def test_catalog_written_off_the_event_loop(self):
+        """Test that hashing and catalog writes do not run on the event loop thread."""
+        gags = [Gag(id="video1", title="Video Gag"), Gag(id="missing", title="Missing Gag")]
+        threads = {}
+        record_download = self.handler.record_download
+        record_failure = self.handler.record_failure
+
+        def tracking(name, function):
+            def call(*args, **kwargs):
+                threads[name] = threading.get_ident()
+                return function(*args, **kwargs)
+
+            return call
+
+        self.handler.record_download = tracking("download", record_download)
+        self.handler.record_failure = tracking("failure", record_failure)
+
+        async def run(engine):
+            threads["loop"] = threading.get_ident()
+            return await engine.run_async(gags, self.test_output_dir)
+
+        self._run_with_server(run)
+
+        self.assertNotEqual(threads["download"], threads["loop"])
+        self.assertNotEqual(threads["failure"], threads["loop"])
+        self.assertIsNotNone(self.handler.catalog.get_downloaded("video1").sha256)
+
+    def test_gags_and_files_handled_off_the_event_loop(self):
+        """Test that the gag source and the file writes do not run on the event loop thread."""
+        threads = {"gags": set(), "files": set()}
+
+        def parse():
+            for gag_id, title in (("video1", "Video Gag"), ("image1", "Image Gag")):
+                threads["gags"].add(threading.get_ident())
+                yield Gag(id=gag_id, title=title)
+
+        begin_variant = self.handler.begin_variant
+
+        def tracking_begin_variant(*args):
+            download = begin_variant(*args)
+            open_part = download.open
+
+            def tracking_open():
+                threads["files"].add(threading.get_ident())
+                return open_part()
+
+            download.open = tracking_open
+            return download
+
+        self.handler.begin_variant = tracking_begin_variant
+
+        async def run(engine):
+            threads["loop"] = threading.get_ident()
+            return await engine.run_async(parse(), self.test_output_dir)
+
+        results = self._run_with_server(run)
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(len(results), 2)
+        self.assertNotIn(threads["loop"], threads["gags"])
+        self.assertTrue(threads["files"])
+        self.assertNotIn(threads["loop"], threads["files"])
+
+    def test_invalid_concurrency(self):
+        """Test that a concurrency below one is rejected."""
+        with self.assertRaises(ValueError):
+            AsyncDownloadEngine(self.handler, max_concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Tests for the SQLite download catalog."""
+
+import os
+import shutil
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.core.downloader import DownloadEngine, DownloadHandler
+from src.core.downloader.download_handler import ContentType
+from src.core.models import Gag
+from src.core.storage import DownloadCatalog
+from src.utils.helpers import file_hash
+from src.utils.logging import Logger
+
+
+class TestDownloadCatalog(unittest.TestCase):
+    """Test cases for the download catalog."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_catalog"
+        self.images = self.test_dir / "gags/images"
+        self.images.mkdir(parents=True, exist_ok=True)
+        self.file = self.images / "Gag.jpg"
+        self.file.write_bytes(b"image")
+        self.catalog = DownloadCatalog(self.test_dir)
+
+    def tearDown(self):
+        """Clean up after the test."""
+        self.catalog.close()
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_record_download(self):
+        """Test that a download is stored with a relative path, size and hash."""
+        gag = Gag(id="a1", title="Gag")
+        sha256 = file_hash(self.file)
+        self.catalog.record_download(gag, "IMAGE", "_460s", self.file, sha256)
+
+        entry = self.catalog.get_downloaded("a1")
+        self.assertEqual(entry.path, "gags/images/Gag.jpg")
+        self.assertEqual(entry.size, 5)
+        self.assertEqual(entry.sha256, sha256)
+        self.assertEqual(entry.variant, "_460s")
+        self.assertFalse(entry.is_video)
+        self.assertEqual(self.catalog.get_absolute_path(entry), self.file)
+        self.assertEqual(self.catalog.get_path_owner(self.file), "a1")
+
+    def test_failed_gags_and_attempts(self):
+        """Test that failures are queryable and cleared by a later download."""
+        gag = Gag(id="a1", title="Gag")
+        self.catalog.record_failure(gag, "timeout")
+        self.catalog.record_failure(Gag(id="b2", title="Other"), "404")
+
+        self.assertEqual([e.gag_id for e in self.catalog.failed()], ["a1", "b2"])
+        self.assertIsNone(self.catalog.get_downloaded("a1"))
+
+        entry = self.catalog.record_download(gag, "IMAGE", None, self.file)
+
+        self.assertEqual(entry.attempts, 2)
+        self.assertEqual([e.gag_id for e in self.catalog.failed()], ["b2"])
+        self.assertEqual(self.catalog.count_by_status(), {"downloaded": 1, "failed": 1})
+
+    def test_entries_reloaded(self):
+        """Test that a reopened catalog knows the earlier downloads."""
+        self.catalog.record_download(Gag(id="a1", title="Gag"), "IMAGE", None, self.file)
+        self.catalog.close()
+
+        self.catalog = DownloadCatalog(self.test_dir)
+
+        self.assertEqual(self.catalog.get_path_owner(self.file), "a1")
+
+    def test_lookups_do_not_query_the_database(self):
+        """Test that skip decisions are answered from memory."""
+        self.catalog.record_download(Gag(id="a1", title="Gag"), "IMAGE", None, self.file)
+
+        with patch.object(self.catalog, "_connection") as mock_connection:
+            self.assertIsNotNone(self.catalog.get_downloaded("a1"))
+            self.assertIsNone(self.catalog.get_downloaded("b2"))
+
+        mock_connection.execute.assert_not_called()
+
+
+class TestHandlerCatalog(unittest.TestCase):
+    """Test cases for the catalog use of the download handler."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_handler_catalog"
+        self.images = self.test_dir / "gags/images"
+        self.images.mkdir(parents=True, exist_ok=True)
+        self.handler = DownloadHandler(MagicMock(spec=Logger))
+        self.handler.destination_folder = str(self.test_dir)
+
+    def tearDown(self):
+        """Clean up after the test."""
+        self.handler.close()
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_legacy_file_adopted(self):
+        """Test that a file saved before the catalog is added on first sight."""
+        (self.images / "Gag.jpg").write_bytes(b"image")
+        gag = Gag(id="a1", title="Gag")
+
+        self.assertFalse(self.handler.find_downloaded(gag, str(self.test_dir)))
+        self.assertEqual(self.handler.catalog.get_downloaded("a1").content_type, "IMAGE")
+
+    def test_same_title_does_not_collide(self):
+        """Test that a second gag with the same title gets its own file name."""
+        (self.images / "Gag.jpg").write_bytes(b"image")
+        self.handler.open_destination(str(self.test_dir))
+        self.handler.find_downloaded(Gag(id="a1", title="Gag"), str(self.test_dir))
+
+        other = Gag(id="b2", title="Gag")
+
+        self.assertIsNone(self.handler.find_downloaded(other, str(self.test_dir)))
+        self.assertEqual(self.handler._get_file_path(other, ContentType.IMAGE).name, "Gag [b2].jpg")
+
+    def test_same_title_downloaded_at_once(self):
+        """Test that two gags with the same title in flight at once get their own files."""
+        handler = DownloadHandler(MagicMock(spec=Logger), probe_variants=False)
+        self.addCleanup(handler.close)
+        # Both image downloads write their body at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get(url, **kwargs):
+            response = MagicMock()
+            gag_id = url.rsplit("/", 1)[1].split("_")[0]
+            response.status_code = 200 if url.endswith(".jpg") else 404
+            body = b"\xff\xd8\xff" + gag_id.encode() * 1000
+            response.headers = {"Content-Type": "image/jpeg", "Content-Length": str(len(body))}
+
+            def iter_content(chunk_size):
+                barrier.wait()
+                yield body
+
+            response.iter_content = iter_content
+            return response
+
+        gags = [Gag(id="a1", title="Same"), Gag(id="b2", title="Same")]
+        with patch.object(handler.session, "get", side_effect=get):
+            results = DownloadEngine(handler, max_workers=2).run(gags, str(self.test_dir))
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertNotEqual(gags[0].url, gags[1].url)
+        for gag in gags:
+            entry = handler.catalog.get_downloaded(gag.id)
+            content = handler.catalog.get_absolute_path(entry).read_bytes()
+            self.assertEqual(content, b"\xff\xd8\xff" + gag.id.encode() * 1000)
+
+    def test_renamed_gag_skipped_by_id(self):
+        """Test that a gag whose title changed is not downloaded again."""
+        file_path = self.images / "Old Title.jpg"
+        file_path.write_bytes(b"image")
+        self.handler.open_destination(str(self.test_dir))
+        old_gag = Gag(id="a1", title="Old Title")
+        self.handler.catalog.record_download(old_gag, "IMAGE", None, file_path)
+
+        gag = Gag(id="a1", title="New Title")
+        with patch.object(self.handler.session, "get") as mock_get:
+            self.assertTrue(self.handler.download_gag(gag, str(self.test_dir)))
+
+        mock_get.assert_not_called()
+        self.assertEqual(gag.url, str(file_path))
+
+    def test_failure_recorded(self):
+        """Test that a gag without any downloadable variant is marked as failed."""
+        gag = Gag(id="a1", title="Gag")
+
+        with patch.object(self.handler, "_try_download", return_value=False):
+            self.assertFalse(self.handler.download_gag(gag, str(self.test_dir)))
+
+        self.assertEqual([e.gag_id for e in self.handler.catalog.failed()], ["a1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,341 @@
+"""Tests for the command line interface."""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src import cli
+from src.config import AppSettings
+from src.core.downloader import DownloadHandler, RateLimiter
+from src.core.models import Gag
+from src.core.storage import JobJournal
+from src.utils.logging import Logger
+
+ROW = '<tr><td>2021</td><td><a href="https://9gag.com/gag/{id}">link</a></td><td>{id}</td></tr>\n'
+
+EXPORT = (
+    "<html><body>\n<h3>Upvotes</h3>\n<table>\n"
+    + ROW.format(id="a1")
+    + ROW.format(id="a2")
+    + "</table>\n<h3>Saved</h3>\n<table>\n"
+    + ROW.format(id="a2")
+    + ROW.format(id="a3")
+    + "</table>\n</body></html>\n"
+)
+
+
+class TestCli(unittest.TestCase):
+    """Test cases for the download subcommand."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_cli"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.export = self.test_dir / "export.html"
+        self.export.write_text(EXPORT, encoding="utf-8")
+        self.dest = self.test_dir / "dest"
+
+        # Keep the settings, statistics and parse cache out of the real home
+        home = patch.dict(os.environ, {"HOME": str(self.test_dir), "APPDATA": str(self.test_dir)})
+        home.start()
+        self.addCleanup(home.stop)
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _run(self, *args):
+        """Run the CLI and return the exit code, stdout and stderr."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        argv = ["download", *args, "--log-file", str(self.test_dir / "cli.log")]
+        code = cli.main(argv, stdout=stdout, stderr=stderr)
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_download_succeeds(self):
+        """Test that a run where every gag downloads exits with 0."""
+        downloaded = []
+
+        def download_gag(handler, gag, folder):
+            downloaded.append(gag.id)
+            return True
+
+        with patch.object(DownloadHandler, "download_gag", download_gag):
+            code, stdout, stderr = self._run(
+                str(self.export), "--dest", str(self.dest), "--upvoted", "--saved"
+            )
+
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(sorted(downloaded), ["a1", "a2", "a3"])
+        self.assertIn("3 downloaded", stdout)
+        self.assertIn("1 duplicates skipped", stdout)
+        self.assertIn("3/3", stderr)
+        self.assertTrue((self.dest / "gags" / "images").is_dir())
+
+    def test_failures_exit_with_1(self):
+        """Test that a run with failed gags exits with 1."""
+        with patch.object(
+            DownloadHandler, "download_gag", lambda handler, gag, folder: gag.id != "a2"
+        ):
+            code, stdout, _ = self._run(str(self.export), "--dest", str(self.dest), "--saved")
+
+        self.assertEqual(code, cli.EXIT_FAILED)
+        self.assertIn("1 downloaded", stdout)
+        self.assertIn("1 failed", stdout)
+
+    def test_quiet_prints_nothing(self):
+        """Test that --quiet leaves stdout and stderr empty on success."""
+        with patch.object(DownloadHandler, "download_gag", return_value=True):
+            code, stdout, stderr = self._run(
+                str(self.export), "--dest", str(self.dest), "--upvoted", "--quiet"
+            )
+
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual((stdout, stderr), ("", ""))
+
+    def test_missing_export(self):
+        """Test that a missing export exits with 3."""
+        code, _, stderr = self._run(
+            str(self.test_dir / "missing.html"), "--dest", str(self.dest), "--upvoted"
+        )
+
+        self.assertEqual(code, cli.EXIT_INPUT_ERROR)
+        self.assertIn("missing.html", stderr)
+
+    def test_unreadable_export(self):
+        """Test that an export that is not valid UTF-8 exits with 3."""
+        self.export.write_bytes(self.export.read_bytes().replace(b"link", b"\xff\xfe"))
+
+        with patch.object(DownloadHandler, "download_gag", return_value=True):
+            code, _, stderr = self._run(
+                str(self.export), "--dest", str(self.dest), "--upvoted", "--no-cache"
+            )
+
+        self.assertEqual(code, cli.EXIT_INPUT_ERROR)
+        self.assertIn("cannot read the exports", stderr)
+
+    def test_unexpected_error(self):
+        """Test that an error outside of reading the exports is not reported as one."""
+        engine = MagicMock(concurrency=1)
+        engine.run.side_effect = RuntimeError("broken")
+        with patch.object(cli, "create_engine", return_value=engine):
+            code, _, stderr = self._run(str(self.export), "--dest", str(self.dest), "--upvoted")
+
+        self.assertEqual(code, cli.EXIT_FAILED)
+        self.assertIn("download failed: broken", stderr)
+        self.assertNotIn("cannot read the exports", stderr)
+
+    def test_usage_errors(self):
+        """Test that invalid arguments exit with 2."""
+        for args in ([str(self.export), "--dest", str(self.dest)], [str(self.export)]):
+            with self.subTest(args=args), patch("sys.stderr", io.StringIO()):
+                with self.assertRaises(SystemExit) as raised:
+                    cli.main(["download", *args])
+                self.assertEqual(raised.exception.code, cli.EXIT_USAGE)
+
+    def test_counts_below_one_rejected(self):
+        """Test that --workers, --max-workers and --retries must be at least 1."""
+        for option, value in (("--workers", "0"), ("--max-workers", "-2"), ("--retries", "0")):
+            with self.subTest(option=option), patch("sys.stderr", io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit) as raised:
+                    cli.main(
+                        ["download", str(self.export), "--dest", str(self.dest), option, value]
+                    )
+                self.assertEqual(raised.exception.code, cli.EXIT_USAGE)
+                self.assertIn("must be at least 1", stderr.getvalue())
+
+    def test_limits_watched_only_with_limits_file(self):
+        """Test that no file is watched unless --limits-file is given."""
+        engine = MagicMock(concurrency=1)
+        engine.run.return_value = []
+        limits_file = self.test_dir / "limits.json"
+        for extra, watched in (((), False), (("--limits-file", str(limits_file)), True)):
+            with self.subTest(watched=watched), patch.object(
+                cli, "create_engine", return_value=engine
+            ), patch.object(cli, "LimitsWatcher") as watcher:
+                code, _, _ = self._run(
+                    str(self.export), "--dest", str(self.dest), "--upvoted", *extra
+                )
+
+                self.assertEqual(code, cli.EXIT_OK)
+                self.assertEqual(watcher.called, watched)
+                if watched:
+                    self.assertEqual(watcher.call_args.args[0], limits_file)
+                    watcher.return_value.stop.assert_called_once()
+
+    def test_resume_after_interruption(self):
+        """Test that --resume only downloads what the interrupted run left."""
+        downloaded = []
+
+        def interrupted(handler, gag, folder):
+            if gag.id == "a2":
+                raise KeyboardInterrupt
+            downloaded.append(gag.id)
+            return True
+
+        args = (str(self.export), "--dest", str(self.dest), "--upvoted", "--saved")
+        workers = ("--workers", "1", "--fixed-workers", "--backend", "threads")
+        with patch.object(DownloadHandler, "download_gag", interrupted):
+            code, _, _ = self._run(*args, *workers)
+        self.assertEqual(code, cli.EXIT_INTERRUPTED)
+        self.assertEqual(downloaded, ["a1"])
+
+        def download_gag(handler, gag, folder):
+            downloaded.append(gag.id)
+            return True
+
+        with patch.object(DownloadHandler, "download_gag", download_gag):
+            code, stdout, _ = self._run(*args, *workers, "--resume")
+
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(downloaded, ["a1", "a2", "a3"])
+        self.assertIn("2 downloaded", stdout)
+
+    def test_resume_skips_exports_of_complete_journal(self):
+        """Test that a journal with every gag queued is resumed without the exports."""
+        journal = JobJournal(self.dest)
+        for gag_id in ("a1", "a2", "a3"):
+            journal.queued(Gag(id=gag_id, title=gag_id))
+        journal.complete()
+        journal.finished(Gag(id="a1", title="a1"), True)
+        journal.close()
+        # A different export shows that it is not read
+        self.export.write_text(EXPORT.replace("a3", "b3"), encoding="utf-8")
+        downloaded = []
+
+        def download_gag(handler, gag, folder):
+            downloaded.append(gag.id)
+            return True
+
+        with patch.object(DownloadHandler, "download_gag", download_gag):
+            code, _, _ = self._run(
+                str(self.export), "--dest", str(self.dest), "--upvoted", "--resume"
+            )
+
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertEqual(sorted(downloaded), ["a2", "a3"])
+        self.assertEqual(JobJournal.replay(journal.path).remaining, [])
+
+    def test_limits_file_applied_on_change(self):
+        """Test that changed limits in the watched file are applied to the limiter."""
+        limits_file = self.test_dir / "limits.json"
+        limits_file.write_text(json.dumps({"max_requests_per_second": 0}), encoding="utf-8")
+        rate_limiter = RateLimiter(5)
+        watcher = cli.LimitsWatcher(limits_file, rate_limiter, MagicMock(spec=Logger))
+
+        # The limits given on the command line hold while the file is unchanged
+        self.assertFalse(watcher.check())
+        self.assertEqual(rate_limiter.requests_per_second, 5)
+
+        limits_file.write_text(
+            json.dumps({"max_requests_per_second": 2, "max_kilobytes_per_second": 100}),
+            encoding="utf-8",
+        )
+        self.assertTrue(watcher.check())
+        self.assertEqual(rate_limiter.requests_per_second, 2)
+        self.assertEqual(rate_limiter.bytes_per_second, 100 * 1024)
+
+        # Unrelated changes, such as other settings, keep the limits
+        limits_file.write_text(
+            json.dumps({"max_requests_per_second": 2, "max_kilobytes_per_second": 100, "other": 1}),
+            encoding="utf-8",
+        )
+        self.assertFalse(watcher.check())
+
+        rate_limiter.set_limits(7)
+        self.assertTrue(watcher.check(force=True))
+        self.assertEqual(rate_limiter.requests_per_second, 2)
+
+    def test_limits_watcher_reloads_in_background(self):
+        """Test that a reload request applies the file on the watcher thread."""
+        limits_file = self.test_dir / "limits.json"
+        limits_file.write_text(json.dumps({"max_requests_per_second": 3}), encoding="utf-8")
+        rate_limiter = RateLimiter()
+        watcher = cli.LimitsWatcher(limits_file, rate_limiter, MagicMock(spec=Logger), 60)
+
+        watcher.start()
+        watcher.reload()
+        deadline = time.monotonic() + 5
+        while rate_limiter.requests_per_second is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        watcher.stop()
+
+        self.assertEqual(rate_limiter.requests_per_second, 3)
+
+    def test_progress_line_rewritten_in_place(self):
+        """Test that the progress line is overwritten on a terminal."""
+        stream = io.StringIO()
+        progress = cli.ProgressLine(stream, interactive=True, interval=0)
+
+        progress.downloaded = 10
+        progress.update()
+        progress.total = 12
+        progress.failed = 2
+        progress.finish()
+
+        lines = stream.getvalue().split("\r")
+        self.assertTrue(lines[1].startswith("10/? | 10 downloaded"))
+        self.assertTrue(
+            lines[2].startswith("12/12 | 10 downloaded, 0 already downloaded, 2 failed")
+        )
+        self.assertTrue(stream.getvalue().endswith("\n"))
+
+    def test_app_rate_limit_options(self):
+        """Test that the app takes the rate limit options of the download command."""
+        from src.__main__ import build_parser
+
+        settings = AppSettings(max_requests_per_second=4, max_kilobytes_per_second=100)
+        parser = build_parser()
+
+        rate_limiter = cli.create_rate_limiter(parser.parse_args(["--max-rps=2"]), settings)
+        self.assertEqual(rate_limiter.requests_per_second, 2)
+        self.assertEqual(rate_limiter.bytes_per_second, 100 * 1024)
+
+        args = parser.parse_args(["--test", "--async", "--max-kbps", "0"])
+        self.assertTrue(args.test and args.use_async)
+        self.assertIsNone(cli.create_rate_limiter(args, settings).bytes_per_second)
+
+        with patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit) as raised:
+            parser.parse_args(["--max-rps", "fast"])
+        self.assertEqual(raised.exception.code, cli.EXIT_USAGE)
+
+    def test_app_test_download_builds_one_handler(self):
+        """Test that --test does not build a handler it never uses or closes."""
+        from src import __main__ as entry_point
+
+        with patch.object(sys, "argv", ["9gag-downloader", "--test"]), patch(
+            "src.utils.logging.Logger"
+        ), patch("src.config.settings.Logger"), patch.object(
+            entry_point, "test_download"
+        ) as test_download, patch(
+            "src.core.downloader.DownloadHandler"
+        ) as handler:
+            entry_point.main()
+
+        test_download.assert_called_once()
+        handler.assert_not_called()
+
+    def test_ui_not_imported(self):
+        """Test that the command line does not load Tk."""
+        code = (
+            "import sys, src.__main__; "
+            "print(any(name.split('.')[0] in ('tkinter', 'customtkinter', 'PIL') "
+            "for name in sys.modules))"
+        )
+        root = Path(__file__).resolve().parent.parent
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(output.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Tests for the adaptive concurrency controller."""
+
+import itertools
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.core.downloader import ConcurrencyController, DownloadEngine, DownloadHandler
+from src.core.models import Gag
+from src.utils.logging import Logger
+
+
+class TestConcurrencyController(unittest.TestCase):
+    """Test cases for the AIMD concurrency controller."""
+
+    def setUp(self):
+        """Set up the test case."""
+        # A clock ticking once per call keeps the throughput of every window equal
+        clock = itertools.count()
+        patcher = patch(
+            "src.core.downloader.concurrency_controller.time.monotonic",
+            side_effect=lambda: float(next(clock)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _record_window(self, controller, latency=0.1, status_code=200):
+        """Record one full window of requests with the same outcome."""
+        for _ in range(max(controller.window, controller.limit)):
+            controller.record_request(latency, status_code)
+
+    def test_additive_increase(self):
+        """Test that healthy windows raise the concurrency one step at a time."""
+        controller = ConcurrencyController(min_concurrency=1, max_concurrency=4, window=5)
+
+        self._record_window(controller)
+        self.assertEqual(controller.limit, 2)
+        self._record_window(controller)
+        self.assertEqual(controller.limit, 3)
+
+    def test_never_exceeds_maximum(self):
+        """Test that the concurrency stays within the configured range."""
+        controller = ConcurrencyController(
+            min_concurrency=1, max_concurrency=2, initial_concurrency=2, window=5
+        )
+
+        self._record_window(controller)
+
+        self.assertEqual(controller.limit, 2)
+
+    def test_throttling_halves_concurrency(self):
+        """Test that 429 responses cut the concurrency in half."""
+        controller = ConcurrencyController(
+            min_concurrency=2, max_concurrency=16, initial_concurrency=12, window=5
+        )
+
+        self._record_window(controller, status_code=429)
+        self.assertEqual(controller.limit, 6)
+        self._record_window(controller, status_code=None)
+        self.assertEqual(controller.limit, 3)
+        self._record_window(controller, status_code=503)
+        self.assertEqual(controller.limit, 2)
+
+    def test_missing_variants_are_not_errors(self):
+        """Test that 404 answers for missing variants count as healthy."""
+        controller = ConcurrencyController(min_concurrency=1, max_concurrency=4, window=5)
+
+        self._record_window(controller, status_code=404)
+
+        self.assertEqual(controller.limit, 2)
+
+    def test_latency_increase_decreases(self):
+        """Test that rising latency lowers the concurrency."""
+        controller = ConcurrencyController(
+            min_concurrency=1, max_concurrency=16, initial_concurrency=8, window=5
+        )
+
+        self._record_window(controller, latency=0.1)
+        self.assertEqual(controller.limit, 9)
+        self._record_window(controller, latency=0.5)
+        self.assertEqual(controller.limit, 4)
+
+    def test_listeners_and_logging(self):
+        """Test that changes are reported to listeners and the log."""
+        logger = MagicMock(spec=Logger)
+        listener = MagicMock()
+        controller = ConcurrencyController(max_concurrency=4, window=2, logger=logger)
+        controller.add_listener(listener)
+
+        self._record_window(controller)
+
+        listener.assert_called_once_with(2)
+        self.assertIn("raised from 1 to 2", logger.info.call_args[0][0])
+
+    def test_invalid_range(self):
+        """Test that an empty range is rejected."""
+        with self.assertRaises(ValueError):
+            ConcurrencyController(min_concurrency=4, max_concurrency=2)
+
+
+class TestEngineWithController(unittest.TestCase):
+    """Test cases for the download engine driven by a controller."""
+
+    def test_engine_feeds_controller(self):
+        """Test that the engine reports requests and sizes its pool for the maximum."""
+        handler = DownloadHandler(MagicMock(spec=Logger), use_catalog=False)
+        controller = ConcurrencyController(max_concurrency=8, window=1)
+        engine = DownloadEngine(handler, controller=controller)
+        self.assertEqual(engine.max_workers, 8)
+        self.assertEqual(engine.concurrency, 1)
+
+        def fake_download(gag, destination_folder):
+            handler.report_request(0.01, 200)
+            return True
+
+        with patch.object(handler, "download_gag", side_effect=fake_download):
+            results = engine.run([Gag(id=str(i), title=str(i)) for i in range(5)], "unused")
+
+        self.assertEqual(len(results), 5)
+        self.assertGreater(engine.concurrency, 1)
+        self.assertIsNone(handler.request_listener)
+
+
+if __name__ == "__main__":
+    unittest.main()
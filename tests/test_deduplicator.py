@@ -0,0 +1,110 @@
+"""Tests for the de-duplication of gags across sections and exports."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+from src.core.models import Gag
+from src.core.parser import GagDeduplicator, HtmlParser
+
+ROW = '<tr><td>2021</td><td><a href="https://9gag.com/gag/{id}">link</a></td><td>{id}</td></tr>\n'
+
+
+def make_export(upvoted, saved):
+    """Build an export with the given gag ids in each section.
+
+    Args:
+        upvoted: Ids of the upvoted gags.
+        saved: Ids of the saved gags.
+
+    Returns:
+        HTML of the export.
+    """
+    return (
+        "<html><body>\n<h3>Upvotes</h3>\n<table>\n"
+        + "".join(ROW.format(id=gag_id) for gag_id in upvoted)
+        + "</table>\n<h3>Saved</h3>\n<table>\n"
+        + "".join(ROW.format(id=gag_id) for gag_id in saved)
+        + "</table>\n</body></html>\n"
+    )
+
+
+class TestGagDeduplicator(unittest.TestCase):
+    """Test cases for the gag deduplicator."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_deduplicator"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.first = self.test_dir / "first.html"
+        self.second = self.test_dir / "second.html"
+        self.first.write_text(make_export(["a", "b", "c"], ["b", "d"]), encoding="utf-8")
+        self.second.write_text(make_export(["d", "e"], ["a"]), encoding="utf-8")
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_duplicates_dropped_with_sources_kept(self):
+        """Test that every id is passed on once, tagged with all its sources."""
+        deduplicator = GagDeduplicator()
+
+        gags = list(
+            HtmlParser.iter_exports(
+                [str(self.first), str(self.second)],
+                upvoted_gags=True,
+                saved_gags=True,
+                deduplicator=deduplicator,
+            )
+        )
+
+        self.assertEqual([gag.id for gag in gags], ["a", "b", "c", "d", "e"])
+        sources = {gag.id: gag.sources for gag in gags}
+        self.assertEqual(sources["a"], ("Upvotes", "first.html", "Saved", "second.html"))
+        self.assertEqual(sources["b"], ("Upvotes", "first.html", "Saved"))
+        self.assertEqual(sources["c"], ("Upvotes", "first.html"))
+        self.assertEqual(sources["d"], ("Saved", "first.html", "Upvotes", "second.html"))
+        self.assertEqual(gags[1].section, "Upvotes")
+        self.assertEqual(deduplicator.duplicates, 3)
+        self.assertEqual(len(deduplicator), 5)
+
+    def test_sources_of_every_duplicate_merged(self):
+        """Test that a gag in both sections and in a second export keeps every tag."""
+        self.first.write_text(make_export(["a"], ["a"]), encoding="utf-8")
+        self.second.write_text(make_export(["a"], []), encoding="utf-8")
+
+        gags = list(
+            HtmlParser.iter_exports(
+                [str(self.first), str(self.second)], upvoted_gags=True, saved_gags=True
+            )
+        )
+
+        self.assertEqual(len(gags), 1)
+        self.assertEqual(gags[0].sources, ("Upvotes", "first.html", "Saved", "second.html"))
+
+    def test_filter_is_lazy(self):
+        """Test that gags are passed on before the input is exhausted."""
+        consumed = []
+
+        def gags():
+            for gag_id in ["a", "a", "b"]:
+                consumed.append(gag_id)
+                yield Gag(id=gag_id, title=gag_id, section="Saved")
+
+        filtered = GagDeduplicator().filter(gags())
+
+        self.assertEqual(next(filtered).id, "a")
+        self.assertEqual(consumed, ["a"])
+        self.assertEqual([gag.id for gag in filtered], ["b"])
+
+    def test_missing_file_raised_eagerly(self):
+        """Test that a missing export is reported before iterating."""
+        with self.assertRaises(FileNotFoundError):
+            HtmlParser.iter_exports([str(self.first), "non_existent_file.html"], saved_gags=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for the destination directory index."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.core.downloader import DownloadHandler
+from src.core.models import Gag
+from src.core.storage import DirectoryIndex
+from src.utils.logging import Logger
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    """Test cases for the directory index."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_directory_index"
+        self.images = self.test_dir / "gags/images"
+        self.videos = self.test_dir / "gags/videos"
+        self.images.mkdir(parents=True, exist_ok=True)
+        (self.images / "Image Gag.jpg").write_bytes(b"image")
+        (self.images / "Other.jpg.part").write_bytes(b"partial")
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_build_lists_existing_files(self):
+        """Test that existing files are found and missing folders are skipped."""
+        index = DirectoryIndex(self.test_dir, ["gags/images", "gags/videos"])
+
+        self.assertEqual(index.build(), 2)
+        self.assertTrue(index.contains(self.images / "Image Gag.jpg"))
+        self.assertFalse(index.contains(self.images / "Other.jpg"))
+        self.assertFalse(index.contains(self.videos / "Image Gag.mp4"))
+
+    def test_lookups_do_not_touch_the_disk(self):
+        """Test that indexed folders are answered without stat calls."""
+        index = DirectoryIndex(self.test_dir, ["gags/images"])
+        index.build()
+
+        with patch("os.stat") as mock_stat:
+            self.assertTrue(index.contains(self.images / "Image Gag.jpg"))
+            self.assertFalse(index.contains(self.images / "Missing.jpg"))
+
+        mock_stat.assert_not_called()
+
+    def test_add_and_discard(self):
+        """Test that the index follows written and removed files."""
+        index = DirectoryIndex(self.test_dir, ["gags/images"])
+        index.build()
+        new_file = self.images / "New.jpg"
+
+        index.add(new_file)
+        self.assertTrue(index.contains(new_file))
+        index.discard(new_file)
+        self.assertFalse(index.contains(new_file))
+
+    def test_paths_outside_the_index_checked_on_disk(self):
+        """Test that paths outside the indexed folders fall back to the disk."""
+        index = DirectoryIndex(self.test_dir, ["gags/videos"])
+        index.build()
+
+        self.assertFalse(index.covers(self.images / "Image Gag.jpg"))
+        self.assertTrue(index.contains(self.images / "Image Gag.jpg"))
+
+
+class TestHandlerDirectoryIndex(unittest.TestCase):
+    """Test cases for the cache checks of the download handler."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_handler_index"
+        (self.test_dir / "gags/videos").mkdir(parents=True, exist_ok=True)
+        (self.test_dir / "gags/videos/Video Gag.mp4").write_bytes(b"video")
+        self.handler = DownloadHandler(MagicMock(spec=Logger))
+
+    def tearDown(self):
+        """Clean up after the test."""
+        self.handler.close()
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_find_downloaded(self):
+        """Test that downloaded gags are found by their sanitized title."""
+        self.handler.open_destination(str(self.test_dir))
+
+        self.assertTrue(
+            self.handler.find_downloaded(Gag(id="v", title="Video: Gag"), str(self.test_dir))
+        )
+        self.assertIsNone(
+            self.handler.find_downloaded(Gag(id="n", title="New Gag"), str(self.test_dir))
+        )
+
+    def test_download_gag_skips_indexed_file(self):
+        """Test that an indexed gag is not requested again."""
+        gag = Gag(id="v", title="Video Gag")
+
+        with patch.object(self.handler.session, "get") as mock_get:
+            self.assertTrue(self.handler.download_gag(gag, str(self.test_dir)))
+
+        mock_get.assert_not_called()
+        self.assertTrue(gag.is_video)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Tests for the concurrent download engine."""
+
+import queue
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.downloader import DownloadEngine, DownloadHandler, DownloadResult
+from src.core.models import Gag
+from src.core.storage import JobJournal
+from src.utils.logging import Logger
+
+
+class TestDownloadEngine(unittest.TestCase):
+    """Test cases for the download engine."""
+
+    def setUp(self):
+        """Set up the test case."""
+        self.logger = MagicMock(spec=Logger)
+        self.handler = MagicMock(spec=DownloadHandler)
+        self.handler.logger = self.logger
+        self.gags = [Gag(id=f"id{i}", title=f"Gag {i}") for i in range(10)]
+
+    def test_all_gags_reported(self):
+        """Test that every gag produces exactly one result."""
+        self.handler.download_gag.side_effect = lambda gag, folder: gag.id != "id3"
+        engine = DownloadEngine(self.handler, max_workers=3)
+
+        results = engine.run(self.gags, "dest")
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(sorted(r.gag.id for r in results), sorted(g.id for g in self.gags))
+        failed = [r for r in results if not r.success]
+        self.assertEqual([r.gag.id for r in failed], ["id3"])
+        self.assertIsNotNone(failed[0].error)
+
+    def test_runs_downloads_concurrently(self):
+        """Test that the number of parallel downloads is bounded by max_workers."""
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def slow_download(gag, folder):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.02)
+            with lock:
+                running["now"] -= 1
+            return True
+
+        self.handler.download_gag.side_effect = slow_download
+        engine = DownloadEngine(self.handler, max_workers=4)
+        engine.run(self.gags, "dest")
+
+        self.assertGreater(running["peak"], 1)
+        self.assertLessEqual(running["peak"], 4)
+
+    def test_callbacks_and_queue(self):
+        """Test that results are delivered through the callback and the queue."""
+        self.handler.download_gag.return_value = True
+        result_queue = queue.Queue()
+        seen = []
+        started = []
+
+        engine = DownloadEngine(self.handler, max_workers=2)
+        engine.run(
+            self.gags,
+            "dest",
+            on_result=seen.append,
+            on_start=lambda gag, index: started.append(index),
+            result_queue=result_queue,
+        )
+
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(sorted(started), list(range(10)))
+        self.assertEqual(result_queue.qsize(), 10)
+        self.assertIsInstance(result_queue.get_nowait(), DownloadResult)
+
+    def test_exception_becomes_failed_result(self):
+        """Test that an exception in the handler does not stop the run."""
+        self.handler.download_gag.side_effect = RuntimeError("boom")
+        engine = DownloadEngine(self.handler, max_workers=2)
+
+        results = engine.run(self.gags[:3], "dest")
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(not r.success and r.error == "boom" for r in results))
+
+    def test_cancel_stops_scheduling(self):
+        """Test that cancelling prevents the remaining gags from being started."""
+        self.handler.download_gag.return_value = True
+        engine = DownloadEngine(self.handler, max_workers=1)
+
+        results = engine.run(self.gags, "dest", on_result=lambda result: engine.cancel())
+
+        self.assertTrue(engine.is_cancelled())
+        self.assertLess(len(results), len(self.gags))
+
+    def test_journal_records_the_run(self):
+        """Test that every gag is journaled as queued, started and finished."""
+        self.handler.download_gag.side_effect = lambda gag, folder: gag.id != "id3"
+        journal = MagicMock(spec=JobJournal)
+        engine = DownloadEngine(self.handler, max_workers=3, journal=journal)
+
+        engine.run(self.gags, "dest")
+
+        self.assertEqual([c.args[0] for c in journal.queued.call_args_list], self.gags)
+        self.assertEqual(journal.started.call_count, 10)
+        outcomes = {c.args[0].id: c.args[1] for c in journal.finished.call_args_list}
+        self.assertEqual(outcomes, {gag.id: gag.id != "id3" for gag in self.gags})
+        journal.complete.assert_called_once_with()
+        journal.sync.assert_called_once_with()
+
+    def test_cancelled_run_not_journaled_complete(self):
+        """Test that a cancelled run leaves unqueued gags for a resume."""
+        self.handler.download_gag.return_value = True
+        journal = MagicMock(spec=JobJournal)
+        engine = DownloadEngine(self.handler, max_workers=1, journal=journal)
+
+        engine.run(self.gags, "dest", on_result=lambda result: engine.cancel())
+
+        self.assertLess(journal.queued.call_count, 10)
+        journal.complete.assert_not_called()
+
+    def test_invalid_worker_count(self):
+        """Test that a worker count below one is rejected."""
+        with self.assertRaises(ValueError):
+            DownloadEngine(self.handler, max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""Tests for the background download worker of the UI."""
+
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.core.downloader import DownloadEngine, DownloadHandler
+from src.core.models import Gag
+from src.ui.download_worker import DownloadWorker, ProgressEventType
+from src.utils.logging import Logger
+
+
+class TestDownloadWorker(unittest.TestCase):
+    """Test cases for the download worker."""
+
+    def setUp(self):
+        """Set up the test case."""
+        self.handler = DownloadHandler(MagicMock(spec=Logger), use_catalog=False)
+        self.engine = DownloadEngine(self.handler, max_workers=2)
+        self.gags = [Gag(id=f"gag{i}", title=f"Gag {i}") for i in range(6)]
+
+    def _wait_for_events(self, worker):
+        """Wait for a started worker to finish and return all its events."""
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+        return worker.drain(max_events=1000)
+
+    def _collect_events(self, worker):
+        """Run the worker to completion and return all its events."""
+        worker.start()
+        return self._wait_for_events(worker)
+
+    def test_events_for_cached_and_downloaded_gags(self):
+        """Test that every gag is reported once and the run ends with FINISHED."""
+        calling_threads = set()
+
+        def fake_download(gag, destination_folder):
+            calling_threads.add(threading.current_thread())
+            return gag.id != "gag5"
+
+        def find_downloaded(gag, destination_folder):
+            calling_threads.add(threading.current_thread())
+            return True if gag.id in ("gag0", "gag1") else None
+
+        with patch.object(self.handler, "download_gag", side_effect=fake_download):
+            events = self._collect_events(
+                DownloadWorker(self.engine, self.gags, "unused", find_downloaded)
+            )
+
+        types = [event.type for event in events]
+        self.assertEqual(types.count(ProgressEventType.CACHED), 2)
+        self.assertEqual(types.count(ProgressEventType.RESULT), 4)
+        self.assertEqual(types[-1], ProgressEventType.FINISHED)
+        totals = [e.total for e in events if e.type is ProgressEventType.TOTAL]
+        self.assertEqual(totals, [6])
+        failed = [e.gag.id for e in events if e.type is ProgressEventType.RESULT and not e.success]
+        self.assertEqual(failed, ["gag5"])
+
+        # Nothing ran on the calling (UI) thread
+        self.assertNotIn(threading.current_thread(), calling_threads)
+
+    def test_cancel_stops_scheduling(self):
+        """Test that cancelling from another thread stops the pipeline."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_download(gag, destination_folder):
+            started.set()
+            release.wait(timeout=5)
+            return True
+
+        with patch.object(self.handler, "download_gag", side_effect=slow_download):
+            worker = DownloadWorker(self.engine, self.gags, "unused", lambda g, d: None)
+            worker.start()
+            started.wait(timeout=5)
+            worker.cancel()
+            release.set()
+            events = self._wait_for_events(worker)
+
+        results = [e for e in events if e.type is ProgressEventType.RESULT]
+        self.assertLess(len(results), len(self.gags))
+        self.assertEqual(events[-1].type, ProgressEventType.FINISHED)
+
+    def test_engine_error_reported(self):
+        """Test that an unexpected engine failure is reported as an event."""
+        engine = MagicMock()
+        engine.run.side_effect = RuntimeError("boom")
+
+        events = self._collect_events(
+            DownloadWorker(engine, self.gags, "unused", lambda g, d: None)
+        )
+
+        self.assertEqual(
+            [event.type for event in events],
+            [ProgressEventType.ERROR, ProgressEventType.FINISHED],
+        )
+        self.assertEqual(events[0].error, "boom")
+
+    def test_lazy_gags_downloaded_before_total_is_known(self):
+        """Test that downloads start while the gag iterator is still producing."""
+        first_downloaded = threading.Event()
+        produced_after_download = []
+
+        def lazy_gags():
+            for index, gag in enumerate(self.gags):
+                if index > 0:
+                    first_downloaded.wait(timeout=5)
+                    produced_after_download.append(first_downloaded.is_set())
+                yield gag
+
+        def fake_download(gag, destination_folder):
+            first_downloaded.set()
+            return True
+
+        with patch.object(self.handler, "download_gag", side_effect=fake_download):
+            events = self._collect_events(
+                DownloadWorker(self.engine, lazy_gags(), "unused", lambda g, d: None)
+            )
+
+        self.assertTrue(all(produced_after_download))
+        types = [event.type for event in events]
+        self.assertLess(types.index(ProgressEventType.RESULT), types.index(ProgressEventType.TOTAL))
+
+    def test_drain_is_bounded(self):
+        """Test that drain returns at most the requested number of events."""
+        with patch.object(self.handler, "download_gag", return_value=True):
+            worker = DownloadWorker(self.engine, self.gags, "unused", lambda g, d: None)
+            worker.start()
+            worker.join(timeout=5)
+
+        # Six results, the total and FINISHED
+        self.assertEqual(len(worker.drain(max_events=4)), 4)
+        self.assertEqual(len(worker.drain(max_events=100)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
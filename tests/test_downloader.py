@@ -6,7 +6,10 @@ from enum import Enum, auto
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from src.core.downloader import DownloadHandler
+import requests
+
+from src.core.downloader import DownloadHandler, RetryPolicy
+from src.core.downloader.download_handler import ContentType as HandlerContentType
 from src.core.models import Gag
 from src.utils.logging import Logger
 
@@ -34,6 +37,14 @@ class MockResponse:
         self.content = content
         self.headers = headers or {"Content-Type": "video/mp4"}
 
+    def iter_content(self, chunk_size=1):
+        """Yield the content in chunks like a streamed response."""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self):
+        """Release the connection."""
+
 
 class TestDownloader(unittest.TestCase):
     """Test cases for the download handler."""
@@ -68,7 +79,7 @@ class TestDownloader(unittest.TestCase):
         if Path(self.test_output_dir).exists():
             shutil.rmtree(self.test_output_dir)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     @patch("src.core.downloader.download_handler.ContentType")
     def test_try_video_download_success(self, mock_content_type, mock_get):
         """Test successful video download."""
@@ -100,7 +111,7 @@ class TestDownloader(unittest.TestCase):
         # Verify the logger was called correctly
         self.logger.info.assert_any_call("Video downloaded as Test Gag.mp4")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     @patch("src.core.downloader.download_handler.ContentType")
     def test_try_image_download_success(self, mock_content_type, mock_get):
         """Test successful image download."""
@@ -137,7 +148,7 @@ class TestDownloader(unittest.TestCase):
         # Verify the logger was called correctly
         self.logger.info.assert_any_call("Image downloaded as Test Gag.jpg")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_download_failure_404(self, mock_get):
         """Test download failure due to 404 error."""
         # Mock 404 response
@@ -242,6 +253,311 @@ class TestDownloader(unittest.TestCase):
         mock_try_video.assert_called_once()
         mock_try_image.assert_called_once()
 
+    @patch("requests.Session.get")
+    def test_download_streams_in_chunks(self, mock_get):
+        """Test that the body is written in chunks and no temp file is left behind."""
+        content = bytes(range(256)) * 1000
+        mock_get.return_value = MockResponse(
+            content=content, headers={"Content-Type": "image/jpeg"}
+        )
+        self.downloader.chunk_size = 4096
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, ContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+        )
+
+        self.assertTrue(result)
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        file_path = Path(self.test_gag.url)
+        self.assertEqual(file_path.read_bytes(), content)
+        self.assertEqual(list(file_path.parent.glob("*.part")), [])
+
+    @patch("requests.Session.get")
+    def test_resume_partial_download(self, mock_get):
+        """Test that a .part file is resumed with a Range request."""
+        content = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+        suffix = self.downloader.IMAGE_SUFFIX_700
+        file_path = Path(self.test_output_dir) / "gags/images" / "Test Gag.jpg"
+        part_path = self.downloader._get_part_path(self.test_gag, file_path, suffix)
+        part_path.write_bytes(content[:4000])
+
+        mock_get.return_value = MockResponse(
+            status_code=206,
+            content=content[4000:],
+            headers={
+                "Content-Type": "image/jpeg",
+                "Content-Range": f"bytes 4000-{len(content) - 1}/{len(content)}",
+            },
+        )
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, HandlerContentType.IMAGE, suffix
+        )
+
+        self.assertTrue(result)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"Range": "bytes=4000-"})
+        self.assertEqual(file_path.read_bytes(), content)
+        self.assertFalse(part_path.exists())
+
+    @patch("requests.Session.get")
+    def test_partial_file_of_other_gag_not_resumed(self, mock_get):
+        """Test that a gag with the same title does not resume another gag's .part file."""
+        suffix = self.downloader.IMAGE_SUFFIX_700
+        file_path = Path(self.test_output_dir) / "gags/images" / "Test Gag.jpg"
+        other = Gag(id="other1", title=self.test_gag.title)
+        other_part = self.downloader._get_part_path(other, file_path, suffix)
+        other_part.write_bytes(b"\xff\xd8\xff" + b"a" * 3997)
+
+        content = b"\xff\xd8\xff" + b"b" * 5000
+        mock_get.return_value = MockResponse(
+            content=content,
+            headers={"Content-Type": "image/jpeg", "Content-Length": str(len(content))},
+        )
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, HandlerContentType.IMAGE, suffix
+        )
+
+        self.assertTrue(result)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {})
+        self.assertEqual(file_path.read_bytes(), content)
+        self.assertEqual(other_part.stat().st_size, 4000)
+
+    @patch("src.core.downloader.download_handler.time.sleep")
+    @patch("requests.Session.get")
+    def test_incomplete_download_kept_as_part(self, mock_get, mock_sleep):
+        """Test that a body that stays truncated is not treated as downloaded."""
+        mock_get.return_value = MockResponse(
+            content=b"\xff\xd8\xff" + b"x" * 97,
+            headers={"Content-Type": "image/jpeg", "Content-Length": "5000"},
+        )
+        suffix = self.downloader.IMAGE_SUFFIX_700
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, HandlerContentType.IMAGE, suffix
+        )
+
+        self.assertFalse(result)
+        file_path = Path(self.test_output_dir) / "gags/images" / "Test Gag.jpg"
+        self.assertFalse(file_path.exists())
+        part_path = self.downloader._get_part_path(self.test_gag, file_path, suffix)
+        self.assertEqual(part_path.stat().st_size, 100)
+        self.assertEqual(mock_get.call_count, self.downloader.retry_policy.max_attempts)
+
+    @patch("src.core.downloader.download_handler.time.sleep")
+    def test_truncated_body_resumed(self, mock_sleep):
+        """Test that a body shorter than announced is resumed with a Range request."""
+        content = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+        responses = [
+            MockResponse(
+                206,
+                content[:3000],
+                {
+                    "Content-Type": "image/jpeg",
+                    "Content-Range": f"bytes 0-{len(content) - 1}/{len(content)}",
+                },
+            ),
+            MockResponse(
+                206,
+                content[3000:],
+                {
+                    "Content-Type": "image/jpeg",
+                    "Content-Range": f"bytes 3000-{len(content) - 1}/{len(content)}",
+                },
+            ),
+        ]
+
+        with patch.object(self.downloader.session, "get", side_effect=responses) as mock_get:
+            result = self.downloader._try_download_with_suffix(
+                self.test_gag, HandlerContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+            )
+
+        self.assertTrue(result)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"Range": "bytes=3000-"})
+        file_path = Path(self.test_output_dir) / "gags/images" / "Test Gag.jpg"
+        self.assertEqual(file_path.read_bytes(), content)
+        mock_sleep.assert_called_once()
+
+    @patch("requests.Session.get")
+    def test_small_non_video_response_discarded(self, mock_get):
+        """Test that a tiny body with a non-video content type is not saved as video."""
+        mock_get.return_value = MockResponse(
+            content=b"x" * 100, headers={"Content-Type": "application/octet-stream"}
+        )
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, HandlerContentType.VIDEO, self.downloader.VIDEO_SUFFIX_720
+        )
+
+        self.assertFalse(result)
+        videos_dir = Path(self.test_output_dir) / "gags" / "videos"
+        self.assertEqual(list(videos_dir.iterdir()), [])
+
+    def test_probe_variant(self):
+        """Test that probing checks status, content type and magic bytes."""
+        jpeg = b"\xff\xd8\xff\xe0" + b"x" * 100
+        mp4 = b"\x00\x00\x00\x18ftypmp42" + b"x" * 100
+        cases = [
+            (MockResponse(206, jpeg, {"Content-Type": "image/jpeg"}), "IMAGE", True),
+            (MockResponse(206, mp4, {"Content-Type": "video/mp4"}), "VIDEO", True),
+            (MockResponse(206, jpeg, {"Content-Type": "image/jpeg"}), "VIDEO", False),
+            (MockResponse(200, b"<html>", {"Content-Type": "text/html"}), "IMAGE", False),
+            (MockResponse(404), "IMAGE", False),
+        ]
+
+        for response, content_type_name, expected in cases:
+            content_type = HandlerContentType[content_type_name]
+            with patch.object(self.downloader.session, "get", return_value=response) as get:
+                result = self.downloader._probe_variant(
+                    self.test_gag, content_type, self.downloader.IMAGE_SUFFIX_700
+                )
+            self.assertEqual(result, expected, f"{content_type_name} {response.headers}")
+            self.assertEqual(get.call_args.kwargs["headers"]["Range"], "bytes=0-1023")
+
+    def test_failed_probe_skips_full_download(self):
+        """Test that only the variant that passes the probe is downloaded."""
+        jpeg = b"\xff\xd8\xff\xe0" + b"x" * 100
+
+        def fake_get(url, headers=None, **kwargs):
+            if not url.endswith(self.downloader.IMAGE_SUFFIX_460):
+                return MockResponse(404)
+            return MockResponse(206 if headers else 200, jpeg, {"Content-Type": "image/jpeg"})
+
+        with patch.object(self.downloader.session, "get", side_effect=fake_get) as get:
+            result = self.downloader._try_download(self.test_gag, HandlerContentType.IMAGE)
+
+        self.assertTrue(result)
+        full_requests = [c for c in get.call_args_list if not c.kwargs.get("headers")]
+        self.assertEqual(len(full_requests), 1)
+        self.assertTrue(full_requests[0].args[0].endswith(self.downloader.IMAGE_SUFFIX_460))
+        self.assertEqual(Path(self.test_gag.url).read_bytes(), jpeg)
+        probes = [c for c in get.call_args_list if c.kwargs.get("headers")]
+        self.assertEqual(self.downloader.suffix_stats.probes_made, len(probes))
+
+    def test_no_probes_recorded_without_probing(self):
+        """Test that probe statistics stay empty when variants are not probed."""
+        self.downloader.probe_variants = False
+        jpeg = b"\xff\xd8\xff\xe0" + b"x" * 100
+
+        def fake_get(url, headers=None, **kwargs):
+            if not url.endswith(self.downloader.IMAGE_SUFFIX_460):
+                return MockResponse(404)
+            return MockResponse(200, jpeg, {"Content-Type": "image/jpeg"})
+
+        with patch.object(self.downloader.session, "get", side_effect=fake_get):
+            result = self.downloader._try_download(self.test_gag, HandlerContentType.IMAGE)
+
+        self.assertTrue(result)
+        self.assertEqual(self.downloader.suffix_stats.probes_made, 0)
+
+    @patch("src.core.downloader.download_handler.time.sleep")
+    def test_transient_error_retried(self, mock_sleep):
+        """Test that a 503 is retried and the download then succeeds."""
+        jpeg = b"\xff\xd8\xff\xe0" + b"x" * 100
+        responses = [
+            MockResponse(503, b"", {"Retry-After": "2"}),
+            MockResponse(200, jpeg, {"Content-Type": "image/jpeg"}),
+        ]
+
+        with patch.object(self.downloader.session, "get", side_effect=responses):
+            result = self.downloader._try_download_with_suffix(
+                self.test_gag, HandlerContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+            )
+
+        self.assertTrue(result)
+        mock_sleep.assert_called_once()
+        self.assertGreaterEqual(mock_sleep.call_args.args[0], 2.0)
+
+    @patch("src.core.downloader.download_handler.time.sleep")
+    def test_missing_variant_not_retried(self, mock_sleep):
+        """Test that a 404 is treated as a missing variant, not a transient error."""
+        with patch.object(
+            self.downloader.session, "get", return_value=MockResponse(404)
+        ) as mock_get:
+            result = self.downloader._try_download_with_suffix(
+                self.test_gag, HandlerContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+            )
+
+        self.assertFalse(result)
+        self.assertEqual(mock_get.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch("src.core.downloader.download_handler.time.sleep")
+    def test_retries_exhausted(self, mock_sleep):
+        """Test that the download gives up after the configured attempts."""
+        self.downloader.retry_policy = RetryPolicy(max_attempts=4)
+
+        with patch.object(
+            self.downloader.session, "get", side_effect=requests.Timeout("timed out")
+        ) as mock_get:
+            result = self.downloader._try_download_with_suffix(
+                self.test_gag, HandlerContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+            )
+
+        self.assertFalse(result)
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(mock_sleep.call_count, 3)
+
+    def test_session_reused_between_requests(self):
+        """Test that all requests go through one pooled session with default headers."""
+        self.assertEqual(
+            self.downloader.session.headers["Referer"], DownloadHandler.HEADERS["Referer"]
+        )
+
+        with patch.object(
+            self.downloader.session, "get", return_value=MockResponse(status_code=404)
+        ) as mock_get:
+            self.downloader._try_download_with_suffix(
+                self.test_gag, ContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+            )
+            self.downloader._try_download_with_suffix(
+                self.test_gag, ContentType.IMAGE, self.downloader.IMAGE_SUFFIX_460
+            )
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("requests.Session.get")
+    def test_rate_limiter_applied(self, mock_get):
+        """Test that every request and every chunk goes through the rate limiter."""
+        mock_get.return_value = MockResponse(
+            content=b"i" * 10000, headers={"Content-Type": "image/jpeg"}
+        )
+        self.downloader.chunk_size = 4096
+        self.downloader.rate_limiter = MagicMock()
+
+        result = self.downloader._try_download_with_suffix(
+            self.test_gag, ContentType.IMAGE, self.downloader.IMAGE_SUFFIX_700
+        )
+
+        self.assertTrue(result)
+        self.downloader.rate_limiter.acquire_request.assert_called_once()
+        self.assertEqual(
+            [c.args[0] for c in self.downloader.rate_limiter.acquire_bytes.call_args_list],
+            [4096, 4096, 1808],
+        )
+
+    def test_configure_pool(self):
+        """Test that the connection pool can be resized."""
+        self.downloader.configure_pool(16)
+
+        adapter = self.downloader.session.get_adapter(DownloadHandler.BASE_URL)
+        self.assertEqual(self.downloader.pool_size, 16)
+        self.assertEqual(adapter._pool_maxsize, 16)
+
+    @patch("src.core.downloader.download_handler.DownloadHandler.try_video_download")
+    @patch("src.core.downloader.download_handler.DownloadHandler.try_image_download")
+    def test_download_gag_learned_order(self, mock_try_image, mock_try_video):
+        """Test that images are tried first once most gags were images."""
+        for _ in range(5):
+            self.downloader.suffix_stats.record_hit("IMAGE", self.downloader.IMAGE_SUFFIX_700)
+        mock_try_image.return_value = True
+
+        result = self.downloader.download_gag(self.test_gag, self.test_output_dir)
+
+        self.assertTrue(result)
+        mock_try_image.assert_called_once()
+        mock_try_video.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
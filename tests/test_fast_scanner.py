@@ -0,0 +1,140 @@
+"""Tests for the regex fast path of the HTML parser."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.parser import FastScanner, HtmlParser
+
+ROW = (
+    '<tr><td>2021-01-0{n}</td><td><a href="https://9gag.com/gag/{id}">https://9gag.com/gag/{id}</a>'
+    "</td><td>{title}</td></tr>\n"
+)
+
+HEADER_ROW = "<tr><th>Date</th><th>Link</th><th>Title</th></tr>\n"
+
+
+def make_export(upvotes, saved, before_upvotes=""):
+    """Build an export in the shape of the 9GAG data export.
+
+    Args:
+        upvotes: Table rows of the Upvotes section.
+        saved: Table rows of the Saved section.
+        before_upvotes: Markup inserted right before the Upvotes header.
+
+    Returns:
+        HTML of the export.
+    """
+    return (
+        "<html><head><style>h3 { color: red; }</style></head><body>\n"
+        f"<h3>Comments</h3>\n<table>{HEADER_ROW}</table>\n"
+        f"{before_upvotes}"
+        f"<h3>Upvotes</h3>\n<table>\n<tbody>\n{HEADER_ROW}{upvotes}</tbody>\n</table>\n"
+        f"<h3>Saved</h3>\n<table>\n{HEADER_ROW}{saved}</table>\n"
+        "</body></html>\n"
+    )
+
+
+UPVOTES = "".join(
+    ROW.format(n=n, id=f"u{n}", title=title)
+    for n, title in enumerate(["The real MVP", " Tom &amp; Jerry ", "", "   ", "Ünïcode ✓"])
+)
+SAVED = ROW.format(n=1, id="s1", title="Saved") + ROW.format(n=2, id="u1", title="Again")
+
+
+class TestFastScanner(unittest.TestCase):
+    """Test cases for the fast scanner."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_fast_scanner"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.test_file = self.test_dir / "export.html"
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, export):
+        """Write an export to the test file and return its path."""
+        self.test_file.write_text(export, encoding="utf-8")
+        return str(self.test_file)
+
+    def _scan(self, export, sections=("Upvotes", "Saved")):
+        """Scan an export with verification against BeautifulSoup."""
+        return FastScanner.scan(
+            export.encode("utf-8"), sections, verify=HtmlParser._parse_table_html
+        )
+
+    def test_matches_beautifulsoup_parser(self):
+        """Test that a well-formed export gives the same gags as BeautifulSoup."""
+        file_path = self._write(make_export(UPVOTES, SAVED))
+
+        for upvoted, saved in [(True, False), (False, True), (True, True)]:
+            with self.subTest(upvoted=upvoted, saved=saved):
+                sections = HtmlParser.get_sections(upvoted, saved)
+                expected = HtmlParser.parse_file(file_path, upvoted, saved)
+                self.assertEqual(HtmlParser.scan_file(file_path, sections), expected)
+
+        gags = HtmlParser.scan_file(file_path, ["Upvotes"])
+        self.assertEqual(
+            [gag.title for gag in gags],
+            ["The real MVP", "Tom & Jerry", "No Title", "", "Ünïcode ✓"],
+        )
+
+    def test_unexpected_shapes_rejected(self):
+        """Test that markup the scanner does not know makes it give up."""
+        cases = {
+            "markup in a title": UPVOTES.replace("The real MVP", "<b>The</b> real MVP"),
+            "unclosed row": UPVOTES.replace("</tr>", "", 1),
+            "nested table": UPVOTES.replace(
+                "<td>The real MVP</td>", "<td><table><tr><td>x</td></tr></table></td>"
+            ),
+            "link without href": UPVOTES.replace('<a href="https://9gag.com/gag/u0">', "<a>"),
+            "short row": UPVOTES + "<tr><td>only</td><td>two</td></tr>\n",
+        }
+        for name, rows in cases.items():
+            with self.subTest(name):
+                self.assertIsNone(self._scan(make_export(rows, SAVED)))
+
+    def test_hidden_or_complex_headers_rejected(self):
+        """Test that headers the patterns cannot judge make the scanner give up."""
+        self.assertIsNone(
+            self._scan(make_export(UPVOTES, SAVED, before_upvotes="<!-- <h3>Upvotes</h3> -->"))
+        )
+        self.assertIsNone(
+            self._scan(make_export(UPVOTES, SAVED, before_upvotes="<h3><b>Upvotes</b></h3>"))
+        )
+
+    def test_tables_checked_in_slices(self):
+        """Test that a table checked in small slices is still checked completely."""
+        with patch.object(FastScanner, "CHECK_BYTES", 1):
+            self.assertEqual(len(self._scan(make_export(UPVOTES, SAVED), ["Upvotes"])), 5)
+            broken = UPVOTES.replace("Ünïcode ✓", "<i>Ünïcode</i>")
+            self.assertIsNone(self._scan(make_export(broken, SAVED)))
+
+    def test_reference_mismatch_rejected(self):
+        """Test that a sample differing from the reference parser rejects the result."""
+        export = make_export(UPVOTES, SAVED).encode("utf-8")
+
+        self.assertIsNone(FastScanner.scan(export, ["Upvotes"], verify=lambda html, s: []))
+
+    def test_parse_file_falls_back(self):
+        """Test that parse_file uses the full parser when the fast path gives up."""
+        file_path = self._write(
+            make_export(UPVOTES.replace("The real MVP", "<b>The</b> real MVP"), SAVED)
+        )
+
+        with patch.object(HtmlParser, "read_html_file", wraps=HtmlParser.read_html_file) as read:
+            gags = HtmlParser.parse_file(file_path, upvoted_gags=True, fast=True)
+
+        read.assert_called_once()
+        self.assertEqual(gags[0].title, "The real MVP")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""Tests for the gag models."""
+
+import unittest
+
+from src.core.models import Gag
+
+
+class TestGag(unittest.TestCase):
+    """Test cases for the slotted gag model."""
+
+    def test_behaves_like_dataclass(self):
+        """Test that equality, repr and defaults match the former dataclass."""
+        gag = Gag(id="a1", title="Title", section="Saved")
+
+        self.assertEqual(gag, Gag("a1", "Title", None, None, "Saved", ()))
+        self.assertNotEqual(gag, Gag(id="a1", title="Title"))
+        self.assertNotEqual(gag, ("a1", "Title", None, None, "Saved", ()))
+        self.assertEqual(
+            repr(gag),
+            "Gag(id='a1', title='Title', url=None, is_video=None, section='Saved', sources=())",
+        )
+        self.assertEqual(gag.full_url, "https://9gag.com/gag/a1")
+        with self.assertRaises(TypeError):
+            hash(gag)
+
+    def test_no_instance_dict(self):
+        """Test that gags do not carry a per-instance __dict__."""
+        gag = Gag(id="a1", title="Title")
+
+        self.assertFalse(hasattr(gag, "__dict__"))
+        with self.assertRaises(AttributeError):
+            gag.views = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
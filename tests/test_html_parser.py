@@ -3,6 +3,9 @@
 import os
 import unittest
 from pathlib import Path
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup, Tag
 
 from src.core.models import Gag
 from src.core.parser import HtmlParser
@@ -103,5 +106,48 @@ class TestHtmlParser(unittest.TestCase):
             HtmlParser.parse_file("non_existent_file.html")
 
 
+class TestSectionExtraction(unittest.TestCase):
+    """Test cases for the single pass section extraction."""
+
+    HTML = """<html><body>
+<h3>Saved</h3>
+<h3>Upvotes</h3>
+<table><tr><td>1</td><td><a href="https://9gag.com/gag/both">l</a></td><td>Both</td></tr></table>
+<h3>Comments</h3>
+<table><tr><td>1</td><td><a href="https://9gag.com/gag/c1">l</a></td><td>Comment</td></tr></table>
+<h3>Upvotes</h3>
+<table><tr><td>1</td><td><a href="https://9gag.com/gag/late">l</a></td><td>Late</td></tr></table>
+</body></html>"""
+
+    def setUp(self):
+        """Set up the test case."""
+        self.soup = BeautifulSoup(self.HTML, "html.parser")
+
+    def test_gags_tagged_with_section(self):
+        """Test that a table following two headers belongs to both sections."""
+        gags = HtmlParser.extract_gags(self.soup, upvoted_gags=True, saved_gags=True)
+
+        self.assertEqual(
+            [(gag.id, gag.section) for gag in gags],
+            [("both", "Upvotes"), ("both", "Saved")],
+        )
+
+    def test_any_sections(self):
+        """Test that other sections can be extracted in the same pass."""
+        gags = HtmlParser.extract_sections(self.soup, ["Comments", "Missing", "Saved"])
+
+        self.assertEqual(
+            [(gag.id, gag.section) for gag in gags],
+            [("c1", "Comments"), ("both", "Saved")],
+        )
+
+    def test_single_traversal(self):
+        """Test that headers are not looked up with separate searches."""
+        with patch.object(Tag, "find_next") as mock_find_next:
+            HtmlParser.extract_gags(self.soup, upvoted_gags=True, saved_gags=True)
+
+        mock_find_next.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,154 @@
+"""Tests for the append-only journal of a download run."""
+
+import json
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+from src.core.models import Gag
+from src.core.storage import JobJournal
+
+
+class TestJobJournal(unittest.TestCase):
+    """Test cases for the job journal."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_job_journal"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.test_dir / JobJournal.FILENAME
+        self.gags = [
+            Gag(id=f"id{i}", title=f"Gag {i}", section="Upvotes", sources=("Upvotes",))
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _interrupted_run(self, complete: bool = True) -> None:
+        """Record a run where id0 was done, id1 failed and the rest never finished."""
+        journal = JobJournal(self.test_dir)
+        for gag in self.gags:
+            journal.queued(gag)
+        if complete:
+            journal.complete()
+        journal.started(self.gags[0])
+        journal.started(self.gags[1])
+        journal.started(self.gags[2])
+        journal.finished(self.gags[0], True)
+        journal.finished(self.gags[1], False, "No downloadable variant found")
+        journal.close()
+
+    def test_replay_gives_remaining_in_order(self):
+        """Test that the gags without an outcome are left, in queue order."""
+        self._interrupted_run()
+
+        state = JobJournal.replay(self.path)
+
+        self.assertEqual(state.remaining, self.gags[2:])
+        self.assertEqual((state.done, state.failed), (1, 1))
+        self.assertEqual(state.known, {gag.id for gag in self.gags})
+        self.assertTrue(state.complete)
+
+    def test_records_are_json_lines(self):
+        """Test that every event is one JSON object per line."""
+        self._interrupted_run()
+
+        records = [json.loads(line) for line in self.path.read_text("utf-8").splitlines()]
+
+        self.assertEqual(
+            [record["event"] for record in records],
+            ["queued"] * 5 + ["complete", "started", "started", "started", "done", "failed"],
+        )
+        self.assertEqual(records[-1]["error"], "No downloadable variant found")
+
+    def test_missing_journal_is_empty(self):
+        """Test that replaying a missing journal leaves nothing to do."""
+        state = JobJournal.replay(self.path)
+
+        self.assertEqual(state.remaining, [])
+        self.assertFalse(state.complete)
+
+    def test_new_run_starts_empty(self):
+        """Test that a journal opened without resume forgets the previous run."""
+        self._interrupted_run()
+
+        JobJournal(self.test_dir).close()
+
+        self.assertEqual(self.path.read_text("utf-8"), "")
+
+    def test_resume_compacts_a_complete_journal(self):
+        """Test that resuming keeps only the remaining gags in the journal."""
+        self._interrupted_run()
+
+        journal = JobJournal(self.test_dir, resume=True)
+        journal.close()
+
+        self.assertEqual(journal.state.remaining, self.gags[2:])
+        self.assertEqual(len(self.path.read_text("utf-8").splitlines()), 4)
+        self.assertEqual(JobJournal.replay(self.path).remaining, self.gags[2:])
+
+    def test_resume_keeps_history_of_an_incomplete_journal(self):
+        """Test that the known ids survive until every gag was queued."""
+        self._interrupted_run(complete=False)
+
+        journal = JobJournal(self.test_dir, resume=True)
+        journal.close()
+
+        self.assertFalse(journal.state.complete)
+        self.assertEqual(JobJournal.replay(self.path).known, {gag.id for gag in self.gags})
+
+    def test_resumed_gags_are_not_queued_twice(self):
+        """Test that queuing a remaining gag again does not add a record."""
+        self._interrupted_run()
+        journal = JobJournal(self.test_dir, resume=True)
+
+        journal.queued(self.gags[2])
+        journal.finished(self.gags[2], True)
+        journal.close()
+
+        state = JobJournal.replay(self.path)
+        self.assertEqual(state.remaining, self.gags[3:])
+        self.assertEqual(state.done, 1)
+
+    def test_cut_off_line_is_skipped(self):
+        """Test that a line cut off by a crash is ignored and not appended to."""
+        self._interrupted_run()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"event":"done","id":"id2"')
+
+        journal = JobJournal(self.test_dir, resume=True)
+        journal.finished(self.gags[3], True)
+        journal.close()
+
+        self.assertEqual(journal.state.remaining, self.gags[2:])
+        self.assertEqual(JobJournal.replay(self.path).remaining, [self.gags[2], self.gags[4]])
+
+    def test_cut_off_line_in_incomplete_journal(self):
+        """Test that records after a cut off line stay readable without compaction."""
+        self._interrupted_run(complete=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"event":"do')
+
+        journal = JobJournal(self.test_dir, resume=True)
+        journal.finished(self.gags[2], True)
+        journal.close()
+
+        self.assertEqual(JobJournal.replay(self.path).remaining, self.gags[3:])
+
+    def test_records_after_close_are_ignored(self):
+        """Test that a closed journal does not fail on late records."""
+        journal = JobJournal(self.test_dir)
+        journal.close()
+
+        journal.queued(self.gags[0])
+
+        self.assertEqual(self.path.read_text("utf-8"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
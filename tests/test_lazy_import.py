@@ -0,0 +1,95 @@
+"""Tests for the lazy loading of the package exports."""
+
+import ast
+import subprocess
+import sys
+import types
+import unittest
+from pathlib import Path
+
+from src.utils.lazy_import import lazy_exports
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def loaded_modules(code: str, *names: str) -> list:
+    """Run code in a fresh interpreter and get which of the top level modules it loaded."""
+    check = (
+        f"{code}; import sys; "
+        f"print(sorted({{name.split('.')[0] for name in sys.modules}} & {set(names)!r}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return ast.literal_eval(output.stdout.strip())
+
+
+class TestLazyExports(unittest.TestCase):
+    """Test cases for lazy_exports."""
+
+    def setUp(self):
+        """Set up a package whose export is only imported on access."""
+        self.package = types.ModuleType("lazy_test_package")
+        sys.modules[self.package.__name__] = self.package
+        getattr_, dir_ = lazy_exports(self.package.__name__, {"Path": "pathlib"})
+        self.package.__getattr__ = getattr_
+        self.package.__dir__ = dir_
+
+    def tearDown(self):
+        """Remove the test package."""
+        del sys.modules[self.package.__name__]
+
+    def test_export_loaded_on_access(self):
+        """Test that an export is imported and cached on first access."""
+        self.assertNotIn("Path", vars(self.package))
+        self.assertIs(self.package.Path, Path)
+        self.assertIs(vars(self.package)["Path"], Path)
+
+    def test_unknown_name(self):
+        """Test that names that are not exported raise AttributeError."""
+        with self.assertRaises(AttributeError):
+            self.package.Missing
+        self.assertFalse(hasattr(self.package, "Missing"))
+
+    def test_dir_lists_exports(self):
+        """Test that dir lists the exports before they are loaded."""
+        self.assertIn("Path", dir(self.package))
+
+
+class TestStartupImports(unittest.TestCase):
+    """Test that the heavy dependencies are only loaded when used."""
+
+    def test_cli_loads_no_network_or_html_libraries(self):
+        """Test that the command line starts without requests, aiohttp or BeautifulSoup."""
+        self.assertEqual(
+            loaded_modules("import src.__main__, src.cli", "requests", "aiohttp", "bs4"), []
+        )
+
+    def test_packages_load_on_access(self):
+        """Test that the packages import their modules when a name is used."""
+        code = "import src.core.downloader as d, src.core.parser as p, src.utils as u"
+        self.assertEqual(loaded_modules(code, "requests", "aiohttp", "bs4"), [])
+        self.assertEqual(
+            loaded_modules(code + "; p.HtmlParser", "requests", "aiohttp", "bs4"), ["bs4"]
+        )
+        self.assertEqual(
+            loaded_modules(code + "; d.DownloadEngine", "requests", "aiohttp", "bs4"),
+            ["requests"],
+        )
+
+    def test_all_exports_resolve(self):
+        """Test that every name in __all__ of the lazy packages can be imported."""
+        import src.core.downloader
+        import src.core.parser
+        import src.ui
+        import src.utils
+
+        for package in (src.core.downloader, src.core.parser, src.utils):
+            for name in package.__all__:
+                with self.subTest(package=package.__name__, name=name):
+                    self.assertIsNotNone(getattr(package, name))
+        self.assertIn("App", dir(src.ui))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for the memory-mapped input of the export parsers."""
+
+import mmap
+import os
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.parser import HtmlParser, mapped_file
+from src.core.parser.mapped_file import iter_text, map_file, release_pages
+
+
+class TestMappedFile(unittest.TestCase):
+    """Test cases for memory-mapped input."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_mapped_file"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.test_file = self.test_dir / "export.html"
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_map_file(self):
+        """Test that files are mapped read-only and empty files give no bytes."""
+        self.test_file.write_bytes(b"<html></html>")
+        with map_file(self.test_file) as data:
+            self.assertIsInstance(data, mmap.mmap)
+            self.assertEqual(data[:6], b"<html>")
+        self.assertTrue(data.closed)
+
+        self.test_file.write_bytes(b"")
+        with map_file(self.test_file) as data:
+            self.assertEqual(data, b"")
+
+    def test_iter_text_like_text_mode(self):
+        """Test that chunked decoding gives the text of a text-mode read."""
+        content = "Ünïcode ✓\r\nWindows\rMac\r\n\r\nend 😀".encode("utf-8")
+        self.test_file.write_bytes(content)
+        with open(self.test_file, "r", encoding="utf-8") as fp:
+            expected = fp.read()
+
+        with map_file(self.test_file) as data:
+            for chunk_size in (1, 2, 3, 7, len(content)):
+                with self.subTest(chunk_size=chunk_size):
+                    self.assertEqual("".join(iter_text(data, chunk_size)), expected)
+
+    def test_decoded_pages_released(self):
+        """Test that pages behind the decoding position are released."""
+        self.test_file.write_bytes(b"x" * mmap.PAGESIZE * 4)
+        released = []
+
+        with patch.object(mapped_file, "RELEASE_BYTES", mmap.PAGESIZE), patch.object(
+            mapped_file, "release_pages", side_effect=lambda data, end: released.append(end)
+        ):
+            with map_file(self.test_file) as data:
+                text = "".join(iter_text(data, mmap.PAGESIZE))
+
+        self.assertEqual(len(text), mmap.PAGESIZE * 4)
+
+        self.assertEqual(released, [mmap.PAGESIZE, mmap.PAGESIZE * 2, mmap.PAGESIZE * 3])
+
+        # Releasing is a no-op for bytes and keeps the contents readable for maps
+        release_pages(b"abc", mmap.PAGESIZE)
+        with map_file(self.test_file) as data:
+            release_pages(data, mmap.PAGESIZE + 1)
+            self.assertEqual(data[:1], b"x")
+
+    def test_parsers_agree_on_line_endings(self):
+        """Test that all parsers read titles with Windows line endings alike."""
+        row = (
+            '<tr><td>2021</td><td><a href="https://9gag.com/gag/{id}">link</a></td>'
+            "<td>{title}</td></tr>\r\n"
+        )
+        export = (
+            "<html><body>\r\n<h3>Upvotes</h3>\r\n<table>\r\n"
+            + row.format(id="u1", title="Two\r\nlines")
+            + row.format(id="u2", title="One line")
+            + "</table>\r\n</body></html>\r\n"
+        )
+        self.test_file.write_bytes(export.encode("utf-8"))
+        file_path = str(self.test_file)
+
+        expected = HtmlParser.parse_file(file_path, upvoted_gags=True)
+
+        self.assertEqual(expected[0].title, "Two\nlines")
+        self.assertEqual(
+            HtmlParser.parse_file(file_path, upvoted_gags=True, streaming=True), expected
+        )
+        self.assertEqual(HtmlParser.scan_file(file_path, ["Upvotes"]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
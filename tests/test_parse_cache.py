@@ -0,0 +1,147 @@
+"""Tests for the on-disk cache of parsed data exports."""
+
+import gzip
+import json
+import os
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.core.models import Gag
+from src.core.parser import HtmlParser, ParseCache
+from src.utils.logging import Logger
+
+EXPORT = """<html><body>
+<h3>Upvotes</h3>
+<table>
+<tr><td>2021</td><td><a href="https://9gag.com/gag/u1">link</a></td><td>First</td></tr>
+<tr><td>2021</td><td><a href="https://9gag.com/gag/u2">link</a></td><td>Second</td></tr>
+</table>
+</body></html>
+"""
+
+
+class TestParseCache(unittest.TestCase):
+    """Test cases for the parse cache."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_parse_cache"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.export = self.test_dir / "export.html"
+        self.export.write_text(EXPORT, encoding="utf-8")
+        self.logger = MagicMock(spec=Logger)
+        self.cache = ParseCache(self.test_dir / "cache", logger=self.logger)
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def _parse(self):
+        """Parse the export through the cache."""
+        return HtmlParser.parse_file(str(self.export), upvoted_gags=True, cache=self.cache)
+
+    def test_hit_skips_parsing(self):
+        """Test that a second parse of an unchanged file is served from the cache."""
+        first = self._parse()
+
+        with patch.object(HtmlParser, "read_html_file") as mock_read:
+            second = self._parse()
+
+        mock_read.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual(second[0], Gag(id="u1", title="First", section="Upvotes"))
+        messages = [call.args[0] for call in self.logger.info.call_args_list]
+        self.assertTrue(any(m.startswith("Parse cache miss") for m in messages))
+        self.assertTrue(any(m.startswith("Parse cache hit") for m in messages))
+
+    def test_sections_cached_separately(self):
+        """Test that another section selection is a miss."""
+        self._parse()
+
+        self.assertIsNone(self.cache.get(self.export, ["Upvotes", "Saved"]))
+
+    def test_changed_content_invalidates(self):
+        """Test that a file with new content is parsed again."""
+        self._parse()
+        self.export.write_text(EXPORT.replace("First", "Fresh"), encoding="utf-8")
+
+        self.assertEqual(self._parse()[0].title, "Fresh")
+
+    def test_touched_file_still_hits(self):
+        """Test that a new modification time with the same content is a hit."""
+        self._parse()
+        stat = self.export.stat()
+        os.utime(self.export, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertIsNotNone(self.cache.get(self.export, ["Upvotes"]))
+        with patch("src.core.parser.parse_cache.file_hash") as mock_hash:
+            self.assertIsNotNone(self.cache.get(self.export, ["Upvotes"]))
+        mock_hash.assert_not_called()
+
+    def test_damaged_entry_dropped(self):
+        """Test that an unreadable entry is treated as a miss and removed."""
+        self._parse()
+        entry_path = self.cache._entry_path(self.export, ["Upvotes"])
+        entry_path.write_bytes(b"not gzip")
+
+        self.assertIsNone(self.cache.get(self.export, ["Upvotes"]))
+        self.assertFalse(entry_path.exists())
+
+    def test_malformed_entry_dropped(self):
+        """Test that an entry with valid JSON but missing fields is a miss."""
+        self._parse()
+        entry_path = self.cache._entry_path(self.export, ["Upvotes"])
+        for entry in ({"version": ParseCache.VERSION}, [ParseCache.VERSION]):
+            with self.subTest(entry=entry):
+                with gzip.open(entry_path, "wt", encoding="utf-8") as f:
+                    json.dump(entry, f)
+
+                self.assertIsNone(self.cache.get(self.export, ["Upvotes"]))
+                self.assertFalse(entry_path.exists())
+
+        self.assertEqual(len(self._parse()), 2)
+
+    def test_unusable_cache_folder_ignored(self):
+        """Test that parsing works and warns when the cache cannot be written."""
+        blocker = self.test_dir / "not_a_folder"
+        blocker.write_text("", encoding="utf-8")
+        self.cache.cache_dir = blocker / "cache"
+
+        self.assertEqual(len(self._parse()), 2)
+        streamed = HtmlParser.iter_gags(str(self.export), upvoted_gags=True, cache=self.cache)
+        self.assertEqual(len(list(streamed)), 2)
+        self.assertIsNone(self.cache.get(self.export, ["Upvotes"]))
+        self.logger.warning.assert_called()
+
+    def test_least_recently_used_evicted(self):
+        """Test that the cache stays within its size, evicting old entries first."""
+        self._parse()
+        old_entry = self.cache._entry_path(self.export, ["Upvotes"])
+        entry_size = old_entry.stat().st_size
+        os.utime(old_entry, (0, 0))
+        self.cache.max_bytes = entry_size + entry_size // 2
+
+        gags = [Gag(id="u1", title="First", section="Saved")]
+        self.cache.put(self.export, ["Saved"], gags)
+
+        self.assertFalse(old_entry.exists())
+        self.assertEqual(self.cache.get(self.export, ["Saved"]), gags)
+
+    def test_iter_gags_stores_complete_stream(self):
+        """Test that only a fully consumed iterator is cached."""
+        gags = HtmlParser.iter_gags(str(self.export), upvoted_gags=True, cache=self.cache)
+        next(gags)
+        gags.close()
+        self.assertIsNone(self.cache.get(self.export, ["Upvotes"]))
+
+        streamed = list(HtmlParser.iter_gags(str(self.export), upvoted_gags=True, cache=self.cache))
+
+        self.assertEqual(self.cache.get(self.export, ["Upvotes"]), streamed)
+
+
+if __name__ == "__main__":
+    unittest.main()
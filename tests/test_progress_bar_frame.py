@@ -0,0 +1,86 @@
+"""Tests for the coalesced rendering of the progress bar frame."""
+
+import tkinter as tk
+import unittest
+from unittest.mock import patch
+
+from src.config import Theme
+
+try:
+    import customtkinter as ctk
+
+    from src.ui.frames import ProgressBarFrame
+
+    _root = tk.Tk()
+    _root.destroy()
+except (ImportError, tk.TclError):  # pragma: no cover - depends on the environment
+    ProgressBarFrame = None
+
+
+@unittest.skipIf(ProgressBarFrame is None, "customtkinter or a display is not available")
+class TestProgressBarFrame(unittest.TestCase):
+    """Test cases for the progress bar frame."""
+
+    def setUp(self):
+        """Set up the test case."""
+        self.root = ctk.CTk()
+        self.frame = ProgressBarFrame(self.root, theme=Theme())
+
+    def tearDown(self):
+        """Clean up after the test."""
+        self.root.destroy()
+
+    def test_updates_are_coalesced(self):
+        """Test that many updates schedule a single repaint."""
+        with patch.object(self.frame, "after") as mock_after:
+            self.frame.set_total_items(1000)
+            for index in range(1000):
+                self.frame.increment_counters(cached=True, is_video=index % 2 == 0)
+                self.frame.update_current_item(f"Gag {index}", index, is_cached=True)
+
+        mock_after.assert_called_once()
+        self.assertEqual(self.frame.processed_value.cget("text"), "0")
+
+        self.frame.flush()
+
+        self.assertEqual(self.frame.processed_value.cget("text"), "1000")
+        self.assertEqual(self.frame.video_count.cget("text"), "500")
+        self.assertEqual(self.frame.current_item_value.cget("text"), "Gag 999 (1000/1000)")
+
+    def test_unknown_total(self):
+        """Test that an unknown total is shown until it is set."""
+        self.frame.set_total_items(None)
+        self.frame.increment_counters(success=True)
+        self.frame.update_current_item("Gag", 0)
+        self.frame.flush()
+
+        self.assertEqual(self.frame.total_items_value.cget("text"), "?")
+        self.assertEqual(self.frame.current_item_value.cget("text"), "Gag (1/?)")
+
+        self.frame.set_total_items(10)
+        self.frame.flush()
+
+        self.assertEqual(self.frame.total_items_value.cget("text"), "10")
+        self.assertEqual(self.frame.status_value.cget("text"), "Downloading")
+
+    def test_complete_renders_immediately(self):
+        """Test that the final progress is shown without waiting for a repaint."""
+        self.frame.set_progress_bar(1.0, 100)
+
+        self.assertEqual(self.frame.progress_bar_percentage.cget("text"), "100%")
+        self.assertEqual(self.frame.status_value.cget("text"), "Complete")
+
+    def test_unchanged_widgets_not_reconfigured(self):
+        """Test that a repaint skips widgets whose value did not change."""
+        self.frame.flush()
+
+        with patch.object(self.frame.failed_value, "configure") as mock_configure:
+            self.frame.increment_counters(success=True)
+            self.frame.flush()
+
+        mock_configure.assert_not_called()
+        self.assertEqual(self.frame.success_value.cget("text"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the download rate limiter."""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.core.downloader import RateLimiter
+from src.core.downloader.rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the token bucket."""
+
+    def test_unlimited(self):
+        """Test that an unlimited bucket never asks to wait."""
+        bucket = TokenBucket()
+
+        self.assertTrue(bucket.unlimited)
+        self.assertEqual(bucket.reserve(10**9), 0.0)
+
+    def test_reserve_goes_into_debt(self):
+        """Test that reservations beyond the tokens return the waiting time."""
+        bucket = TokenBucket(rate=10)
+
+        # The bucket starts empty, so every token has to be waited for
+        self.assertAlmostEqual(bucket.reserve(5), 0.5, places=2)
+        self.assertAlmostEqual(bucket.reserve(5), 1.0, places=2)
+
+    def test_refill_up_to_capacity(self):
+        """Test that idle time refills the bucket, but never above its capacity."""
+        bucket = TokenBucket(rate=10, capacity=2)
+        with patch("src.core.downloader.rate_limiter.time.monotonic") as monotonic:
+            monotonic.return_value = bucket._updated + 60
+            self.assertEqual(bucket.reserve(2), 0.0)
+            self.assertAlmostEqual(bucket.reserve(1), 0.1)
+
+    def test_set_rate_disables_limit(self):
+        """Test that a rate of zero removes the limit."""
+        bucket = TokenBucket(rate=1)
+        bucket.set_rate(0)
+
+        self.assertTrue(bucket.unlimited)
+        self.assertEqual(bucket.reserve(100), 0.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the rate limiter."""
+
+    def test_request_rate_shared_between_threads(self):
+        """Test that all threads together stay below the request rate."""
+        limiter = RateLimiter(requests_per_second=50)
+
+        def worker():
+            for _ in range(5):
+                limiter.acquire_request()
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 20 requests at 50/s from an empty bucket take at least 0.4 seconds
+        self.assertGreaterEqual(time.monotonic() - start, 0.35)
+
+    def test_bandwidth_limit(self):
+        """Test that byte acquisition sleeps according to the bandwidth limit."""
+        limiter = RateLimiter(bytes_per_second=1000)
+
+        with patch("src.core.downloader.rate_limiter.time.sleep") as mock_sleep:
+            limiter.acquire_bytes(500)
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.5, places=2)
+
+    def test_unlimited_does_not_sleep(self):
+        """Test that the default limiter never sleeps."""
+        limiter = RateLimiter()
+
+        with patch("src.core.downloader.rate_limiter.time.sleep") as mock_sleep:
+            limiter.acquire_request()
+            limiter.acquire_bytes(10**9)
+
+        mock_sleep.assert_not_called()
+
+    def test_set_limits_at_runtime(self):
+        """Test that the limits can be changed and removed at runtime."""
+        limiter = RateLimiter(requests_per_second=1)
+        limiter.set_limits(requests_per_second=None, bytes_per_second=2048)
+
+        self.assertIsNone(limiter.requests_per_second)
+        self.assertEqual(limiter.bytes_per_second, 2048)
+        self.assertEqual(limiter.describe(), "unlimited requests, 2 KB/s")
+
+    def test_async_acquire(self):
+        """Test that the async variants wait without blocking the loop."""
+        limiter = RateLimiter(requests_per_second=20)
+
+        async def main():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire_request_async() for _ in range(4)))
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
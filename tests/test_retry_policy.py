@@ -0,0 +1,60 @@
+"""Tests for the retry policy."""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from src.core.downloader import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the retry policy."""
+
+    def test_transient_statuses(self):
+        """Test that only throttling and server errors are retried."""
+        policy = RetryPolicy()
+
+        for status in (429, 500, 502, 503, 504):
+            self.assertTrue(policy.is_transient_status(status), status)
+        for status in (200, 206, 403, 404, 416):
+            self.assertFalse(policy.is_transient_status(status), status)
+
+    def test_exponential_backoff(self):
+        """Test that the delay doubles per attempt without jitter."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.0)
+
+        self.assertEqual(policy.get_delay(1), 1.0)
+        self.assertEqual(policy.get_delay(2), 2.0)
+        self.assertEqual(policy.get_delay(3), 4.0)
+        self.assertEqual(policy.get_delay(4), 5.0)
+
+    def test_jitter_range(self):
+        """Test that jitter only shortens the delay within its fraction."""
+        policy = RetryPolicy(base_delay=2.0, jitter=0.5)
+
+        for _ in range(100):
+            delay = policy.get_delay(1)
+            self.assertGreaterEqual(delay, 1.0)
+            self.assertLessEqual(delay, 2.0)
+
+    def test_retry_after_honoured(self):
+        """Test that Retry-After extends the delay up to the configured cap."""
+        policy = RetryPolicy(base_delay=0.1, jitter=0.0, max_retry_after=10.0)
+
+        self.assertEqual(policy.get_delay(1, retry_after=3.0), 3.0)
+        self.assertEqual(policy.get_delay(1, retry_after=60.0), 10.0)
+
+    def test_parse_retry_after(self):
+        """Test parsing Retry-After in seconds and as an HTTP date."""
+        self.assertEqual(RetryPolicy.parse_retry_after("7"), 7.0)
+        self.assertIsNone(RetryPolicy.parse_retry_after(None))
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        seconds = RetryPolicy.parse_retry_after(format_datetime(retry_at, usegmt=True))
+        self.assertGreater(seconds, 25)
+        self.assertLessEqual(seconds, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
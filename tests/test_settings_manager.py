@@ -130,6 +130,23 @@ class TestSettingsManager(unittest.TestCase):
         # Verify the file was saved
         self.assertTrue(Path(self.test_settings_path).exists())
 
+    @patch("src.config.settings.SettingsManager._get_settings_file_path")
+    def test_update_rate_limits(self, mock_get_path):
+        """Test updating the rate limits."""
+        # Mock the settings file path
+        mock_get_path.return_value = self.test_settings_path
+
+        # Create a settings manager
+        manager = SettingsManager(self.mock_logger)
+
+        # Update the limits, negative values mean unlimited
+        manager.update_rate_limits(5.0, -1.0)
+
+        # Verify settings were updated and survive a reload
+        reloaded = SettingsManager(self.mock_logger)
+        self.assertEqual(reloaded.settings.max_requests_per_second, 5.0)
+        self.assertEqual(reloaded.settings.max_kilobytes_per_second, 0.0)
+
     @patch("src.config.settings.SettingsManager._get_settings_file_path")
     def test_update_window_size(self, mock_get_path):
         """Test updating the window size."""
@@ -0,0 +1,115 @@
+"""Tests for the streaming HTML export parser."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+from src.core.models import Gag
+from src.core.parser import HtmlParser, StreamingHtmlParser
+
+EXPORT = """<html><head><title>9GAG Test Data</title></head><body>
+<h3>Comments</h3>
+<table><tr><td>2020</td><td><a href="https://9gag.com/gag/c1">link</a></td><td>Comment</td></tr></table>
+<h3>Saved</h3>
+<table>
+<tr><th>Date</th><th>Link</th><th>Title</th></tr>
+<tr><td>2020</td><td><a href="https://9gag.com/gag/s1">link</a></td><td> Tom &amp; Jerry </td></tr>
+<tr><td>2020</td><td><a href="https://9gag.com/gag/s2">link</a></td><td></td></tr>
+</table>
+<h3><b>Up</b>votes</h3>
+<h3>Upvotes</h3>
+<p>Posts you upvoted</p>
+<table>
+<tr><td>2021</td><td><a href="https://9gag.com/gag/u1">link</a></td><td><b>The</b> real MVP</td></tr>
+<tr><td>2021</td><td>no link</td><td>Skipped</td></tr>
+<tr><td>2021</td><td><a>first</a><a href="https://9gag.com/gag/x">second</a></td><td>Skipped</td></tr>
+<tr><td>2021</td><td><a href="https://9gag.com/gag/u2"/></td><td>   </td></tr>
+</table>
+<h3>Upvotes</h3>
+<table><tr><td>2022</td><td><a href="https://9gag.com/gag/u3">link</a></td><td>Ignored</td></tr></table>
+</body></html>
+"""
+
+
+class TestStreamingHtmlParser(unittest.TestCase):
+    """Test cases for the streaming parser."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = Path(current_dir) / "test_stream_parser"
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        self.test_file = str(self.test_dir / "export.html")
+        Path(self.test_file).write_text(EXPORT, encoding="utf-8")
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_matches_beautifulsoup_parser(self):
+        """Test that every section selection gives the same gags as parse_file."""
+        for upvoted, saved in [(True, False), (False, True), (True, True)]:
+            expected = HtmlParser.parse_file(self.test_file, upvoted, saved)
+            for chunk_size in (1, 13, HtmlParser.STREAM_CHUNK_SIZE):
+                with self.subTest(upvoted=upvoted, saved=saved, chunk_size=chunk_size):
+                    gags = list(HtmlParser.stream_file(self.test_file, upvoted, saved, chunk_size))
+                    self.assertEqual(gags, expected)
+
+    def test_sections_in_requested_order(self):
+        """Test that upvoted gags come first although Saved appears first."""
+        gags = HtmlParser.parse_file(
+            self.test_file, upvoted_gags=True, saved_gags=True, streaming=True
+        )
+
+        self.assertEqual([gag.id for gag in gags], ["u1", "u2", "s1", "s2"])
+        self.assertEqual([gag.section for gag in gags], ["Upvotes", "Upvotes", "Saved", "Saved"])
+        self.assertEqual(gags[0].title, "The real MVP")
+        self.assertEqual(gags[1].title, "")
+        self.assertEqual(gags[2].title, "Tom & Jerry")
+        self.assertEqual(gags[3].title, "No Title")
+
+    def test_gags_yielded_while_feeding(self):
+        """Test that gags are released row by row, before the table is closed."""
+        parser = StreamingHtmlParser(["Saved"])
+        first_row_end = EXPORT.index("</tr>", EXPORT.index("/gag/s1")) + len("</tr>")
+
+        parser.feed(EXPORT[:first_row_end])
+
+        self.assertFalse(parser.finished)
+        self.assertEqual(parser.pop_gags(), [Gag(id="s1", title="Tom & Jerry", section="Saved")])
+
+        parser.feed(EXPORT[first_row_end:])
+
+        self.assertTrue(parser.finished)
+        self.assertEqual(parser.pop_gags(), [Gag(id="s2", title="No Title", section="Saved")])
+
+    def test_missing_section(self):
+        """Test that a missing section gives no gags."""
+        parser = StreamingHtmlParser(["Missing", "Saved"])
+        parser.feed(EXPORT)
+        self.assertEqual(parser.pop_gags(), [])
+
+        parser.close()
+
+        self.assertEqual([gag.id for gag in parser.pop_gags()], ["s1", "s2"])
+
+    def test_iter_gags_is_lazy(self):
+        """Test that iter_gags checks the file right away and parses on demand."""
+        with self.assertRaises(FileNotFoundError):
+            HtmlParser.iter_gags("non_existent_file.html", upvoted_gags=True)
+
+        gags = HtmlParser.iter_gags(self.test_file, upvoted_gags=True, saved_gags=True)
+
+        self.assertEqual(next(gags).id, "u1")
+        self.assertEqual([gag.id for gag in gags], ["u2", "s1", "s2"])
+
+    def test_error_handling(self):
+        """Test error handling for non-existent files."""
+        with self.assertRaises(FileNotFoundError):
+            list(HtmlParser.stream_file("non_existent_file.html", upvoted_gags=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for the variant hit-rate statistics."""
+
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+from src.core.downloader.suffix_stats import SuffixStats
+
+VARIANTS = [
+    ("VIDEO", "_720w_gt.mp4"),
+    ("VIDEO", "_460sv.mp4"),
+    ("IMAGE", "_700b.jpg"),
+    ("IMAGE", "_460s.jpg"),
+]
+
+
+class TestSuffixStats(unittest.TestCase):
+    """Test cases for the suffix statistics."""
+
+    def setUp(self):
+        """Set up the test case."""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.test_dir = os.path.join(current_dir, "test_suffix_stats")
+        self.stats_file = Path(self.test_dir) / "suffix_stats.json"
+
+    def tearDown(self):
+        """Clean up after the test."""
+        if Path(self.test_dir).exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_default_order_without_hits(self):
+        """Test that the default order is kept until there are hits."""
+        stats = SuffixStats(VARIANTS)
+
+        self.assertEqual(stats.order_groups(), ["VIDEO", "IMAGE"])
+        self.assertEqual(stats.variant_order(), VARIANTS)
+
+    def test_reorders_by_hits(self):
+        """Test that the likeliest group and suffix move to the front."""
+        stats = SuffixStats(VARIANTS)
+        for _ in range(3):
+            stats.record_hit("IMAGE", "_460s.jpg")
+        stats.record_hit("VIDEO", "_720w_gt.mp4")
+
+        self.assertEqual(stats.order_groups(), ["IMAGE", "VIDEO"])
+        self.assertEqual(stats.order_suffixes("IMAGE"), ["_460s.jpg", "_700b.jpg"])
+        self.assertEqual(stats.variant_order()[0], ("IMAGE", "_460s.jpg"))
+
+    def test_probes_saved(self):
+        """Test that hits found earlier than in the default order count as saved."""
+        stats = SuffixStats(VARIANTS)
+
+        # Default order: found at position 3, nothing reordered yet
+        stats.record_hit("IMAGE", "_460s.jpg")
+        self.assertEqual(stats.probes_saved, 0)
+
+        # Now the 460 image is tried first, saving three probes
+        stats.record_hit("IMAGE", "_460s.jpg")
+        self.assertEqual(stats.probes_saved, 3)
+
+    def test_hit_rates(self):
+        """Test that hit rates are shares of all hits."""
+        stats = SuffixStats(VARIANTS)
+        stats.record_hit("IMAGE", "_700b.jpg")
+        stats.record_hit("IMAGE", "_700b.jpg")
+        stats.record_hit("VIDEO", "_460sv.mp4")
+        stats.record_hit("VIDEO", "_460sv.mp4")
+
+        rates = stats.hit_rates()
+        self.assertAlmostEqual(rates["_700b.jpg"], 0.5)
+        self.assertAlmostEqual(rates["_720w_gt.mp4"], 0.0)
+
+    def test_save_and_load(self):
+        """Test that the counters survive a restart."""
+        stats = SuffixStats(VARIANTS, self.stats_file)
+        stats.record_hit("IMAGE", "_700b.jpg")
+        self.assertTrue(stats.save())
+
+        reloaded = SuffixStats(VARIANTS, self.stats_file)
+        self.assertEqual(reloaded.hits["_700b.jpg"], 1)
+        self.assertEqual(reloaded.order_groups(), ["IMAGE", "VIDEO"])
+
+    def test_corrupt_file_ignored(self):
+        """Test that an unreadable stats file falls back to the defaults."""
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.stats_file.write_text("not json", encoding="utf-8")
+
+        stats = SuffixStats(VARIANTS, self.stats_file)
+
+        self.assertEqual(stats.variant_order(), VARIANTS)
+
+
+if __name__ == "__main__":
+    unittest.main()